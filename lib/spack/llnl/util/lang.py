@@ -677,6 +677,28 @@ def pretty_seconds(seconds):
     return pretty_seconds_formatter(seconds)(seconds)
 
 
+def pretty_hms(seconds: float) -> str:
+    """Seconds to string with hours, minutes and seconds, e.g. "1h 2m 3.46s"
+
+    Arguments:
+        seconds: Number of seconds
+
+    Returns:
+        Time string, with only the non-zero units
+    """
+    m, s = divmod(seconds, 60)
+    h, m = divmod(m, 60)
+
+    parts = []
+    if h:
+        parts.append("%dh" % h)
+    if m:
+        parts.append("%dm" % m)
+    if s:
+        parts.append(f"{s:.2f}s")
+    return " ".join(parts)
+
+
 class ObjectWrapper:
     """Base class that wraps an object. Derived classes can add new behavior
     while staying undercover.
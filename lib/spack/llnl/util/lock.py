@@ -516,6 +516,15 @@ def acquire_write(self, timeout: Optional[float] = None) -> bool:
             self._writes += 1
             return False
 
+    def write_depth(self) -> int:
+        """Number of nested write acquisitions of the lock held by this object
+
+        Return:
+            (int): ``0`` if the lock is not held for writing, otherwise the number of
+                write transactions holding it, from the outermost to the innermost
+        """
+        return self._writes
+
     def is_write_locked(self) -> bool:
         """Check if the file is write locked
 
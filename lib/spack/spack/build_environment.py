@@ -75,6 +75,7 @@
 import spack.store
 import spack.subprocess_context
 import spack.util.executable
+import spack.util.jobserver
 import spack.util.libc
 from spack import traverse
 from spack.context import Context
@@ -1198,7 +1199,12 @@ def _setup_pkg_and_run(
 
         pkg = serialized_pkg.restore()
 
-        if not kwargs.get("fake", False):
+        # Share the jobserver of the parent process with the make processes of this build
+        jobserver = kwargs.get("jobserver")
+        if jobserver is not None:
+            spack.util.jobserver.attach(*jobserver)
+
+        if not kwargs.get("fake", False) and kwargs.get("setup_environment", True):
             kwargs["unmodified_env"] = os.environ.copy()
             kwargs["env_modifications"] = setup_package(
                 pkg, dirty=kwargs.get("dirty", False), context=Context.from_string(context)
@@ -1267,44 +1273,107 @@ def _setup_pkg_and_run(
             input_multiprocess_fd.close()
 
 
-def start_build_process(pkg, function, kwargs):
-    """Create a child process to do part of a spack build.
+class BuildProcess:
+    """Handle to a child process started by ``spawn_build_process()``.
 
-    Args:
+    The parent can poll the handle to know whether the child has sent its result, which
+    allows several build processes to be in flight at the same time. Calling
+    ``complete()`` collects the result of the child, or re-raises its error.
+    """
 
-        pkg (spack.package_base.PackageBase): package whose environment we should set up the
-            child process for.
-        function (typing.Callable): argless function to run in the child
-            process.
+    def __init__(
+        self,
+        pkg: "spack.package_base.PackageBase",
+        process: multiprocessing.Process,
+        read_pipe: multiprocessing.connection.Connection,
+    ) -> None:
+        self.pkg = pkg
+        self.process = process
+        self.read_pipe = read_pipe
 
-    Usage::
+    @property
+    def sentinel(self) -> multiprocessing.connection.Connection:
+        """Object that can be passed to ``multiprocessing.connection.wait()``"""
+        return self.read_pipe
+
+    def poll(self) -> bool:
+        """Return True if the child process has a result, or has stopped, False otherwise"""
+        return self.read_pipe.poll() or not self.process.is_alive()
+
+    def terminate(self) -> None:
+        """Terminate the child process, if it is still running"""
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.read_pipe.close()
+
+    def _exitcode_msg(self) -> str:
+        exitcode = self.process.exitcode or 0
+        typ = "exit" if exitcode >= 0 else "signal"
+        return f"{typ} {abs(exitcode)}"
+
+    def complete(self):
+        """Wait for the child process to finish, and return its result.
+
+        Raises:
+            StopPhase: if the child stopped at a requested phase
+            ChildError: if the child process raised an error
+            InstallError: if the child process stopped unexpectedly
+        """
+        try:
+            child_result = self.read_pipe.recv()
+        except EOFError:
+            self.process.join()
+            raise InstallError(
+                f"The process has stopped unexpectedly ({self._exitcode_msg()})", pkg=self.pkg
+            )
+        finally:
+            self.read_pipe.close()
+
+        self.process.join()
+
+        # If returns a StopPhase, raise it
+        if isinstance(child_result, spack.error.StopPhase):
+            # do not print
+            raise child_result
+
+        # let the caller know which package went wrong.
+        if isinstance(child_result, InstallError):
+            child_result.pkg = self.pkg
+
+        if isinstance(child_result, ChildError):
+            # If the child process raised an error, print its output here rather
+            # than waiting until the call to SpackError.die() in main(). This
+            # allows exception handling output to be logged from within Spack.
+            # see spack.main.SpackCommand.
+            child_result.print_context()
+            raise child_result
+
+        # Fallback. Usually caught beforehand in EOFError above.
+        if self.process.exitcode != 0:
+            raise InstallError(
+                f"The process failed unexpectedly ({self._exitcode_msg()})", pkg=self.pkg
+            )
 
-        def child_fun():
-            # do stuff
-        build_env.start_build_process(pkg, child_fun)
+        return child_result
 
-    The child process is run with the build environment set up by
-    spack.build_environment.  This allows package authors to have full
-    control over the environment, etc. without affecting other builds
-    that might be executed in the same spack call.
 
-    If something goes wrong, the child process catches the error and
-    passes it to the parent wrapped in a ChildError.  The parent is
-    expected to handle (or re-raise) the ChildError.
+def spawn_build_process(pkg, function, kwargs, forward_stdin: bool = True) -> BuildProcess:
+    """Create a child process to do part of a spack build, without waiting for it.
 
-    This uses `multiprocessing.Process` to create the child process. The
-    mechanism used to create the process differs on different operating
-    systems and for different versions of Python. In some cases "fork"
-    is used (i.e. the "fork" system call) and some cases it starts an
-    entirely new Python interpreter process (in the docs this is referred
-    to as the "spawn" start method). Breaking it down by OS:
+    This is the non-blocking counterpart of ``start_build_process()``: the caller is
+    responsible for calling ``complete()`` on the returned handle.
 
-    - Linux always uses fork.
-    - Mac OS uses fork before Python 3.8 and "spawn" for 3.8 and after.
-    - Windows always uses the "spawn" start method.
+    Args:
 
-    For more information on `multiprocessing` child process creation
-    mechanisms, see https://docs.python.org/3/library/multiprocessing.html#contexts-and-start-methods
+        pkg (spack.package_base.PackageBase): package whose environment we should set up the
+            child process for.
+        function (typing.Callable): function to run in the child process.
+        kwargs (dict): keyword arguments passed to ``function``. The build environment
+            of the package is not set up in the child if ``setup_environment`` is
+            ``False``, e.g. to extract a binary package.
+        forward_stdin: whether to forward the parent stdin to the child. This should
+            be disabled when more than one child runs at the same time.
     """
     read_pipe, write_pipe = multiprocessing.Pipe(duplex=False)
     input_multiprocess_fd = None
@@ -1315,7 +1384,12 @@ def child_fun():
 
     try:
         # Forward sys.stdin when appropriate, to allow toggling verbosity
-        if sys.platform != "win32" and sys.stdin.isatty() and hasattr(sys.stdin, "fileno"):
+        if (
+            forward_stdin
+            and sys.platform != "win32"
+            and sys.stdin.isatty()
+            and hasattr(sys.stdin, "fileno")
+        ):
             input_fd = os.dup(sys.stdin.fileno())
             input_multiprocess_fd = MultiProcessFd(input_fd)
         mflags = os.environ.get("MAKEFLAGS", False)
@@ -1355,40 +1429,49 @@ def child_fun():
         if input_multiprocess_fd is not None:
             input_multiprocess_fd.close()
 
-    def exitcode_msg(p):
-        typ = "exit" if p.exitcode >= 0 else "signal"
-        return f"{typ} {abs(p.exitcode)}"
+    return BuildProcess(pkg, p, read_pipe)
 
-    try:
-        child_result = read_pipe.recv()
-    except EOFError:
-        p.join()
-        raise InstallError(f"The process has stopped unexpectedly ({exitcode_msg(p)})")
-
-    p.join()
-
-    # If returns a StopPhase, raise it
-    if isinstance(child_result, spack.error.StopPhase):
-        # do not print
-        raise child_result
-
-    # let the caller know which package went wrong.
-    if isinstance(child_result, InstallError):
-        child_result.pkg = pkg
-
-    if isinstance(child_result, ChildError):
-        # If the child process raised an error, print its output here rather
-        # than waiting until the call to SpackError.die() in main(). This
-        # allows exception handling output to be logged from within Spack.
-        # see spack.main.SpackCommand.
-        child_result.print_context()
-        raise child_result
-
-    # Fallback. Usually caught beforehand in EOFError above.
-    if p.exitcode != 0:
-        raise InstallError(f"The process failed unexpectedly ({exitcode_msg(p)})")
-
-    return child_result
+
+def start_build_process(pkg, function, kwargs):
+    """Create a child process to do part of a spack build.
+
+    Args:
+
+        pkg (spack.package_base.PackageBase): package whose environment we should set up the
+            child process for.
+        function (typing.Callable): argless function to run in the child
+            process.
+
+    Usage::
+
+        def child_fun():
+            # do stuff
+        build_env.start_build_process(pkg, child_fun)
+
+    The child process is run with the build environment set up by
+    spack.build_environment.  This allows package authors to have full
+    control over the environment, etc. without affecting other builds
+    that might be executed in the same spack call.
+
+    If something goes wrong, the child process catches the error and
+    passes it to the parent wrapped in a ChildError.  The parent is
+    expected to handle (or re-raise) the ChildError.
+
+    This uses `multiprocessing.Process` to create the child process. The
+    mechanism used to create the process differs on different operating
+    systems and for different versions of Python. In some cases "fork"
+    is used (i.e. the "fork" system call) and some cases it starts an
+    entirely new Python interpreter process (in the docs this is referred
+    to as the "spawn" start method). Breaking it down by OS:
+
+    - Linux always uses fork.
+    - Mac OS uses fork before Python 3.8 and "spawn" for 3.8 and after.
+    - Windows always uses the "spawn" start method.
+
+    For more information on `multiprocessing` child process creation
+    mechanisms, see https://docs.python.org/3/library/multiprocessing.html#contexts-and-start-methods
+    """
+    return spawn_build_process(pkg, function, kwargs).complete()
 
 
 CONTEXT_BASES = (spack.package_base.PackageBase, spack.build_systems._checks.BaseBuilder)
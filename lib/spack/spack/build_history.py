@@ -0,0 +1,346 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""Persistent history of the time it took to install packages.
+
+Each install writes its timings to the ``.spack`` directory of its prefix. The installer
+also accumulates them in a history stored in the misc cache, keyed on the package
+configuration, so that they can be used to plan later installations.
+
+Builds from sources and installs from a binary cache are recorded separately, together
+with the time spent in each of their phases (e.g. ``stage``, ``build``, ``fetch`` or
+``relocate``).
+"""
+import heapq
+import os
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import llnl.util.tty as tty
+
+import spack.binary_distribution
+import spack.caches
+import spack.config
+import spack.package_base
+import spack.spec
+import spack.traverse
+import spack.util.file_cache
+import spack.util.spack_json as sjson
+
+#: Key of the history file in the misc cache
+CACHE_KEY = "build_history/durations.json"
+
+#: Format version of the history file
+FORMAT_VERSION = 2
+
+#: Number of installs over which durations are averaged, so that the history follows
+#: changes in the build environment
+MAX_SAMPLES = 5
+
+
+def history_key(spec: "spack.spec.Spec") -> str:
+    """Return the key identifying the configuration of a spec in the history."""
+    return f"{spec.name}@{spec.version}{spec.variants} %{spec.compiler} target={spec.target}"
+
+
+def _install_kind(cache: bool) -> str:
+    return "binary" if cache else "source"
+
+
+def _moving_average(record: Dict[str, Any], key: str, value: float, samples: int) -> None:
+    record[key] = record.get(key, value) + (value - record.get(key, value)) / samples
+
+
+class BuildHistory:
+    """Durations of past installations, read lazily from a file cache."""
+
+    def __init__(self, cache: Optional[spack.util.file_cache.FileCache] = None) -> None:
+        self._cache = cache
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    @property
+    def cache(self) -> spack.util.file_cache.FileCache:
+        return self._cache or spack.caches.MISC_CACHE  # type: ignore[return-value]
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            if not self.cache.init_entry(CACHE_KEY):
+                return {}
+            with self.cache.read_transaction(CACHE_KEY) as f:
+                data = sjson.load(f)
+        except (OSError, ValueError, spack.util.file_cache.CacheError) as e:
+            tty.debug(f"Cannot read the build history: {e}")
+            return {}
+
+        if not isinstance(data, dict) or data.get("version") != FORMAT_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """Entries of the history, keyed on ``history_key()``"""
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def records(self, spec: "spack.spec.Spec", cache: bool = False) -> List[Dict[str, Any]]:
+        """Return the records of past installs that are relevant to a spec.
+
+        These are the records for the exact configuration of the spec, if it was installed
+        before, and otherwise the records for all the configurations of the same package.
+        """
+        kind = _install_kind(cache)
+        entry = self.entries.get(history_key(spec), {})
+        if kind in entry:
+            return [entry[kind]]
+        return [e[kind] for e in self.entries.values() if e["name"] == spec.name and kind in e]
+
+    def duration(
+        self, spec: "spack.spec.Spec", cache: bool = False, jobs: Optional[int] = None
+    ) -> Optional[float]:
+        """Return the expected time to install a spec, in seconds.
+
+        If the exact configuration of the spec was never installed, the average over the
+        configurations of the same package is returned. If the package was never installed,
+        return None.
+
+        Args:
+            spec: spec to be installed
+            cache: whether the spec is installed from a binary cache, or built from sources
+            jobs: number of build jobs. If given, the duration of builds from sources is
+                scaled assuming a linear speed-up with the number of jobs.
+        """
+        records = self.records(spec, cache=cache)
+        if not records:
+            return None
+
+        seconds = [r["seconds"] for r in records]
+        if jobs is not None and not cache:
+            seconds = [s * r.get("jobs", jobs) / jobs for s, r in zip(seconds, records)]
+        return sum(seconds) / len(seconds)
+
+    def record(
+        self,
+        spec: "spack.spec.Spec",
+        seconds: float,
+        *,
+        phases: Optional[Dict[str, float]] = None,
+        cache: bool = False,
+        jobs: int = 1,
+    ) -> None:
+        """Record the time it took to install a spec.
+
+        Args:
+            spec: spec that was installed
+            seconds: total time of the install
+            phases: time spent in each phase of the install
+            cache: whether the spec was installed from a binary cache
+            jobs: number of build jobs used to build the spec
+        """
+        key = history_key(spec)
+        self.cache.init_entry(CACHE_KEY)
+        with self.cache.write_transaction(CACHE_KEY) as (old, new):
+            entries = self._entries or {}
+            if old is not None:
+                try:
+                    data = sjson.load(old)
+                    if data.get("version") == FORMAT_VERSION:
+                        entries = data.get("entries", {})
+                except ValueError:
+                    pass
+
+            entry = entries.setdefault(key, {"name": spec.name})
+            record = entry.setdefault(_install_kind(cache), {"samples": 0, "phases": {}})
+            samples = min(record["samples"] + 1, MAX_SAMPLES)
+            _moving_average(record, "seconds", seconds, samples)
+            for name, phase_seconds in (phases or {}).items():
+                _moving_average(record["phases"], name, phase_seconds, samples)
+            record["samples"] = samples
+            record["jobs"] = jobs
+            sjson.dump({"version": FORMAT_VERSION, "entries": entries}, new)
+
+        self._entries = entries
+
+
+def build_jobs(pkg: "spack.package_base.PackageBase") -> int:
+    """Number of build jobs available to the build of a package.
+
+    This must be called in the build process: when the build is attached to the jobserver
+    of the installer, the number of jobs is the number of slots of the jobserver, which is
+    only advertised in ``MAKEFLAGS`` in that process.
+    """
+    if not pkg.parallel:
+        return 1
+    match = re.search(r"(?:^|\s)-j\s*(\d+)", os.environ.get("MAKEFLAGS", ""))
+    if match and "--jobserver" in os.environ["MAKEFLAGS"]:
+        return int(match.group(1))
+    return spack.config.determine_number_of_jobs(parallel=True)
+
+
+def record_install(pkg: "spack.package_base.PackageBase") -> None:
+    """Add the timings written by a successful install to the history."""
+    try:
+        with open(pkg.times_log_path, "r") as f:
+            timings = sjson.load(f)
+        cache = timings.get("cache", False)
+        jobs = timings.get("jobs")
+        if jobs is None:
+            # Timings written before the number of jobs was recorded
+            jobs = 1 if cache else spack.config.determine_number_of_jobs(parallel=pkg.parallel)
+        BuildHistory().record(
+            pkg.spec,
+            timings["total"],
+            phases={phase["name"]: phase["seconds"] for phase in timings["phases"]},
+            cache=cache,
+            jobs=jobs,
+        )
+    except Exception as e:
+        tty.debug(f"Cannot record the install time of {pkg.spec.name}: {e}")
+
+
+class Estimate:
+    """Predicted wall time to install a set of specs."""
+
+    def __init__(self, cores: int, concurrent_packages: int) -> None:
+        #: Number of cores available to the installer
+        self.cores = cores
+        #: Number of packages installed concurrently
+        self.concurrent_packages = concurrent_packages
+        #: Expected duration of the install of each spec, and whether it uses a binary cache
+        self.durations: Dict[str, Tuple["spack.spec.Spec", float, bool]] = {}
+        #: Specs that were never installed before
+        self.unknown: List["spack.spec.Spec"] = []
+        #: Longest chain of installs, from the first to the last one
+        self.critical_path: List["spack.spec.Spec"] = []
+        #: Predicted wall time of the whole install
+        self.wall_time = 0.0
+
+    @property
+    def critical_path_time(self) -> float:
+        """Sum of the expected durations on the critical path"""
+        return sum(self.durations[s.dag_hash()][1] for s in self.critical_path)
+
+
+def longest_chains(
+    durations: Dict[str, float], edges: Dict[str, Set[str]]
+) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+    """Return the duration of the longest chain starting at each node of a DAG.
+
+    Args:
+        durations: duration of each node
+        edges: nodes following each node in a chain
+
+    Returns:
+        The duration of the longest chain starting at each node, and the node following
+        it on that chain (None at the end of the chain)
+    """
+    lengths: Dict[str, float] = {}
+    following: Dict[str, Optional[str]] = {}
+
+    def visit(node: str) -> float:
+        if node not in lengths:
+            next_node = max(edges[node], key=visit, default=None)
+            following[node] = next_node
+            lengths[node] = durations[node] + (0.0 if next_node is None else lengths[next_node])
+        return lengths[node]
+
+    for node in durations:
+        visit(node)
+    return lengths, following
+
+
+def estimate(
+    specs: List["spack.spec.Spec"],
+    cores: int,
+    *,
+    concurrent_packages: Optional[int] = None,
+    use_cache: bool = True,
+    history: Optional[BuildHistory] = None,
+) -> Estimate:
+    """Predict the wall time to install concrete specs and their dependencies.
+
+    Installs are scheduled like in the installer: a package starts as soon as all its
+    dependencies are installed and a slot is available, and packages on the longest chain
+    of installs go first. Specs that are already installed, or external, take no time.
+
+    Args:
+        specs: concrete specs to be installed
+        cores: number of cores available for the install
+        concurrent_packages: number of packages installed concurrently. By default, as many
+            packages are built concurrently as fit in ``cores`` with the configured number
+            of build jobs.
+        use_cache: whether specs available in a binary cache are installed from it
+        history: history of past installs (default: the one in the misc cache)
+    """
+    history = history or BuildHistory()
+    build_jobs = spack.config.determine_number_of_jobs(parallel=True, max_cpus=cores)
+    result = Estimate(cores, concurrent_packages or max(1, cores // build_jobs))
+
+    pending = {
+        s.dag_hash(): s
+        for s in spack.traverse.traverse_nodes(specs, key=spack.traverse.by_dag_hash)
+        if not s.external and not s.installed
+    }
+
+    expected: Dict[str, Optional[float]] = {}
+    from_cache: Dict[str, bool] = {}
+    for h, s in pending.items():
+        from_cache[h] = use_cache and bool(
+            spack.binary_distribution.get_mirrors_for_spec(s, index_only=True)
+        )
+        jobs = spack.config.determine_number_of_jobs(parallel=s.package.parallel, max_cpus=cores)
+        expected[h] = history.duration(s, cache=from_cache[h], jobs=jobs)
+
+    # Never installed packages take the average duration of the known ones
+    defaults = {}
+    for cache in (False, True):
+        known = [d for h, d in expected.items() if d is not None and from_cache[h] == cache]
+        defaults[cache] = sum(known) / len(known) if known else 0.0
+
+    durations: Dict[str, float] = {}
+    for h, s in pending.items():
+        d = expected[h]
+        if d is None:
+            d = defaults[from_cache[h]]
+            result.unknown.append(s)
+        durations[h] = d
+        result.durations[h] = (s, d, from_cache[h])
+
+    dependencies = {
+        h: {d.dag_hash() for d in s.dependencies() if d.dag_hash() in pending}
+        for h, s in pending.items()
+    }
+    dependents: Dict[str, Set[str]] = {h: set() for h in pending}
+    for h, deps in dependencies.items():
+        for d in deps:
+            dependents[d].add(h)
+
+    # The critical path is the longest chain of dependents from a package with no pending
+    # dependencies. The same lengths are used to prioritize packages in the simulation.
+    priorities, following = longest_chains(durations, dependents)
+    node = max(priorities, key=lambda h: priorities[h], default=None)
+    while node is not None:
+        result.critical_path.append(pending[node])
+        node = following[node]
+
+    # Simulate the schedule of the installer
+    remaining = {h: len(deps) for h, deps in dependencies.items()}
+    ready = [(-priorities[h], h) for h, n in remaining.items() if n == 0]
+    heapq.heapify(ready)
+    running: List[Tuple[float, str]] = []
+    now = 0.0
+    while ready or running:
+        while ready and len(running) < result.concurrent_packages:
+            _, h = heapq.heappop(ready)
+            heapq.heappush(running, (now + durations[h], h))
+
+        now, h = heapq.heappop(running)
+        for dependent in dependents[h]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                heapq.heappush(ready, (-priorities[dependent], dependent))
+
+    result.wall_time = now
+    return result
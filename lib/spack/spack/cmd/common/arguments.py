@@ -504,7 +504,16 @@ class ConfigSetAction(argparse.Action):
     """
 
     def __init__(
-        self, option_strings, dest, const, default=None, required=False, help=None, metavar=None
+        self,
+        option_strings,
+        dest,
+        const=None,
+        default=None,
+        required=False,
+        help=None,
+        metavar=None,
+        nargs=0,
+        type=None,
     ):
         # save the config option we're supposed to set
         self.config_path = dest
@@ -516,11 +525,13 @@ def __init__(
         super().__init__(
             option_strings=option_strings,
             dest=dest,
-            nargs=0,
+            nargs=nargs,
             const=const,
             default=default,
+            type=type,
             required=required,
             help=help,
+            metavar=metavar,
         )
 
     def __call__(self, parser, namespace, values, option_string):
@@ -528,7 +539,8 @@ def __call__(self, parser, namespace, values, option_string):
         # the const from the constructor or a value from the CLI.
         # Note that this is only called if the argument is actually
         # specified on the command line.
-        spack.config.set(self.config_path, self.const, scope="command_line")
+        value = self.const if self.nargs == 0 else values
+        spack.config.set(self.config_path, value, scope="command_line")
 
 
 def add_concretizer_args(subparser):
@@ -578,6 +590,32 @@ def add_concretizer_args(subparser):
         default=None,
         help="allow concretizer to select deprecated versions",
     )
+    subgroup.add_argument(
+        "--solve-timeout",
+        action=ConfigSetAction,
+        dest="concretizer:timeout",
+        nargs=None,
+        type=float,
+        metavar="SECONDS",
+        default=None,
+        help="stop optimizing after SECONDS and use the best solution found so far",
+    )
+    subgroup.add_argument(
+        "--explain",
+        action=ConfigSetAction,
+        dest="concretizer:explain",
+        const=True,
+        default=None,
+        help="explain why specs cannot be concretized, with the causes of each error",
+    )
+    subgroup.add_argument(
+        "--no-explain",
+        action=ConfigSetAction,
+        dest="concretizer:explain",
+        const=False,
+        default=None,
+        help="report only the errors when specs cannot be concretized, which is faster",
+    )
 
 
 def add_connection_args(subparser, add_help):
@@ -13,6 +13,7 @@
 from llnl.string import plural
 from llnl.util import lang, tty
 
+import spack.build_history
 import spack.cmd
 import spack.config
 import spack.environment as ev
@@ -20,9 +21,11 @@
 import spack.report
 import spack.spec
 import spack.store
+import spack.util.trace
 from spack.cmd.common import arguments
 from spack.error import InstallError, SpackError
 from spack.installer import PackageInstaller
+from spack.util.cpus import cpus_available
 
 description = "build and install packages"
 section = "build"
@@ -50,6 +53,8 @@ def install_kwargs_from_args(args):
         "keep_prefix": args.keep_prefix,
         "keep_stage": args.keep_stage,
         "restage": not args.dont_restage,
+        "resume": args.resume,
+        "cooperative": args.cooperative,
         "install_source": args.install_source,
         "verbose": args.verbose or args.install_verbose,
         "fake": args.fake,
@@ -85,6 +90,32 @@ def setup_parser(subparser):
         help="phase to stop after when installing (default None)",
     )
     arguments.add_common_arguments(subparser, ["jobs"])
+    subparser.add_argument(
+        "-p",
+        "--concurrent-packages",
+        type=int,
+        default=None,
+        help="maximum number of packages to build concurrently",
+    )
+    subparser.add_argument(
+        "--cooperative",
+        action="store_true",
+        help="share the install with other cooperative spack install processes\n\n"
+        "processes using the same store, on this node or on other nodes, claim packages in "
+        "a shared ledger and wait for each other instead of polling prefix locks",
+    )
+    subparser.add_argument(
+        "--estimate",
+        action="store_true",
+        help="print the predicted wall time and critical path of the install, "
+        "based on the history of past installs, instead of installing",
+    )
+    subparser.add_argument(
+        "--cores",
+        type=int,
+        default=None,
+        help="number of cores assumed by --estimate (default: number of available cores)",
+    )
     subparser.add_argument(
         "--overwrite",
         action="store_true",
@@ -110,6 +141,21 @@ def setup_parser(subparser):
         action="store_true",
         help="if a partial install is detected, don't delete prior state",
     )
+    subparser.add_argument(
+        "--trace",
+        metavar="FILE",
+        default=None,
+        help="write a timeline of the install to FILE\n\n"
+        "the file is in the Chrome trace event format, and can be viewed with "
+        "chrome://tracing or https://ui.perfetto.dev",
+    )
+    subparser.add_argument(
+        "--resume",
+        action="store_true",
+        help="resume failed builds after the last phase they completed\n\n"
+        "phases are skipped only if the build stage was kept, and the spec, sources and "
+        "build environment did not change",
+    )
 
     cache_group = subparser.add_mutually_exclusive_group()
     cache_group.add_argument(
@@ -284,6 +330,38 @@ def require_user_confirmation_for_overwrite(concrete_specs, args):
         tty.die("Reinstallation aborted.")
 
 
+def print_estimate(args, specs: List[spack.spec.Spec], install_kwargs) -> None:
+    """Print the predicted wall time and critical path to install concrete specs."""
+    cores = args.cores or cpus_available()
+    estimate = spack.build_history.estimate(
+        specs,
+        cores,
+        concurrent_packages=args.concurrent_packages,
+        use_cache=install_kwargs["dependencies_use_cache"],
+    )
+    if not estimate.durations:
+        tty.msg("All the specs are already installed")
+        return
+
+    tty.msg(
+        f"Estimated time to install {plural(len(estimate.durations), 'package')} "
+        f"with {cores} cores and {plural(estimate.concurrent_packages, 'concurrent package')}: "
+        f"{lang.pretty_hms(estimate.wall_time) or '0s'}"
+    )
+    tty.msg(f"Critical path: {lang.pretty_hms(estimate.critical_path_time) or '0s'}")
+    for spec in estimate.critical_path:
+        _, seconds, from_cache = estimate.durations[spec.dag_hash()]
+        source = "binary" if from_cache else "source"
+        duration = lang.pretty_hms(seconds) or "0s"
+        print(f"    {spec.cformat('{name}{@version}{/hash:7}')}  {duration} ({source})")
+
+    if estimate.unknown:
+        tty.warn(
+            f"{plural(len(estimate.unknown), 'package')} never installed before, assuming "
+            f"an average install time: {', '.join(sorted(s.name for s in estimate.unknown))}"
+        )
+
+
 def _dump_log_on_error(e: InstallError):
     e.print_context()
     assert e.pkg, "Expected InstallError to include the associated package"
@@ -323,6 +401,19 @@ def install(parser, args):
     if args.no_checksum:
         spack.config.set("config:checksum", False, scope="command_line")
 
+    if args.concurrent_packages is not None:
+        if args.concurrent_packages < 1:
+            tty.die("the '--concurrent-packages' argument must be a positive integer")
+        spack.config.set(
+            "config:concurrent_packages", args.concurrent_packages, scope="command_line"
+        )
+
+    if args.cores is not None:
+        if not args.estimate:
+            tty.die("the '--cores' argument can only be used with '--estimate'")
+        if args.cores < 1:
+            tty.die("the '--cores' argument must be a positive integer")
+
     if args.log_file and not args.log_format:
         msg = "the '--log-format' must be specified when using '--log-file'"
         tty.die(msg)
@@ -344,15 +435,21 @@ def reporter_factory(specs):
     if not env and not args.spec and not args.specfiles:
         _die_require_env()
 
+    if args.trace:
+        spack.util.trace.enable(args.trace)
+
     try:
-        if env:
-            install_with_active_env(env, args, install_kwargs, reporter_factory)
-        else:
-            install_without_active_env(args, install_kwargs, reporter_factory)
+        with spack.util.trace.span("spack install", "command"):
+            if env:
+                install_with_active_env(env, args, install_kwargs, reporter_factory)
+            else:
+                install_without_active_env(args, install_kwargs, reporter_factory)
     except InstallError as e:
         if args.show_log_on_error:
             _dump_log_on_error(e)
         raise
+    finally:
+        spack.util.trace.finish()
 
 
 def _maybe_add_and_concretize(args, env, specs):
@@ -372,7 +469,8 @@ def _maybe_add_and_concretize(args, env, specs):
 
         # `spack concretize`
         tests = compute_tests_install_kwargs(env.user_specs, args.test)
-        concretized_specs = env.concretize(tests=tests)
+        with spack.util.trace.span("concretize", "concretize"):
+            concretized_specs = env.concretize(tests=tests)
         if concretized_specs:
             tty.msg(f"Concretized {plural(len(concretized_specs), 'spec')}")
             ev.display_specs([concrete for _, concrete in concretized_specs])
@@ -411,6 +509,10 @@ def install_with_active_env(env: ev.Environment, args, install_kwargs, reporter_
 
     install_kwargs["tests"] = compute_tests_install_kwargs(specs_to_install, args.test)
 
+    if args.estimate:
+        print_estimate(args, specs_to_install, install_kwargs)
+        return
+
     if args.overwrite:
         require_user_confirmation_for_overwrite(specs_to_install, args)
         install_kwargs["overwrite"] = [spec.dag_hash() for spec in specs_to_install]
@@ -429,9 +531,10 @@ def concrete_specs_from_cli(args, install_kwargs):
     abstract_specs = spack.cmd.parse_specs(args.spec)
     install_kwargs["tests"] = compute_tests_install_kwargs(abstract_specs, args.test)
     try:
-        concrete_specs = spack.cmd.parse_specs(
-            args.spec, concretize=True, tests=install_kwargs["tests"]
-        )
+        with spack.util.trace.span("concretize", "concretize"):
+            concrete_specs = spack.cmd.parse_specs(
+                args.spec, concretize=True, tests=install_kwargs["tests"]
+            )
     except SpackError as e:
         tty.debug(e)
         if args.log_format is not None:
@@ -467,6 +570,10 @@ def install_without_active_env(args, install_kwargs, reporter_factory):
     if len(concrete_specs) == 0:
         tty.die("The `spack install` command requires a spec to install.")
 
+    if args.estimate:
+        print_estimate(args, concrete_specs, install_kwargs)
+        return
+
     with reporter_factory(concrete_specs):
         if args.overwrite:
             require_user_confirmation_for_overwrite(concrete_specs, args)
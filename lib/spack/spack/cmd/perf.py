@@ -0,0 +1,160 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import llnl.util.tty as tty
+import llnl.util.tty.color as color
+from llnl.util.lang import pretty_seconds
+
+import spack.solver.benchmark as benchmark
+
+description = "measure the performance of Spack"
+section = "developer"
+level = "long"
+
+
+def setup_parser(subparser):
+    sp = subparser.add_subparsers(metavar="SUBCOMMAND", dest="perf_command")
+
+    concretize = sp.add_parser(
+        "concretize",
+        help="benchmark the concretizer on a corpus of specs and environments",
+        description="benchmark the concretizer on a corpus of specs and environments\n\n"
+        "each case of the corpus is concretized several times against the builtin.mock "
+        "repository, each time in a new process. Results can be saved, and compared with "
+        "a baseline obtained e.g. with another version of Spack",
+    )
+    concretize.add_argument(
+        "--corpus",
+        metavar="FILE",
+        default=benchmark.DEFAULT_CORPUS,
+        help="YAML file with the cases to be concretized (default: the corpus of Spack)",
+    )
+    concretize.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=5,
+        help="number of times each case is concretized (default: 5)",
+    )
+    concretize.add_argument(
+        "--case",
+        action="append",
+        dest="cases",
+        metavar="NAME",
+        help="run only this case (can be repeated)",
+    )
+    concretize.add_argument(
+        "-o", "--output", metavar="FILE", help="write the results to FILE, as JSON"
+    )
+    concretize.add_argument(
+        "--baseline",
+        metavar="FILE",
+        help="compare the results with a baseline written by --output, and exit with "
+        "a non-zero status if any case regressed",
+    )
+    concretize.add_argument(
+        "--metric",
+        action="append",
+        dest="metrics",
+        choices=benchmark.METRICS,
+        help="metric compared with the baseline (can be repeated, default: total and "
+        "peak_memory)",
+    )
+    concretize.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="significance level of the test for regressions (default: 0.05)",
+    )
+    concretize.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        metavar="PERCENT",
+        help="smallest change of the median that is reported (default: 10)",
+    )
+
+
+def _format_metric(metric, value):
+    if value is None:
+        return "-"
+    if metric == "peak_memory":
+        return f"{value / 2**20:.1f}MB"
+    return pretty_seconds(value)
+
+
+def _print_results(results):
+    columns = benchmark.METRICS
+    rows = [
+        [name, str(case["nodes"])]
+        + [_format_metric(m, benchmark.median(case["samples"][m])) for m in columns]
+        for name, case in results["benchmark"]["cases"].items()
+    ]
+    header = ["case", "nodes"] + list(columns)
+    widths = [max(len(x) for x in column) for column in zip(header, *rows)]
+    fmt = "  %%-%ds" % widths[0] + "".join("  %%%ds" % w for w in widths[1:])
+    color.cprint("@*{%s}" % (fmt % tuple(header)))
+    for row in rows:
+        print(fmt % tuple(row))
+
+
+def _print_comparisons(comparisons):
+    colors = {"regression": "@R{regression}", "improvement": "@G{improvement}", "": ""}
+    for c in comparisons:
+        color.cprint(
+            "  %-30s %-12s %10s -> %10s  %+7.1f%%  p=%.3f  %s"
+            % (
+                c.case,
+                c.metric,
+                _format_metric(c.metric, c.baseline),
+                _format_metric(c.metric, c.current),
+                100 * c.change,
+                c.p_value,
+                colors[c.status],
+            )
+        )
+
+
+def perf_concretize(args):
+    if args.repeat < 1:
+        tty.die("the number of repetitions must be at least 1")
+
+    baseline = benchmark.read_results(args.baseline) if args.baseline else None
+    corpus = benchmark.load_corpus(args.corpus)
+
+    def _progress(case, i, metrics):
+        tty.verbose(f"{case.name} [{i + 1}/{args.repeat}] {pretty_seconds(metrics['total'])}")
+
+    tty.msg(f"Concretizing the cases of version {corpus.version} of the corpus")
+    results = benchmark.run(corpus, args.repeat, cases=args.cases, on_sample=_progress)
+    _print_results(results)
+
+    if args.output:
+        benchmark.write_results(results, args.output)
+        tty.msg(f"Results written to {args.output}")
+
+    if baseline is None:
+        return
+
+    comparisons = benchmark.compare(
+        baseline,
+        results,
+        alpha=args.alpha,
+        threshold=args.threshold / 100,
+        metrics=args.metrics or benchmark.DEFAULT_COMPARED_METRICS,
+    )
+    print()
+    tty.msg(f"Comparison with {args.baseline}")
+    _print_comparisons(comparisons)
+
+    regressions = [c for c in comparisons if c.status == "regression"]
+    if regressions:
+        tty.error(f"{len(regressions)} regressions with respect to the baseline")
+        return 1
+
+
+def perf(parser, args):
+    action = {"concretize": perf_concretize}
+    return action[args.perf_command](args)
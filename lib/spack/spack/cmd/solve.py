@@ -15,9 +15,11 @@
 import spack.cmd.common.arguments
 import spack.config
 import spack.environment
+import spack.error
 import spack.hash_types as ht
 import spack.solver.asp as asp
 import spack.spec
+import spack.util.spack_json as sjson
 from spack.cmd.common import arguments
 
 description = "concretize a specs using an ASP solver"
@@ -86,6 +88,14 @@ def setup_parser(subparser):
     subparser.add_argument(
         "--stats", action="store_true", default=False, help="print out statistics from clingo"
     )
+    subparser.add_argument(
+        "--profile",
+        metavar="FILE",
+        default=None,
+        help="write a JSON profile of the solve to FILE\n\n"
+        "facts, ground atoms and setup time by package and by category of facts, "
+        "and the time spent in each phase of the solve",
+    )
     subparser.add_argument("specs", nargs=argparse.REMAINDER, help="specs of packages")
 
     spack.cmd.common.arguments.add_concretizer_args(subparser)
@@ -95,6 +105,8 @@ def _process_result(result, show, required_format, kwargs):
     opt, _, _ = min(result.answers)
     if ("opt" in show) and (not required_format):
         tty.msg("Best of %d considered solutions." % result.nmodels)
+        if result.optimal is False:
+            tty.msg("The solver timed out: the best solution is not proven optimal.")
         tty.msg("Optimization Criteria:")
 
         maxlen = max(len(s[2]) for s in result.criteria)
@@ -175,33 +187,61 @@ def solve(parser, args):
     setup_only = set(show) == {"asp"}
     unify = spack.config.get("concretizer:unify")
     allow_deprecated = spack.config.get("config:deprecated", False)
-    if unify != "when_possible":
-        # set up solver parameters
-        # Note: reuse and other concretizer prefs are passed as configuration
-        result = solver.solve(
-            specs,
-            out=output,
-            timers=args.timers,
-            stats=args.stats,
-            setup_only=setup_only,
-            allow_deprecated=allow_deprecated,
-        )
-        if not setup_only:
-            _process_result(result, show, required_format, kwargs)
-    else:
-        for idx, result in enumerate(
-            solver.solve_in_rounds(
+    results = []
+    error_profile = None
+    try:
+        if unify != "when_possible":
+            # set up solver parameters
+            # Note: reuse and other concretizer prefs are passed as configuration
+            result = solver.solve(
                 specs,
                 out=output,
                 timers=args.timers,
                 stats=args.stats,
+                setup_only=setup_only,
                 allow_deprecated=allow_deprecated,
+                profile=bool(args.profile),
             )
-        ):
-            if "solutions" in show:
-                tty.msg("ROUND {0}".format(idx))
-                tty.msg("")
-            else:
-                print("% END ROUND {0}\n".format(idx))
+            results.append(result)
             if not setup_only:
                 _process_result(result, show, required_format, kwargs)
+        else:
+            for idx, result in enumerate(
+                solver.solve_in_rounds(
+                    specs,
+                    out=output,
+                    timers=args.timers,
+                    stats=args.stats,
+                    allow_deprecated=allow_deprecated,
+                    profile=bool(args.profile),
+                )
+            ):
+                results.append(result)
+                if "solutions" in show:
+                    tty.msg("ROUND {0}".format(idx))
+                    tty.msg("")
+                else:
+                    print("% END ROUND {0}\n".format(idx))
+                if not setup_only:
+                    _process_result(result, show, required_format, kwargs)
+    except spack.error.SpackError as e:
+        # The profile of a solve that failed is attached to the error
+        error_profile = getattr(e, "profile", None)
+        raise
+    finally:
+        if args.profile:
+            profiles = [r.profile for r in results if r.profile is not None]
+            if error_profile is not None:
+                profiles.append(error_profile)
+            _write_profile(args.profile, profiles)
+
+
+def _write_profile(path, profiles):
+    """Write the profiles of the solves, one per round, to a JSON file"""
+    if not profiles:
+        tty.warn(f"No profile written to {path}, since no solve was profiled")
+        return
+
+    with open(path, "w") as f:
+        sjson.dump({"solves": profiles}, f)
+    tty.msg(f"Profile of the solve written to {path}")
@@ -60,6 +60,7 @@
 import spack.traverse as tr
 import spack.util.lock as lk
 import spack.util.spack_json as sjson
+import spack.util.trace
 import spack.version as vn
 from spack.directory_layout import (
     DirectoryLayout,
@@ -107,6 +108,14 @@
 #: ensure a failed install is properly tracked).
 _DEFAULT_PKG_LOCK_TIMEOUT = None
 
+#: Default maximum number of writes appended to the journal during a group commit,
+#: before the whole index is written again
+_DEFAULT_GROUP_COMMIT_WRITES = 64
+
+#: Default maximum time in seconds between two writes of the whole index during a
+#: group commit
+_DEFAULT_GROUP_COMMIT_INTERVAL = 60.0
+
 #: Types of dependencies tracked by the database
 #: We store by DAG hash, so we track the dependencies that the DAG hash includes.
 _TRACKED_DEPENDENCIES = ht.dag_hash.depflag
@@ -559,6 +568,17 @@ def _path(self, spec: "spack.spec.Spec") -> pathlib.Path:
 SelectType = Callable[[InstallRecord], bool]
 
 
+class GroupCommit(NamedTuple):
+    """Thresholds of a group commit, after which the whole index is written again"""
+
+    #: Process in which the group commit is active
+    pid: int
+    #: Maximum number of writes appended to the journal
+    max_writes: int
+    #: Maximum time in seconds between two writes of the whole index
+    interval: float
+
+
 class Database:
     #: Fields written for each install record
     record_fields: Tuple[str, ...] = DEFAULT_INSTALL_RECORD_FIELDS
@@ -598,6 +618,7 @@ def __init__(
         # Set up layout of database files within the db dir
         self._index_path = os.path.join(self.database_directory, "index.json")
         self._verifier_path = os.path.join(self.database_directory, "index_verifier")
+        self._journal_path = os.path.join(self.database_directory, "index_journal")
         self._lock_path = os.path.join(self.database_directory, "lock")
 
         # Create needed directories and files
@@ -641,6 +662,18 @@ def __init__(
         self._write_transaction_impl = lk.WriteTransaction
         self._read_transaction_impl = lk.ReadTransaction
 
+        # State of the group commit, if one is active. Records modified by the current write
+        # transaction are collected in ``_journal_records``, and appended to the journal when
+        # the transaction ends.
+        self._group_commit: Optional[GroupCommit] = None
+        self._journal_records: Dict[str, dict] = {}
+        self._journal_writes = 0
+        self._last_index_write = 0.0
+        self._index_is_current = False
+        # The verifier changes only when the whole index is written, so readers also check
+        # whether the journal grew since they last read it
+        self._last_seen_journal_size = 0
+
     def write_transaction(self):
         """Get a write lock context manager for use in a `with` block."""
         return self._write_transaction_impl(self.lock, acquire=self._read, release=self._write)
@@ -649,6 +682,78 @@ def read_transaction(self):
         """Get a read lock context manager for use in a `with` block."""
         return self._read_transaction_impl(self.lock, acquire=self._read)
 
+    @contextlib.contextmanager
+    def group_commit(
+        self,
+        max_writes: int = _DEFAULT_GROUP_COMMIT_WRITES,
+        interval: float = _DEFAULT_GROUP_COMMIT_INTERVAL,
+    ) -> Generator[None, None, None]:
+        """Context manager that groups the writes of ``add()`` and ``mark()`` to the index.
+
+        Within the context, these operations append the records they modify to a journal
+        next to the index, instead of writing the whole index. The journal is merged into
+        the index every ``max_writes`` writes, every ``interval`` seconds, and when leaving
+        the context. Readers, in this or other processes, apply the journal on top of the
+        index, so no update is lost if Spack is interrupted before the journal is merged.
+
+        Other write transactions write the whole index, and merge the journal, as usual.
+
+        Args:
+            max_writes: maximum number of writes appended to the journal
+            interval: maximum time in seconds between two writes of the whole index
+        """
+        if self.is_upstream or self._group_commit is not None:
+            yield
+            return
+
+        self._group_commit = GroupCommit(os.getpid(), max_writes, interval)
+        self._journal_writes = 0
+        self._last_index_write = time.monotonic()
+        try:
+            yield
+        finally:
+            self._group_commit = None
+            if os.path.exists(self._journal_path):
+                with self.write_transaction():
+                    pass
+
+    def _journal(self, keys: Iterable[str]) -> None:
+        """Collect the records to be journaled at the end of the current write transaction.
+
+        Records are journaled only within a group commit, when the modification being
+        journaled is the only one of the transaction. Otherwise the whole index is written.
+        """
+        group = self._group_commit
+        if group is None or group.pid != os.getpid() or self.lock.write_depth() != 1:
+            return
+
+        for key in keys:
+            if key in self._data:
+                self._journal_records[key] = self._data[key].to_dict(
+                    include_fields=self.record_fields
+                )
+
+    def _read_journal(self) -> Dict[str, dict]:
+        """Return the records in the journal, from the oldest to the most recent write.
+
+        An incomplete last line, left by an interrupted write, is ignored.
+        """
+        records: Dict[str, dict] = {}
+        try:
+            with open(self._journal_path, "r") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return records
+
+        for line in lines:
+            try:
+                entry = sjson.load(line)
+            except ValueError:
+                continue
+            if entry.get("version") == str(_DB_VERSION):
+                records.update(entry["installs"])
+        return records
+
     def _write_to_file(self, stream):
         """Write out the database in JSON format to the stream passed
         as argument.
@@ -820,6 +925,11 @@ def check(cond, msg):
             check("installs" in db, "no 'installs' in JSON DB.")
             installs = db["installs"]
 
+        # Records written by a group commit are not in the index yet
+        self._index_is_current = version == _DB_VERSION
+        if self._index_is_current and filename == self._index_path:
+            installs.update(self._read_journal())
+
         spec_reader = reader(version)
 
         def invalid_record(hash_key, error):
@@ -1041,8 +1151,13 @@ def _write(self, type, value, traceback):
         database *may* be left in an inconsistent state.  It will be consistent
         after the start of the next transaction, when it read from disk again.
 
+        Within a group commit, the records modified by the transaction may be appended
+        to the journal instead.
+
         This routine does no locking.
         """
+        journal_records, self._journal_records = self._journal_records, {}
+
         # Do not write if exceptions were raised
         if type is not None:
             # A failure interrupted a transaction, so we should record that
@@ -1051,6 +1166,10 @@ def _write(self, type, value, traceback):
             self._state_is_inconsistent = True
             return
 
+        if journal_records and self._can_append_to_journal():
+            self._append_to_journal(journal_records)
+            return
+
         temp_file = self._index_path + (".%s.%s.temp" % (_getfqdn(), os.getpid()))
 
         # Write a temporary database file them move it into place
@@ -1059,11 +1178,17 @@ def _write(self, type, value, traceback):
                 self._write_to_file(f)
             fs.rename(temp_file, self._index_path)
 
-            if _use_uuid:
-                with open(self._verifier_path, "w") as f:
-                    new_verifier = str(uuid.uuid4())
-                    f.write(new_verifier)
-                    self.last_seen_verifier = new_verifier
+            # The journal was read at the beginning of the transaction, so its records are
+            # in the index now. If we are interrupted before it is removed, its records are
+            # applied again on top of the index, which is harmless.
+            if os.path.exists(self._journal_path):
+                os.remove(self._journal_path)
+            self._journal_writes = 0
+            self._last_seen_journal_size = 0
+            self._last_index_write = time.monotonic()
+            self._index_is_current = True
+
+            self._update_verifier()
         except BaseException as e:
             tty.debug(e)
             # Clean up temp file if something goes wrong.
@@ -1071,6 +1196,42 @@ def _write(self, type, value, traceback):
                 os.remove(temp_file)
             raise
 
+    def _can_append_to_journal(self) -> bool:
+        """Whether the group commit can append a write to the journal, or the whole index
+        is due to be written."""
+        group = self._group_commit
+        return (
+            group is not None
+            and self._index_is_current
+            and os.path.isfile(self._index_path)
+            and self._journal_writes + 1 < group.max_writes
+            and time.monotonic() - self._last_index_write < group.interval
+        )
+
+    def _append_to_journal(self, records: Dict[str, dict]) -> None:
+        """Append records to the journal, and make sure they are on disk before returning."""
+        line = sjson.dump({"version": str(_DB_VERSION), "installs": records})
+        with open(self._journal_path, "a") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            self._last_seen_journal_size = f.tell()
+        self._journal_writes += 1
+
+    def _journal_size(self) -> int:
+        try:
+            return os.path.getsize(self._journal_path)
+        except OSError:
+            return 0
+
+    def _update_verifier(self) -> None:
+        """Signal other processes that the database changed."""
+        if _use_uuid:
+            with open(self._verifier_path, "w") as f:
+                new_verifier = str(uuid.uuid4())
+                f.write(new_verifier)
+                self.last_seen_verifier = new_verifier
+
     def _read(self):
         """Re-read Database from the data in the set location. This does no locking."""
         if os.path.isfile(self._index_path):
@@ -1081,8 +1242,14 @@ def _read(self):
                         current_verifier = f.read()
                 except BaseException:
                     pass
-            if (current_verifier != self.last_seen_verifier) or (current_verifier == ""):
+            journal_size = self._journal_size()
+            if (
+                current_verifier != self.last_seen_verifier
+                or current_verifier == ""
+                or journal_size != self._last_seen_journal_size
+            ):
                 self.last_seen_verifier = current_verifier
+                self._last_seen_journal_size = journal_size
                 # Read from file if a database exists
                 self._read_from_file(self._index_path)
             elif self._state_is_inconsistent:
@@ -1208,8 +1375,9 @@ def add(self, spec: "spack.spec.Spec", *, explicit: bool = False, allow_missing=
         """
         # TODO: ensure that spec is concrete?
         # Entire add is transactional.
-        with self.write_transaction():
+        with spack.util.trace.span(f"add {spec.name}", "database"), self.write_transaction():
             self._add(spec, explicit=explicit, allow_missing=allow_missing)
+            self._journal(s.dag_hash() for s in spec.traverse(deptype=_TRACKED_DEPENDENCIES))
 
     def _get_matching_spec_key(self, spec: "spack.spec.Spec", **kwargs) -> str:
         """Get the exact spec OR get a single spec that matches."""
@@ -1342,8 +1510,9 @@ def mark(self, spec: "spack.spec.Spec", key, value) -> None:
             return self._mark(spec, key, value)
 
     def _mark(self, spec: "spack.spec.Spec", key, value) -> None:
-        record = self._data[self._get_matching_spec_key(spec)]
-        setattr(record, key, value)
+        spec_key = self._get_matching_spec_key(spec)
+        setattr(self._data[spec_key], key, value)
+        self._journal([spec_key])
 
     @_autospec
     def deprecate(self, spec: "spack.spec.Spec", deprecator: "spack.spec.Spec") -> None:
@@ -0,0 +1,183 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Index of the direct dependencies of packages, and of the virtuals they provide.
+
+The possible dependencies of a spec can be computed from this index alone, without
+importing the ``package.py`` files of all the packages that are reached.
+"""
+import copy
+from typing import Dict, List, Optional, Set
+
+import spack.deptypes as dt
+import spack.error
+import spack.util.spack_json as sjson
+
+
+class DependencyIndex:
+    """Maps package names to their direct dependencies, and to the virtuals they provide.
+
+    Dependencies are stored with the union of their types, over all the conditions
+    under which they are declared.
+    """
+
+    def __init__(self, repository):
+        #: package name -> direct dependency name -> union of the dependency types
+        self.dependencies: Dict[str, Dict[str, dt.DepFlag]] = {}
+        #: package name -> names of the virtuals it can provide
+        self.provides: Dict[str, List[str]] = {}
+        self.repository = repository
+
+    def to_json(self, stream=None):
+        """Dump a JSON representation of this object.
+
+        Args:
+            stream: stream where to dump
+        """
+        packages = {
+            name: {
+                "dependencies": {
+                    dep: list(dt.flag_to_tuple(depflag)) for dep, depflag in deps.items()
+                },
+                "provides": self.provides.get(name, []),
+            }
+            for name, deps in self.dependencies.items()
+        }
+        sjson.dump({"dependency_index": {"packages": packages}}, stream)
+
+    @staticmethod
+    def from_json(stream, repository):
+        """Construct a dependency index from its JSON representation.
+
+        Args:
+            stream: stream where to read from the JSON data
+        """
+        data = sjson.load(stream)
+
+        if not isinstance(data, dict):
+            raise DependencyIndexError("JSON DependencyIndex data was not a dict.")
+
+        if "dependency_index" not in data:
+            raise DependencyIndexError(
+                "JSON DependencyIndex does not start with 'dependency_index'"
+            )
+
+        index = DependencyIndex(repository=repository)
+        for name, entry in data["dependency_index"]["packages"].items():
+            index.dependencies[name] = {
+                dep: dt.flag_from_strings(types) for dep, types in entry["dependencies"].items()
+            }
+            index.provides[name] = entry["provides"]
+        return index
+
+    def copy(self):
+        """Return a deep copy of this index."""
+        clone = DependencyIndex(repository=self.repository)
+        clone.dependencies = copy.deepcopy(self.dependencies)
+        clone.provides = copy.deepcopy(self.provides)
+        return clone
+
+    def merge(self, other):
+        """Merge another dependency index into this one. Packages in the other index
+        take precedence.
+
+        Args:
+            other (DependencyIndex): dependency index to be merged
+        """
+        other = other.copy()  # defensive copy.
+        self.dependencies.update(other.dependencies)
+        self.provides.update(other.provides)
+
+    def update_package(self, pkg_name):
+        """Updates a package in the dependency index.
+
+        Args:
+            pkg_name (str): name of the package to be updated
+        """
+        self.dependencies.pop(pkg_name, None)
+        self.provides.pop(pkg_name, None)
+        if not self.repository.exists(pkg_name):
+            return
+
+        pkg_cls = self.repository.get_pkg_class(pkg_name)
+        deps: Dict[str, dt.DepFlag] = {}
+        for name, conditions in pkg_cls.dependencies_by_name(when=True).items():
+            for deplist in conditions.values():
+                for dep in deplist:
+                    deps[name] = deps.get(name, dt.NONE) | dep.depflag
+        self.dependencies[pkg_name] = deps
+        self.provides[pkg_name] = pkg_cls.provided_virtual_names()
+
+    def dependencies_of_type(self, pkg_name: str, depflag: dt.DepFlag) -> Set[str]:
+        """Names of the direct dependencies of a package that can have these types."""
+        deps = self.dependencies.get(pkg_name, {})
+        return {name for name, types in deps.items() if types & depflag}
+
+    def provided_virtual_names(self, pkg_name: str) -> List[str]:
+        """Sorted list of names of virtuals that can be provided by a package."""
+        return self.provides.get(pkg_name, [])
+
+    def possible_dependencies(
+        self,
+        *pkg_names: str,
+        transitive: bool = True,
+        expand_virtuals: bool = True,
+        depflag: dt.DepFlag = dt.ALL,
+        visited: Optional[dict] = None,
+        missing: Optional[dict] = None,
+        virtuals: Optional[set] = None,
+    ) -> Dict[str, Set[str]]:
+        """Return dict of possible dependencies of packages, computed from this index.
+
+        See ``PackageBase.possible_dependencies`` for the meaning of the arguments,
+        and of the return value.
+        """
+        visited = {} if visited is None else visited
+        missing = {} if missing is None else missing
+
+        to_visit = list(reversed(pkg_names))
+        while to_visit:
+            name = to_visit.pop()
+            visited.setdefault(name, set())
+
+            for dep_name, dep_flag in self.dependencies.get(name, {}).items():
+                # check whether this dependency could be of the type asked for
+                if not (depflag & dep_flag):
+                    continue
+
+                # expand virtuals if enabled, otherwise just stop at virtuals
+                if self.repository.is_virtual(dep_name):
+                    if virtuals is not None:
+                        virtuals.add(dep_name)
+                    if not expand_virtuals:
+                        visited[name].add(dep_name)
+                        visited.setdefault(dep_name, set())
+                        continue
+                    dep_names = [s.name for s in self.repository.providers_for(dep_name)]
+                else:
+                    dep_names = [dep_name]
+
+                visited[name].update(dep_names)
+                for child in dep_names:
+                    if child in visited:
+                        continue
+
+                    visited.setdefault(child, set())
+
+                    # skip the rest if not transitive
+                    if not transitive:
+                        continue
+
+                    # log unknown packages
+                    if not self.repository.exists(child):
+                        missing.setdefault(name, set()).add(child)
+                        continue
+
+                    to_visit.append(child)
+
+        return visited
+
+
+class DependencyIndexError(spack.error.SpackError):
+    """Raised when there is a problem with a DependencyIndex."""
@@ -6,6 +6,7 @@
 import collections.abc
 import contextlib
 import errno
+import multiprocessing
 import os
 import pathlib
 import re
@@ -1537,13 +1538,46 @@ def _concretize_together_where_possible(
         self.concretized_order = []
         self.specs_by_hash = {}
 
+        # Specs that cannot share any node are solved independently, in parallel
         result_by_user_spec = {}
-        solver = spack.solver.asp.Solver()
         allow_deprecated = spack.config.get("config:deprecated", False)
-        for result in solver.solve_in_rounds(
-            specs_to_concretize, tests=tests, allow_deprecated=allow_deprecated
-        ):
-            result_by_user_spec.update(result.specs_by_input)
+        clusters = _independent_clusters(specs_to_concretize, tests=tests)
+        if len(clusters) > 1:
+            self._prepare_parallel_concretization()
+            num_procs = min(len(clusters), spack.config.determine_number_of_jobs(parallel=True))
+            tty.msg(
+                f"Concretizing {len(clusters)} independent groups of specs "
+                f"with {num_procs} processes"
+            )
+            args = [(cluster, tests, allow_deprecated) for cluster in clusters]
+            cluster_results = []
+            for specs_by_input, duration in spack.util.parallel.imap_unordered(
+                _concretize_cluster_task,
+                args,
+                processes=num_procs,
+                debug=tty.is_debug(),
+                maxtaskperchild=1,
+            ):
+                tty.verbose(f"{duration:6.1f}s {len(specs_by_input)} specs")
+                cluster_results.append(list(specs_by_input.values()))
+                result_by_user_spec.update(specs_by_input)
+
+            # The groups may share runtimes and build tools, which a single solve could
+            # have unified differently
+            if not _clusters_agree(cluster_results):
+                tty.debug(
+                    "Solving all the specs together, since the independent groups use "
+                    "different runtimes or build tools"
+                )
+                result_by_user_spec = {}
+                clusters = [specs_to_concretize]
+
+        if len(clusters) == 1:
+            solver = spack.solver.asp.Solver()
+            for result in solver.solve_in_rounds(
+                specs_to_concretize, tests=tests, allow_deprecated=allow_deprecated
+            ):
+                result_by_user_spec.update(result.specs_by_input)
 
         result = []
         for abstract, concrete in sorted(result_by_user_spec.items()):
@@ -1554,6 +1588,12 @@ def _concretize_together_where_possible(
                 result.append((abstract, concrete))
             self._add_concrete_spec(abstract, concrete)
 
+        # Specs solved in different processes don't share the objects of common nodes
+        if len(clusters) > 1:
+            by_hash = {concrete.dag_hash(): concrete for _, concrete in result}
+            self._unify_concrete_specs(by_hash, tests=tests)
+            result = [(abstract, self.specs_by_hash[c.dag_hash()]) for abstract, c in result]
+
         return result
 
     def _concretize_together(
@@ -1567,6 +1607,28 @@ def _concretize_together(
         if not new_user_specs:
             return []
 
+        # Try first to solve only for the new user specs, if requested
+        if kept_user_specs and spack.config.get("concretizer:incremental", False):
+            kept = [(s, c) for s, c in self.concretized_specs() if s in kept_user_specs]
+            new_concrete_specs = self._concretize_new_roots(
+                list(new_user_specs), [c for _, c in kept], tests=tests
+            )
+            if new_concrete_specs is not None:
+                self.concretized_user_specs = []
+                self.concretized_order = []
+                self.specs_by_hash = {}
+                concretized_specs = list(zip(new_user_specs, new_concrete_specs)) + kept
+                for abstract, concrete in concretized_specs:
+                    self._add_concrete_spec(abstract, concrete)
+
+                # The new specs don't share the objects of common nodes with the kept ones
+                by_hash = {c.dag_hash(): c for c in new_concrete_specs}
+                self._unify_concrete_specs(by_hash, tests=tests)
+                return [
+                    (abstract, self.specs_by_hash[concrete.dag_hash()])
+                    for abstract, concrete in zip(new_user_specs, new_concrete_specs)
+                ]
+
         self.concretized_user_specs = []
         self.concretized_order = []
         self.specs_by_hash = {}
@@ -1600,11 +1662,53 @@ def _concretize_together(
         # zip truncates the longer list, which is exactly what we want here
         return list(zip(new_user_specs, concrete_specs))
 
+    def _concretize_new_roots(
+        self,
+        new_user_specs: List[spack.spec.Spec],
+        kept_specs: List[spack.spec.Spec],
+        tests: bool = False,
+    ) -> Optional[List[spack.spec.Spec]]:
+        """Concretize new user specs reusing the concrete specs kept in the environment.
+
+        The problem is much smaller than solving again for all the roots. The answer
+        is used only if it is unified with the kept specs, i.e. if it shares their nodes
+        for any package or virtual they have in common.
+
+        Returns:
+            The concrete specs of the new user specs, or None if a full solve is needed
+        """
+        # Avoid cyclic dependency
+        import spack.solver.asp
+
+        reuse = list(traverse.traverse_nodes(kept_specs, key=traverse.by_dag_hash))
+        solver = spack.solver.asp.Solver()
+        try:
+            result = solver.solve(
+                new_user_specs,
+                tests=tests,
+                allow_deprecated=spack.config.get("config:deprecated", False),
+                reuse=reuse,
+            )
+        except spack.solver.asp.InternalConcretizerError:
+            # A bug in Spack would only be hidden by solving again
+            raise
+        except spack.error.UnsatisfiableSpecError:
+            # Don't format the error, since explaining it might be expensive
+            tty.debug("Solving again for all the roots, since the new ones failed")
+            return None
+
+        concrete_specs = [s.copy() for s in result.specs]
+        if not _is_unified_with(concrete_specs, kept_specs):
+            tty.debug("Solving again for all the roots, since the new ones are not unified")
+            return None
+        return concrete_specs
+
     def _concretize_separately(self, tests=False):
         """Concretization strategy that concretizes separately one
         user spec after the other.
         """
-        import spack.bootstrap
+        # Avoid cyclic dependency
+        import spack.solver.asp
 
         # keep any concretized specs whose user specs are still in the manifest
         old_concretized_user_specs = self.concretized_user_specs
@@ -1620,28 +1724,13 @@ def _concretize_separately(self, tests=False):
                 concrete = old_specs_by_hash[h]
                 self._add_concrete_spec(s, concrete, new=False)
 
-        # Concretize any new user specs that we haven't concretized yet
-        args, root_specs, i = [], [], 0
-        for uspec in self.user_specs:
-            if uspec not in old_concretized_user_specs:
-                root_specs.append(uspec)
-                args.append((i, str(uspec), tests))
-                i += 1
+        # Concretize any new user specs that we haven't concretized yet. Identical user
+        # specs are concretized only once.
+        root_specs = [s for s in self.user_specs if s not in old_concretized_user_specs]
+        unique_specs = list(dict.fromkeys(str(s) for s in root_specs))
+        args = [(i, spec_str, tests) for i, spec_str in enumerate(unique_specs)]
 
-        # Ensure we don't try to bootstrap clingo in parallel
-        with spack.bootstrap.ensure_bootstrap_configuration():
-            spack.bootstrap.ensure_clingo_importable_or_raise()
-
-        # Ensure all the indexes have been built or updated, since
-        # otherwise the processes in the pool may timeout on waiting
-        # for a write lock. We do this indirectly by retrieving the
-        # provider index, which should in turn trigger the update of
-        # all the indexes if there's any need for that.
-        _ = spack.repo.PATH.provider_index
-
-        # Ensure we have compilers in compilers.yaml to avoid that
-        # processes try to write the config file in parallel
-        _ = spack.compilers.all_compilers_config(spack.config.CONFIG)
+        self._prepare_parallel_concretization()
 
         # Early return if there is nothing to do
         if len(args) == 0:
@@ -1657,34 +1746,77 @@ def _concretize_separately(self, tests=False):
             msg += f" pool with {num_procs} processes"
         tty.msg(msg)
 
-        batch = []
-        for j, (i, concrete, duration) in enumerate(
-            spack.util.parallel.imap_unordered(
-                _concretize_task,
-                args,
-                processes=num_procs,
-                debug=tty.is_debug(),
-                maxtaskperchild=1,
-            )
-        ):
-            batch.append((i, concrete))
-            percentage = (j + 1) / len(args) * 100
-            tty.verbose(
-                f"{duration:6.1f}s [{percentage:3.0f}%] {concrete.cformat('{hash:7}')} "
-                f"{root_specs[i].colored_str}"
-            )
-            sys.stdout.flush()
+        # The reusable specs, and the facts of the packages common to most solves, are
+        # prepared once, if the solves run in this process or in forked workers. Workers
+        # that are started in other ways don't inherit them, and prepare their own setup.
+        shared_setup = contextlib.nullcontext()
+        if _tasks_share_memory(args):
+            warm_up = [Spec(unique_specs[0])] if len(args) > 1 else None
+            shared_setup = spack.solver.asp.shared_setup(warm_up=warm_up, tests=tests)
+        concrete_by_index = {}
+        with shared_setup:
+            for j, (i, concrete, duration) in enumerate(
+                spack.util.parallel.imap_unordered(
+                    _concretize_task,
+                    args,
+                    processes=num_procs,
+                    debug=tty.is_debug(),
+                    maxtaskperchild=1,
+                )
+            ):
+                concrete_by_index[i] = concrete
+                percentage = (j + 1) / len(args) * 100
+                tty.verbose(
+                    f"{duration:6.1f}s [{percentage:3.0f}%] {concrete.cformat('{hash:7}')} "
+                    f"{Spec(unique_specs[i]).colored_str}"
+                )
+                sys.stdout.flush()
 
         # Add specs in original order
-        batch.sort(key=lambda x: x[0])
+        index_by_spec = {spec_str: i for i, spec_str in enumerate(unique_specs)}
         by_hash = {}  # for attaching information on test dependencies
-        for root, (_, concrete) in zip(root_specs, batch):
+        for root in root_specs:
+            concrete = concrete_by_index[index_by_spec[str(root)]]
             self._add_concrete_spec(root, concrete)
             by_hash[concrete.dag_hash()] = concrete
 
         finish = time.time()
         tty.msg(f"Environment concretized in {finish - start:.2f} seconds")
 
+        self._unify_concrete_specs(by_hash, tests=tests)
+
+        results = [
+            (abstract, self.specs_by_hash[h])
+            for abstract, h in zip(self.concretized_user_specs, self.concretized_order)
+        ]
+        return results
+
+    def _prepare_parallel_concretization(self):
+        """Ensure that worker processes concretizing specs don't write to shared files"""
+        import spack.bootstrap
+
+        # Ensure we don't try to bootstrap clingo in parallel
+        with spack.bootstrap.ensure_bootstrap_configuration():
+            spack.bootstrap.ensure_clingo_importable_or_raise()
+
+        # Ensure all the indexes have been built or updated, since
+        # otherwise the processes in the pool may timeout on waiting
+        # for a write lock. We do this indirectly by retrieving the
+        # provider index, which should in turn trigger the update of
+        # all the indexes if there's any need for that.
+        _ = spack.repo.PATH.provider_index
+
+        # Ensure we have compilers in compilers.yaml to avoid that
+        # processes try to write the config file in parallel
+        _ = spack.compilers.all_compilers_config(spack.config.CONFIG)
+
+    def _unify_concrete_specs(self, by_hash: Dict[str, Spec], tests: bool = False):
+        """Make the concrete specs of the environment share the objects of common nodes.
+
+        Arguments:
+            by_hash: specs computed in worker processes, by their DAG hash
+            tests: whether test dependencies were concretized
+        """
         # Unify the specs objects, so we get correct references to all parents
         self._read_lockfile_dict(self._to_lockfile_dict())
 
@@ -1693,6 +1825,8 @@ def _concretize_separately(self, tests=False):
             # This is slow, but the information on test dependency is lost
             # after unification or when reading from a lockfile.
             for h in self.specs_by_hash:
+                if h not in by_hash:
+                    continue
                 current_spec, computed_spec = self.specs_by_hash[h], by_hash[h]
                 for node in computed_spec.traverse():
                     test_edges = node.edges_to_dependencies(depflag=dt.TEST)
@@ -1704,12 +1838,6 @@ def _concretize_separately(self, tests=False):
                             test_dependency.copy(), depflag=dt.TEST, virtuals=current_edge.virtuals
                         )
 
-        results = [
-            (abstract, self.specs_by_hash[h])
-            for abstract, h in zip(self.concretized_user_specs, self.concretized_order)
-        ]
-        return results
-
     @property
     def default_view(self):
         if not self.has_view(default_view_name):
@@ -2515,6 +2643,110 @@ def display_specs(specs):
     print(tree_string)
 
 
+def _nodes_by_name(specs: List[Spec]) -> Dict[str, Set[str]]:
+    """Map the names of packages and virtuals in the specs to the hashes of their nodes"""
+    result = collections.defaultdict(set)
+    for node in traverse.traverse_nodes(specs, key=traverse.by_dag_hash):
+        result[node.name].add(node.dag_hash())
+        # Any node providing a virtual is a provider in a solve, even if not used as such
+        if spack.repo.PATH.exists(node.name):
+            for virtual in node.package.virtuals_provided:
+                result[virtual.name].add(node.dag_hash())
+    return result
+
+
+def _is_unified_with(specs: List[Spec], other_specs: List[Spec]) -> bool:
+    """Whether the specs use the same nodes as other_specs, for any package or virtual
+    the two have in common."""
+    other_nodes = _nodes_by_name(other_specs)
+    return all(
+        hashes <= other_nodes[name]
+        for name, hashes in _nodes_by_name(specs).items()
+        if name in other_nodes
+    )
+
+
+def _shared_packages() -> Set[str]:
+    """Packages that don't make specs depending on them part of the same cluster: compiler
+    runtimes, and build tools when these can be duplicated."""
+    shared = set(spack.repo.PATH.packages_with_tags("runtime"))
+    if spack.config.get("concretizer:duplicates:strategy", "none") != "none":
+        shared.update(spack.repo.PATH.packages_with_tags("build-tools"))
+    return shared
+
+
+def _independent_clusters(specs: List[Spec], tests: bool = False) -> List[List[Spec]]:
+    """Partition specs into clusters that can be concretized independently.
+
+    Two specs are in the same cluster if they can both depend on some package, apart from
+    compiler runtimes and from build tools, when these can be duplicated. Clusters can still
+    use different nodes for those, see ``_clusters_agree()``.
+    """
+    # Avoid cyclic dependency
+    import spack.package_base
+
+    # Specs without a name, e.g. "/<hash>", are solved together with the others
+    if not all(spec.name for spec in specs):
+        return [list(specs)]
+
+    shared = _shared_packages()
+
+    depflag = dt.LINK | dt.RUN | dt.BUILD
+    if tests:
+        depflag |= dt.TEST
+
+    clusters: List[Tuple[Set[str], List[Spec]]] = []
+    for spec in specs:
+        names = set(spack.package_base.possible_dependencies(spec, depflag=depflag)) - shared
+        cluster_specs = [spec]
+        disjoint = []
+        for cluster_names, other_specs in clusters:
+            if names & cluster_names:
+                names |= cluster_names
+                cluster_specs = other_specs + cluster_specs
+            else:
+                disjoint.append((cluster_names, other_specs))
+        clusters = disjoint + [(names, cluster_specs)]
+
+    return [cluster_specs for _, cluster_specs in clusters]
+
+
+def _clusters_agree(cluster_results: List[List[Spec]]) -> bool:
+    """Whether the clusters solved independently use the same nodes for the runtimes and
+    build tools they can share, so that their specs are those of a single solve."""
+    shared = _shared_packages()
+    used: Dict[str, Set[str]] = {}
+    for specs in cluster_results:
+        for name, hashes in _nodes_by_name(specs).items():
+            if name in shared and used.setdefault(name, hashes) != hashes:
+                return False
+    return True
+
+
+def _concretize_cluster_task(packed_arguments) -> Tuple[Dict[Spec, Spec], float]:
+    # Avoid cyclic dependency
+    import spack.solver.asp
+
+    specs, tests, allow_deprecated = packed_arguments
+    with tty.SuppressOutput(msg_enabled=False):
+        start = time.time()
+        specs_by_input = {}
+        solver = spack.solver.asp.Solver()
+        for result in solver.solve_in_rounds(
+            specs, tests=tests, allow_deprecated=allow_deprecated
+        ):
+            specs_by_input.update(result.specs_by_input)
+        return specs_by_input, time.time() - start
+
+
+def _tasks_share_memory(list_of_args: list) -> bool:
+    """Whether the tasks passed to ``spack.util.parallel.imap_unordered()`` see the memory
+    of this process, i.e. they run in this process or in forked workers."""
+    if sys.platform in ("darwin", "win32") or len(list_of_args) == 1:
+        return True
+    return multiprocessing.get_start_method() == "fork"
+
+
 def _concretize_task(packed_arguments) -> Tuple[int, Spec, float]:
     index, spec_str, tests = packed_arguments
     with tty.SuppressOutput(msg_enabled=False):
@@ -25,6 +25,7 @@
 from llnl.util.lang import ensure_last, list_modules
 
 import spack.paths
+import spack.util.trace
 
 
 class _HookRunner:
@@ -57,11 +58,13 @@ def hooks(self):
         return self._hooks
 
     def __call__(self, *args, **kwargs):
-        for _, module in self.hooks:
+        for module_name, module in self.hooks:
             if hasattr(module, self.hook_name):
                 hook = getattr(module, self.hook_name)
                 if hasattr(hook, "__call__"):
-                    hook(*args, **kwargs)
+                    name = f"{self.hook_name} {module_name.rsplit('.', 1)[-1]}"
+                    with spack.util.trace.span(name, "hook"):
+                        hook(*args, **kwargs)
 
 
 # pre/post install and run by the install subprocess
@@ -0,0 +1,233 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""Ledger of the packages claimed by cooperating install processes.
+
+Processes running ``spack install --cooperative`` on the same store, possibly on
+different nodes sharing its file system, claim a package in the ledger before trying
+to lock its prefix. A package claimed by another live process is set aside, and the
+claimant works on other packages in the meantime. When it has nothing else to do, it
+waits for the version of the ledger to change instead of repeatedly failing to acquire
+prefix locks.
+
+Claims are released once a package is installed, or has failed, which bumps the
+version of the ledger and wakes up the waiting processes. Participants refresh a
+heartbeat in the ledger while they run, so that the claims of a process that died, or of
+a node that went down, are taken over by the others.
+
+The ledger is advisory: prefix locks still ensure that a package is installed by a
+single process.
+"""
+import contextlib
+import json
+import os
+import socket
+import time
+from typing import Any, Dict, Generator, Iterable, Optional, Set, Tuple
+
+import llnl.util.tty as tty
+
+import spack.util.lock as lk
+
+#: Seconds between two heartbeats of a participant
+HEARTBEAT_INTERVAL = 30.0
+
+#: Seconds without heartbeat after which a participant is considered gone
+STALE_AFTER = 300.0
+
+#: Seconds between two checks of the ledger by a waiting process
+POLL_INTERVAL = 0.1
+
+
+class TaskLedger:
+    """Claims on packages, shared by the processes installing to the same store."""
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        timeout: Optional[float] = None,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        stale_after: float = STALE_AFTER,
+    ) -> None:
+        """
+        Arguments:
+            root: directory of the ledger, usually the database directory of the store
+            timeout: timeout to lock the ledger
+            heartbeat_interval: seconds between two heartbeats of this process
+            stale_after: seconds without heartbeat after which a participant is gone
+        """
+        self.path = os.path.join(root, "install_ledger.json")
+        self.lock = lk.Lock(
+            os.path.join(root, "install_ledger.lock"),
+            default_timeout=timeout,
+            desc="install ledger",
+        )
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+
+        self.host = socket.gethostname()
+        #: Name of this process in the ledger
+        self.owner = f"{self.host}:{os.getpid()}"
+
+        #: Keys of the packages claimed by this process
+        self.claimed: Set[str] = set()
+
+        #: Version of the ledger at the end of the last transaction of this process
+        self.version = 0
+
+        # Time of the last heartbeat, and cache of the version read from the file
+        self._last_write = 0.0
+        self._stat: Optional[Tuple[int, int, int]] = None
+        self._cached_version = 0
+
+    def join(self) -> None:
+        """Register this process as a participant."""
+        with self._transaction():
+            pass
+
+    def leave(self) -> None:
+        """Release all the claims of this process, and unregister it."""
+        with self._transaction(register=False) as data:
+            if self._drop_claims(data, self.owner):
+                data["version"] += 1
+            data["participants"].pop(self.owner, None)
+        self.claimed.clear()
+
+    def claim(self, key: str) -> bool:
+        """Claim a package, unless another live participant did.
+
+        Returns:
+            True if the package is claimed by this process, False otherwise
+        """
+        with self._transaction() as data:
+            owner = data["claims"].get(key)
+            if owner is not None and owner != self.owner and owner in data["participants"]:
+                return False
+            data["claims"][key] = self.owner
+        self.claimed.add(key)
+        return True
+
+    def release(self, keys: Iterable[str]) -> None:
+        """Release claims of this process, and wake up the participants waiting for them."""
+        keys = set(keys) & self.claimed
+        if not keys:
+            return
+
+        with self._transaction() as data:
+            for key in keys:
+                if data["claims"].get(key) == self.owner:
+                    del data["claims"][key]
+            data["version"] += 1
+        self.claimed -= keys
+
+    def heartbeat(self) -> None:
+        """Refresh the heartbeat of this process, if it is due."""
+        if time.time() - self._last_write >= self.heartbeat_interval:
+            with self._transaction():
+                pass
+
+    def current_version(self) -> int:
+        """Version of the ledger on disk, read without locking it."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return 0
+
+        # The file is replaced on each write, so that it doesn't need to be read again
+        # as long as it is the same file.
+        stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stat != self._stat:
+            self._stat = stat
+            self._cached_version = self._read()["version"]
+        return self._cached_version
+
+    def wait(self, version: int, timeout: float) -> bool:
+        """Wait for the version of the ledger to differ from ``version``.
+
+        Returns:
+            True if it changed before the timeout, False otherwise
+        """
+        deadline = time.monotonic() + timeout
+        while self.current_version() == version:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
+        return True
+
+    @contextlib.contextmanager
+    def _transaction(self, register: bool = True) -> Generator[Dict[str, Any], None, None]:
+        """Read the ledger, with a write lock, and write it back with a heartbeat of this
+        process, if it is registered."""
+        with lk.WriteTransaction(self.lock):
+            data = self._read()
+            self._drop_stale_participants(data)
+            yield data
+
+            now = time.time()
+            if register:
+                data["participants"][self.owner] = now
+            if data["participants"] or data["claims"]:
+                self._write(data)
+            else:
+                # The last participant left
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self.path)
+            self.version = data["version"]
+            self._last_write = now
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return {
+                    "version": data.get("version", 0),
+                    "participants": data.get("participants", {}),
+                    "claims": data.get("claims", {}),
+                }
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            tty.debug(f"Ignoring corrupt install ledger {self.path}: {e}")
+        return {"version": 0, "participants": {}, "claims": {}}
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        tmp = f"{self.path}.{self.host}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def _drop_stale_participants(self, data: Dict[str, Any]) -> None:
+        """Remove the participants that are gone, so that their claims can be taken over."""
+        now = time.time()
+        for owner, heartbeat in list(data["participants"].items()):
+            if owner != self.owner and not self._is_alive(owner, heartbeat, now):
+                tty.debug(f"Taking over the packages claimed by {owner}")
+                del data["participants"][owner]
+                if self._drop_claims(data, owner):
+                    data["version"] += 1
+
+    def _drop_claims(self, data: Dict[str, Any], owner: str) -> bool:
+        keys = [key for key, claimant in data["claims"].items() if claimant == owner]
+        for key in keys:
+            del data["claims"][key]
+        return bool(keys)
+
+    def _is_alive(self, owner: str, heartbeat: float, now: float) -> bool:
+        if now - heartbeat > self.stale_after:
+            return False
+
+        # Processes on this host can be checked directly
+        host, _, pid = owner.rpartition(":")
+        if host != self.host:
+            return True
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except (OSError, ValueError):
+            pass
+        return True
@@ -26,35 +26,40 @@
 
 """
 
+import concurrent.futures
 import copy
 import enum
 import glob
+import hashlib
 import heapq
 import io
 import itertools
+import multiprocessing.connection
 import os
 import shutil
 import sys
 import time
 from collections import defaultdict
 from gzip import GzipFile
-from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
 
 import llnl.util.filesystem as fs
 import llnl.util.lock as lk
 import llnl.util.tty as tty
 from llnl.string import ordinal
-from llnl.util.lang import pretty_seconds
+from llnl.util.lang import pretty_hms, pretty_seconds
 from llnl.util.tty.color import colorize
 from llnl.util.tty.log import log_output
 
 import spack.binary_distribution as binary_distribution
 import spack.build_environment
+import spack.build_history
 import spack.config
 import spack.database
 import spack.deptypes as dt
 import spack.error
 import spack.hooks
+import spack.install_ledger
 import spack.mirror
 import spack.package_base
 import spack.package_prefs as prefs
@@ -62,12 +67,31 @@
 import spack.rewiring
 import spack.spec
 import spack.store
+import spack.traverse
+import spack.util.crypto
 import spack.util.executable
+import spack.util.jobserver
 import spack.util.path
+import spack.util.spack_json as sjson
 import spack.util.timer as timer
+import spack.util.trace
+from spack.util.cpus import cpus_available
 from spack.util.environment import EnvironmentModifications, dump_environment
 from spack.util.executable import which
 
+#: Error message used when terminating an installation after the first failure
+_FAIL_FAST_ERR = "Terminating after first install failure"
+
+#: Maximum number of binary packages downloaded at the same time ahead of their install
+_PREFETCH_JOBS = 4
+
+#: Maximum total size, in bytes, of the binary packages downloaded ahead of their
+#: install that are waiting to be installed
+_PREFETCH_MAX_BYTES = 2 * 1024**3
+
+#: Name of the file, in the stage of a package, recording the phases completed by its build
+_CHECKPOINT_FILE = "spack-build-checkpoint.json"
+
 #: Counter to support unique spec sequencing that is used to ensure packages
 #: with the same priority are (initially) processed in the order in which they
 #: were added (see https://docs.python.org/2/library/heapq.html).
@@ -102,7 +126,12 @@ def __str__(self):
 
 
 def _write_timer_json(pkg, timer, cache):
-    extra_attributes = {"name": pkg.name, "cache": cache, "hash": pkg.spec.dag_hash()}
+    extra_attributes = {
+        "name": pkg.name,
+        "cache": cache,
+        "hash": pkg.spec.dag_hash(),
+        "jobs": 1 if cache else spack.build_history.build_jobs(pkg),
+    }
     try:
         with open(pkg.times_log_path, "w") as timelog:
             timer.write_json(timelog, extra_attributes=extra_attributes)
@@ -294,28 +323,6 @@ def _do_fake_install(pkg: "spack.package_base.PackageBase") -> None:
     dump_packages(pkg.spec, packages_dir)
 
 
-def _hms(seconds: int) -> str:
-    """
-    Convert seconds to hours, minutes, seconds
-
-    Args:
-        seconds: time to be converted in seconds
-
-    Return: String representation of the time as #h #m #.##s
-    """
-    m, s = divmod(seconds, 60)
-    h, m = divmod(m, 60)
-
-    parts = []
-    if h:
-        parts.append("%dh" % h)
-    if m:
-        parts.append("%dm" % m)
-    if s:
-        parts.append(f"{s:.2f}s")
-    return " ".join(parts)
-
-
 def _log_prefix(pkg_name) -> str:
     """Prefix of the form "[pid]: [pkg name]: ..." when printing a status update during
     the build."""
@@ -348,13 +355,16 @@ def print_install_test_log(pkg: "spack.package_base.PackageBase") -> None:
 
 
 def _print_timer(pre: str, pkg_id: str, timer: timer.BaseTimer) -> None:
-    phases = [f"{p.capitalize()}: {_hms(timer.duration(p))}." for p in timer.phases]
-    phases.append(f"Total: {_hms(timer.duration())}")
+    phases = [f"{p.capitalize()}: {pretty_hms(timer.duration(p))}." for p in timer.phases]
+    phases.append(f"Total: {pretty_hms(timer.duration())}")
     tty.msg(f"{pre} Successfully installed {pkg_id}", "  ".join(phases))
 
 
 def _install_from_cache(
-    pkg: "spack.package_base.PackageBase", explicit: bool, unsigned: Optional[bool] = False
+    pkg: "spack.package_base.PackageBase",
+    explicit: bool,
+    unsigned: Optional[bool] = False,
+    download_result: Optional[dict] = None,
 ) -> bool:
     """
     Install the package from binary cache
@@ -364,25 +374,73 @@ def _install_from_cache(
         explicit: ``True`` if installing the package was explicitly
             requested by the user, otherwise, ``False``
         unsigned: if ``True`` or ``False`` override the mirror signature verification defaults
+        download_result: binary package downloaded ahead of the install, if any
 
     Return: ``True`` if the package was extract from binary cache, ``False`` otherwise
     """
+    t = _extract_from_cache(pkg, explicit, unsigned, download_result=download_result)
+    if t is None:
+        return False
+
+    _finish_install_from_cache(pkg, explicit, t)
+    return True
+
+
+def _extract_from_cache(
+    pkg: "spack.package_base.PackageBase",
+    explicit: bool,
+    unsigned: Optional[bool] = False,
+    download_result: Optional[dict] = None,
+    register: bool = True,
+) -> Optional[timer.Timer]:
+    """
+    Extract and relocate the package from binary cache
+
+    Args:
+        pkg: package to install from the binary cache
+        explicit: ``True`` if installing the package was explicitly
+            requested by the user, otherwise, ``False``
+        unsigned: if ``True`` or ``False`` override the mirror signature verification defaults
+        download_result: binary package downloaded ahead of the install, if any
+        register: whether to add the package to the database
+
+    Return: the timer of the install phases if the package was extracted, ``None`` otherwise
+    """
     t = timer.Timer()
     installed_from_cache = _try_install_from_binary_cache(
-        pkg, explicit, unsigned=unsigned, timer=t
+        pkg,
+        explicit,
+        unsigned=unsigned,
+        timer=t,
+        download_result=download_result,
+        register=register,
     )
     if not installed_from_cache:
-        return False
+        return None
     t.stop()
 
-    pkg_id = package_id(pkg.spec)
-    tty.debug(f"Successfully extracted {pkg_id} from binary cache")
+    tty.debug(f"Successfully extracted {package_id(pkg.spec)} from binary cache")
+    return t
+
+
+def _finish_install_from_cache(
+    pkg: "spack.package_base.PackageBase", explicit: bool, t: timer.Timer
+) -> None:
+    """
+    Record and report the install of a package extracted from binary cache, and run the
+    post install hooks. The package must already be in the database.
 
+    Args:
+        pkg: package installed from the binary cache
+        explicit: ``True`` if installing the package was explicitly
+            requested by the user, otherwise, ``False``
+        t: timer of the install phases
+    """
     _write_timer_json(pkg, t, True)
-    _print_timer(pre=_log_prefix(pkg.name), pkg_id=pkg_id, timer=t)
+    spack.build_history.record_install(pkg)
+    _print_timer(pre=_log_prefix(pkg.name), pkg_id=package_id(pkg.spec), timer=t)
     _print_installed_pkg(pkg.spec.prefix)
     spack.hooks.post_install(pkg.spec, explicit)
-    return True
 
 
 def _process_external_package(pkg: "spack.package_base.PackageBase", explicit: bool) -> None:
@@ -432,6 +490,8 @@ def _process_binary_cache_tarball(
     unsigned: Optional[bool],
     mirrors_for_spec: Optional[list] = None,
     timer: timer.BaseTimer = timer.NULL_TIMER,
+    download_result: Optional[dict] = None,
+    register: bool = True,
 ) -> bool:
     """
     Process the binary cache tarball.
@@ -443,15 +503,19 @@ def _process_binary_cache_tarball(
         mirrors_for_spec: Optional list of concrete specs and mirrors
         obtained by calling binary_distribution.get_mirrors_for_spec().
         timer: timer to keep track of binary install phases.
+        download_result: binary package downloaded ahead of the install, if any
+        register: whether to add the package to the database
 
     Return:
         bool: ``True`` if the package was extracted from binary cache,
             else ``False``
     """
     with timer.measure("fetch"):
-        download_result = binary_distribution.download_tarball(
-            pkg.spec.build_spec, unsigned, mirrors_for_spec
-        )
+        if download_result is None:
+            with spack.util.trace.span(f"download {pkg.name}", "fetch"):
+                download_result = binary_distribution.download_tarball(
+                    pkg.spec.build_spec, unsigned, mirrors_for_spec
+                )
 
         if download_result is None:
             return False
@@ -459,7 +523,10 @@ def _process_binary_cache_tarball(
     tty.msg(f"Extracting {package_id(pkg.spec)} from binary cache")
 
     with timer.measure("install"), spack.util.path.filter_padding():
-        binary_distribution.extract_tarball(pkg.spec, download_result, force=False, timer=timer)
+        with spack.util.trace.span(f"extract and relocate {pkg.name}", "relocate"):
+            binary_distribution.extract_tarball(
+                pkg.spec, download_result, force=False, timer=timer
+            )
 
         if pkg.spec.spliced:  # overwrite old metadata with new
             spack.store.STORE.layout.write_spec(
@@ -470,7 +537,8 @@ def _process_binary_cache_tarball(
             pkg._post_buildcache_install_hook()
 
         pkg.installed_from_binary_cache = True
-        spack.store.STORE.db.add(pkg.spec, explicit=explicit)
+        if register:
+            spack.store.STORE.db.add(pkg.spec, explicit=explicit)
         return True
 
 
@@ -479,6 +547,8 @@ def _try_install_from_binary_cache(
     explicit: bool,
     unsigned: Optional[bool] = None,
     timer: timer.BaseTimer = timer.NULL_TIMER,
+    download_result: Optional[dict] = None,
+    register: bool = True,
 ) -> bool:
     """
     Try to extract the package from binary cache.
@@ -488,6 +558,8 @@ def _try_install_from_binary_cache(
         explicit: the package was explicitly requested by the user
         unsigned: if ``True`` or ``False`` override the mirror signature verification defaults
         timer: timer to keep track of binary install phases.
+        download_result: binary package downloaded ahead of the install, if any
+        register: whether to add the package to the database
     """
     # Early exit if no binary mirrors are configured.
     if not spack.mirror.MirrorCollection(binary=True):
@@ -499,10 +571,80 @@ def _try_install_from_binary_cache(
         matches = binary_distribution.get_mirrors_for_spec(pkg.spec, index_only=True)
 
     return _process_binary_cache_tarball(
-        pkg, explicit, unsigned, mirrors_for_spec=matches, timer=timer
+        pkg,
+        explicit,
+        unsigned,
+        mirrors_for_spec=matches,
+        timer=timer,
+        download_result=download_result,
+        register=register,
     )
 
 
+def _prefetch_binary(
+    spec: "spack.spec.Spec", unsigned: Optional[bool], mirrors_for_spec: list
+) -> Optional[Tuple[dict, int]]:
+    """Download a binary package ahead of its install, in a worker process.
+
+    Return:
+        The result of ``binary_distribution.download_tarball()`` with the size of the
+        tarball in bytes, or ``None`` if the binary package could not be downloaded
+    """
+    download_result = binary_distribution.download_tarball(spec, unsigned, mirrors_for_spec)
+    if download_result is None:
+        return None
+    return download_result, os.path.getsize(download_result["tarball_stage"].save_filename)
+
+
+def _prefetched_download(
+    pkg: "spack.package_base.PackageBase", prefetch: Optional[concurrent.futures.Future]
+) -> Optional[dict]:
+    """Wait for the download of a binary package started ahead of its install.
+
+    Return:
+        The result of ``binary_distribution.download_tarball()``, or ``None`` if there was
+        no such download or if it failed
+    """
+    if prefetch is None:
+        return None
+
+    try:
+        result = prefetch.result()
+    except (Exception, concurrent.futures.CancelledError) as e:
+        tty.debug(f"Failed to download the binary package of {package_id(pkg.spec)}: {e}")
+        return None
+
+    return None if result is None else result[0]
+
+
+def _install_from_cache_in_child(
+    pkg: "spack.package_base.PackageBase", kwargs: dict
+) -> Optional[timer.Timer]:
+    """Extract and relocate a binary package in a child process.
+
+    The package is added to the database by the parent process, which then completes the
+    install as in ``_install_from_cache()``, so that only this step is serialized when
+    several packages are installed from a binary cache concurrently.
+
+    Return:
+        The timer of the install phases if the package was extracted, ``None`` if it should
+        be built from sources
+    """
+    try:
+        return _extract_from_cache(
+            pkg,
+            kwargs["explicit"],
+            kwargs.get("unsigned"),
+            download_result=kwargs.get("download_result"),
+            register=False,
+        )
+    except binary_distribution.NoChecksumException as e:
+        if kwargs.get("cache_only"):
+            raise
+        tty.error(f"Failed to install {pkg.name} from binary cache due to {str(e)}")
+        return None
+
+
 def combine_phase_logs(phase_log_files: List[str], log_path: str) -> None:
     """
     Read set or list of logs and combine them into one file.
@@ -716,6 +858,19 @@ def package_id(spec: "spack.spec.Spec") -> str:
     return f"{spec.name}-{spec.version}-{spec.dag_hash()}"
 
 
+class SpecStatus(NamedTuple):
+    """Install status of a spec, looked up before the install starts"""
+
+    #: Database record of the spec, if any
+    record: Optional[spack.database.InstallRecord]
+    #: Whether the spec is installed according to the database
+    installed: bool
+    #: Whether the spec is installed in an upstream database
+    upstream: bool
+    #: Whether the spec is marked as failed
+    failed: bool
+
+
 class BuildRequest:
     """Class for representing an installation request."""
 
@@ -750,6 +905,11 @@ def __init__(self, pkg: "spack.package_base.PackageBase", install_args: dict):
         self.overwrite = set(self.install_args.get("overwrite", []))
         self.overwrite_time = time.time()
 
+        # DAG hashes of the installed specs, looked up by the installer for all the requests
+        # at once while its queue is initialized. If None, the database is queried for each
+        # spec, since the status changes during the install.
+        self.installed_hashes: Optional[Set[str]] = None
+
         # Save off dependency package ids for quick checks since traversals
         # are not able to return full dependents for all packages across
         # environment specs.
@@ -787,6 +947,7 @@ def _add_default_args(self) -> None:
             ("keep_prefix", False),
             ("keep_stage", False),
             ("restage", False),
+            ("resume", False),
             ("skip_patch", False),
             ("tests", False),
             ("unsigned", None),
@@ -811,10 +972,15 @@ def get_depflags(self, pkg: "spack.package_base.PackageBase") -> int:
         else:
             cache_only = self.install_args.get("dependencies_cache_only")
 
+        if self.installed_hashes is None:
+            installed = pkg.spec.installed
+        else:
+            installed = pkg.spec.dag_hash() in self.installed_hashes
+
         # Include build dependencies if pkg is going to be built from sources, or
         # if build deps are explicitly requested.
         if include_build_deps or not (
-            cache_only or pkg.spec.installed and not pkg.spec.dag_hash() in self.overwrite
+            cache_only or installed and not pkg.spec.dag_hash() in self.overwrite
         ):
             depflag |= dt.BUILD
         if self.run_tests(pkg):
@@ -844,7 +1010,11 @@ def spec(self) -> "spack.spec.Spec":
         return self.pkg.spec
 
     def traverse_dependencies(self, spec=None, visited=None) -> Iterator["spack.spec.Spec"]:
-        """Yield any dependencies of the appropriate type(s)"""
+        """Yield any dependencies of the appropriate type(s)
+
+        The ``visited`` set can be shared by the traversals of several requests, so that
+        each dependency is yielded only once for all of them.
+        """
         # notice: deptype is not constant across nodes, so we cannot use
         # spec.traverse_edges(deptype=...).
 
@@ -854,10 +1024,12 @@ def traverse_dependencies(self, spec=None, visited=None) -> Iterator["spack.spec
             visited = set()
 
         for dep in spec.dependencies(deptype=self.get_depflags(spec.package)):
-            hash = dep.dag_hash()
-            if hash in visited:
+            # The dependencies of a node depend on its dependency types, which differ when
+            # it is the root of another request
+            key = (dep.dag_hash(), self.get_depflags(dep.package))
+            if key in visited:
                 continue
-            visited.add(hash)
+            visited.add(key)
             # In Python 3: yield from self.traverse_dependencies(dep, visited)
             for s in self.traverse_dependencies(dep, visited):
                 yield s
@@ -963,6 +1135,10 @@ def __init__(
             pkg_id for pkg_id in self.dependencies if pkg_id not in installed
         )
 
+        # Expected time, in seconds, from the start of this task to the end of the
+        # longest chain of dependent tasks. Used to start long chains of builds first.
+        self.critical_path = 0.0
+
         # Ensure key sequence-related properties are updated accordingly.
         self.attempts = attempts
         self._update()
@@ -974,6 +1150,32 @@ def execute(self, install_status: InstallStatus) -> ExecuteResult:
         this task in the context of the full ``BuildRequest``."""
         raise NotImplementedError
 
+    def launch(
+        self, install_status: InstallStatus, concurrent: bool = False
+    ) -> Optional[ExecuteResult]:
+        """Start the work of this task.
+
+        Tasks that hand their work to a child process return ``None``, and must be finished
+        with ``complete()``. All other tasks do their work synchronously and return the result.
+
+        Args:
+            install_status: status used to format progress reporting
+            concurrent: whether other tasks run at the same time
+        """
+        return self.execute(install_status)
+
+    def poll(self) -> bool:
+        """Return True if the work started by ``launch()`` is ready to be completed."""
+        return True
+
+    def complete(self) -> Optional[ExecuteResult]:
+        """Wait for the work handed to a child process and return the result.
+
+        Returns ``None`` if the task handed more work to a new child process, in which
+        case it must be completed again.
+        """
+        raise NotImplementedError
+
     def __eq__(self, other):
         return self.key == other.key
 
@@ -1115,9 +1317,9 @@ def cache_only(self) -> bool:
             return self.request.install_args.get("dependencies_cache_only", _cache_only)
 
     @property
-    def key(self) -> Tuple[int, int]:
-        """The key is the tuple (# uninstalled dependencies, sequence)."""
-        return (self.priority, self.sequence)
+    def key(self) -> Tuple[int, float, int]:
+        """The key is the tuple (# uninstalled dependencies, -critical path, sequence)."""
+        return (self.priority, -self.critical_path, self.sequence)
 
     def next_attempt(self, installed) -> "Task":
         """Create a new, updated task for the next installation attempt."""
@@ -1136,13 +1338,34 @@ def priority(self):
 class BuildTask(Task):
     """Class for representing a build task for a package."""
 
+    #: Handle to the child process building the package from sources, if any
+    build_process: Optional["spack.build_environment.BuildProcess"] = None
+
+    #: Download of the binary package started ahead of the install, if any
+    prefetch: Optional[concurrent.futures.Future] = None
+
+    #: Whether the child process installs the package from a binary cache
+    installing_from_cache: bool = False
+
     def execute(self, install_status):
         """
         Perform the installation of the requested spec and/or dependency
         represented by the build task.
         """
+        rc = self.launch(install_status)
+        if rc is not None:
+            return rc
+        return self.complete()
+
+    def launch(self, install_status, concurrent=False):
+        """
+        Install the package from a binary cache, if possible, or start a child
+        process to build it from sources.
+
+        When other tasks run concurrently, the binary package is also extracted
+        and relocated in a child process.
+        """
         install_args = self.request.install_args
-        tests = install_args.get("tests")
         unsigned = install_args.get("unsigned")
 
         pkg, pkg_id = self.pkg, self.pkg_id
@@ -1152,8 +1375,24 @@ def execute(self, install_status):
         self.status = BuildStatus.INSTALLING
 
         # Use the binary cache if requested
+        prefetch, self.prefetch = self.prefetch, None
         if self.use_cache:
-            if _install_from_cache(pkg, self.explicit, unsigned):
+            download_result = _prefetched_download(pkg, prefetch)
+            if concurrent and spack.mirror.MirrorCollection(binary=True):
+                kwargs = {
+                    "explicit": self.explicit,
+                    "unsigned": unsigned,
+                    "cache_only": self.cache_only,
+                    "download_result": download_result,
+                    "setup_environment": False,
+                }
+                self.build_process = spack.build_environment.spawn_build_process(
+                    pkg, _install_from_cache_in_child, kwargs, forward_stdin=False
+                )
+                self.installing_from_cache = True
+                return None
+
+            if _install_from_cache(pkg, self.explicit, unsigned, download_result=download_result):
                 return ExecuteResult.SUCCESS
             elif self.cache_only:
                 raise spack.error.InstallError(
@@ -1162,6 +1401,14 @@ def execute(self, install_status):
             else:
                 tty.msg(f"No binary for {pkg_id} found: installing from source")
 
+        return self._launch_build(forward_stdin=not concurrent)
+
+    def _launch_build(self, forward_stdin):
+        """Start a child process to build the package from sources."""
+        install_args = self.request.install_args
+        tests = install_args.get("tests")
+        pkg = self.pkg
+
         pkg.run_tests = tests is True or tests and pkg.name in tests
 
         # hook that allows tests to inspect the Package before installation
@@ -1169,30 +1416,73 @@ def execute(self, install_status):
         if not pkg.unit_test_check():
             return ExecuteResult.FAILED
 
-        try:
-            # Create stage object now and let it be serialized for the child process. That
-            # way monkeypatch in tests works correctly.
-            pkg.stage
+        # Create stage object now and let it be serialized for the child process. That
+        # way monkeypatch in tests works correctly.
+        pkg.stage
 
-            self._setup_install_dir(pkg)
+        self._setup_install_dir(pkg)
 
-            # Create a child process to do the actual installation.
+        # Create a child process to do the actual installation.
+        self.build_process = spack.build_environment.spawn_build_process(
+            pkg, build_process, install_args, forward_stdin=forward_stdin
+        )
+        return None
+
+    def poll(self):
+        return self.build_process is None or self.build_process.poll()
+
+    def complete(self):
+        """Wait for the child process building the package, and register the package."""
+        assert self.build_process is not None, "complete() called on a task that was not launched"
+        if self.installing_from_cache:
+            return self._complete_install_from_cache()
+
+        pkg = self.pkg
+        try:
             # Preserve verbosity settings across installs.
-            spack.package_base.PackageBase._verbose = spack.build_environment.start_build_process(
-                pkg, build_process, install_args
-            )
+            spack.package_base.PackageBase._verbose = self.build_process.complete()
 
             # Note: PARENT of the build process adds the new package to
             # the database, so that we don't need to re-read from file.
             spack.store.STORE.db.add(pkg.spec, explicit=self.explicit)
+
+            if not self.request.install_args.get("fake"):
+                spack.build_history.record_install(pkg)
         except spack.error.StopPhase as e:
             # A StopPhase exception means that do_install was asked to
             # stop early from clients, and is not an error at this point
             pid = f"{self.pid}: " if tty.show_pid() else ""
             tty.debug(f"{pid}{str(e)}")
             tty.debug(f"Package stage directory: {pkg.stage.source_path}")
+        finally:
+            self.build_process = None
         return ExecuteResult.SUCCESS
 
+    def _complete_install_from_cache(self):
+        """Wait for the child process extracting the binary package, and register the
+        package. Start building it from sources if no binary package could be installed."""
+        assert self.build_process is not None
+        pkg = self.pkg
+        try:
+            install_timer = self.build_process.complete()
+        finally:
+            self.build_process = None
+            self.installing_from_cache = False
+
+        if install_timer is not None:
+            pkg.installed_from_binary_cache = True
+            spack.store.STORE.db.add(pkg.spec, explicit=self.explicit)
+            _finish_install_from_cache(pkg, self.explicit, install_timer)
+            return ExecuteResult.SUCCESS
+
+        if self.cache_only:
+            raise spack.error.InstallError(
+                "No binary found when cache-only was specified", pkg=pkg
+            )
+
+        tty.msg(f"No binary for {self.pkg_id} found: installing from source")
+        return self._launch_build(forward_stdin=False)
+
 
 class RewireTask(Task):
     """Class for representing a rewire task for a package."""
@@ -1240,6 +1530,8 @@ def __init__(
         packages: List["spack.package_base.PackageBase"],
         *,
         cache_only: bool = False,
+        concurrent_packages: Optional[int] = None,
+        cooperative: bool = False,
         dependencies_cache_only: bool = False,
         dependencies_use_cache: bool = True,
         dirty: bool = False,
@@ -1256,6 +1548,7 @@ def __init__(
         package_cache_only: bool = False,
         package_use_cache: bool = True,
         restage: bool = False,
+        resume: bool = False,
         skip_patch: bool = False,
         stop_at: Optional[str] = None,
         stop_before: Optional[str] = None,
@@ -1266,6 +1559,10 @@ def __init__(
     ) -> None:
         """
         Arguments:
+            concurrent_packages: Maximum number of packages built at the same time by this
+                process. If None, the value of ``config:concurrent_packages`` is used.
+            cooperative: Share the work with the other cooperative installers of the same store,
+                through a ledger of the packages that each of them is installing.
             explicit: Set of package hashes to be marked as installed explicitly in the db. If
                 True, the specs from ``packages`` are marked explicit, while their dependencies are
                 not.
@@ -1279,6 +1576,9 @@ def __init__(
             keep_stage: By default, stage is destroyed only if there are no exceptions during
                 build. Set to True to keep the stage even with exceptions.
             restage: Force spack to restage the package source.
+            resume: Resume builds from sources after the last phase completed by a previous
+                build, if it was done in the same stage, for the same spec and build
+                environment. Takes precedence over ``restage``.
             skip_patch: Skip patch stage of build if True.
             stop_before: stop execution before this installation phase (or None)
             stop_at: last installation phase to be executed (or None)
@@ -1308,6 +1608,7 @@ def __init__(
             "package_cache_only": package_cache_only,
             "package_use_cache": package_use_cache,
             "restage": restage,
+            "resume": resume,
             "skip_patch": skip_patch,
             "stop_at": stop_at,
             "stop_before": stop_before,
@@ -1321,7 +1622,7 @@ def __init__(
         self.build_requests = [BuildRequest(pkg, install_args) for pkg in packages]
 
         # Priority queue of tasks
-        self.build_pq: List[Tuple[Tuple[int, int], Task]] = []
+        self.build_pq: List[Tuple[Tuple[int, float, int], Task]] = []
 
         # Mapping of unique package ids to task
         self.build_tasks: Dict[str, Task] = {}
@@ -1335,6 +1636,10 @@ def __init__(
         # Cache of installed packages' unique ids
         self.installed: Set[str] = set()
 
+        # Install status of the specs of all the build requests, keyed on their DAG hash,
+        # while the queue is initialized
+        self.spec_status: Dict[str, SpecStatus] = {}
+
         # Data store layout
         self.layout = spack.store.STORE.layout
 
@@ -1348,6 +1653,37 @@ def __init__(
         # Initializing all_dependencies to empty. This will be set later in _init_queue.
         self.all_dependencies: Dict[str, Set[str]] = {}
 
+        # Maximum number of packages built concurrently in child processes
+        self.max_active_tasks: int = concurrent_packages or spack.config.get(
+            "config:concurrent_packages", 1
+        )
+
+        # Tasks whose build is in progress in a child process, keyed on the package's id
+        self.active_tasks: Dict[str, BuildTask] = {}
+
+        # Worker processes downloading binary packages ahead of their install, and the
+        # downloads started so far, keyed on the package's id
+        self.prefetch_executor: Optional[concurrent.futures.Executor] = None
+        self.prefetches: Dict[str, Optional[concurrent.futures.Future]] = {}
+
+        # Queued tasks not considered for a download yet, in queue order, the downloads in
+        # progress, and the size of the downloaded packages waiting to be installed
+        self.prefetch_pq: List[Tuple[Tuple[int, float, int], Task]] = []
+        self.prefetches_running: Set[str] = set()
+        self.prefetched_bytes: Dict[str, int] = {}
+
+        # Trace track, and start time, of the tasks being installed, keyed on the package's id
+        self.slots: Dict[str, Tuple[int, float]] = {}
+
+        # Ledger shared with the other cooperative installers, if this one is cooperative
+        self.cooperative = cooperative
+        self.ledger: Optional[spack.install_ledger.TaskLedger] = None
+
+        # Tasks set aside because they are claimed by other installers, keyed on the package's
+        # id, and version of the ledger when the first of them was set aside
+        self.deferred_tasks: Dict[str, Task] = {}
+        self.deferred_version = 0
+
     def __repr__(self) -> str:
         """Returns a formal representation of the package installer."""
         rep = f"{self.__class__.__name__}("
@@ -1406,6 +1742,34 @@ def _check_db(
             installed_in_db = False
         return rec, installed_in_db
 
+    def _lookup_spec_status(self, spec: "spack.spec.Spec") -> SpecStatus:
+        """Look up the install status of a spec in the database and failure tracker"""
+        rec, _ = self._check_db(spec)
+        return SpecStatus(
+            record=rec,
+            installed=spec.installed,
+            upstream=spec.installed_upstream,
+            failed=spack.store.STORE.failure_tracker.has_failed(spec),
+        )
+
+    def _spec_status(self, spec: "spack.spec.Spec") -> SpecStatus:
+        """Return the install status of a spec, as resolved for all the build requests while
+        the queue is initialized, or as looked up otherwise."""
+        status = self.spec_status.get(spec.dag_hash())
+        return self._lookup_spec_status(spec) if status is None else status
+
+    def _resolve_spec_status(self) -> None:
+        """Look up the install status of the union of the specs of all the build requests,
+        in a single read transaction on the database."""
+        roots = [request.spec for request in self.build_requests]
+        with spack.store.STORE.db.read_transaction():
+            for spec in spack.traverse.traverse_nodes(roots, key=spack.traverse.by_dag_hash):
+                self.spec_status[spec.dag_hash()] = self._lookup_spec_status(spec)
+
+        installed = {h for h, status in self.spec_status.items() if status.installed}
+        for request in self.build_requests:
+            request.installed_hashes = installed
+
     def _check_deps_status(self, request: BuildRequest) -> None:
         """Check the install status of the requested package
 
@@ -1416,9 +1780,10 @@ def _check_deps_status(self, request: BuildRequest) -> None:
         for dep in request.traverse_dependencies():
             dep_pkg = dep.package
             dep_id = package_id(dep)
+            status = self._spec_status(dep)
 
             # Check for failure since a prefix lock is not required
-            if spack.store.STORE.failure_tracker.has_failed(dep):
+            if status.failed:
                 action = "'spack install' the dependency"
                 msg = f"{dep_id} is marked as an install failure: {action}"
                 raise spack.error.InstallError(err.format(request.pkg_id, msg), pkg=dep_pkg)
@@ -1432,16 +1797,16 @@ def _check_deps_status(self, request: BuildRequest) -> None:
                 raise spack.error.InstallError(err.format(request.pkg_id, msg), pkg=request.pkg)
 
             # Flag external and upstream packages as being installed
-            if dep_pkg.spec.external or dep_pkg.spec.installed_upstream:
+            if dep_pkg.spec.external or status.upstream:
                 self._flag_installed(dep_pkg)
                 continue
 
             # Check the database to see if the dependency has been installed
             # and flag as such if appropriate
-            rec, installed_in_db = self._check_db(dep)
+            rec = status.record
             if (
                 rec
-                and installed_in_db
+                and status.installed
                 and (
                     dep.dag_hash() not in request.overwrite
                     or rec.installation_time > request.overwrite_time
@@ -1694,7 +2059,7 @@ def _requeue_with_build_spec_tasks(self, task):
         spec_task.add_dependency(build_pkg_id)
         self._push_task(spec_task)
 
-    def _add_tasks(self, request: BuildRequest, all_deps):
+    def _add_tasks(self, request: BuildRequest, all_deps, visited=None):
         """Add tasks to the priority queue for the given build request.
 
         It also tracks all dependents associated with each dependency in
@@ -1704,6 +2069,7 @@ def _add_tasks(self, request: BuildRequest, all_deps):
             request (BuildRequest): the associated install request
             all_deps (defaultdict(set)): dictionary of all dependencies and
                 associated dependents
+            visited (set): dependencies already handled for other requests
         """
         tty.debug(f"Initializing the build queue for {request.pkg.name}")
 
@@ -1718,7 +2084,7 @@ def _add_tasks(self, request: BuildRequest, all_deps):
         install_deps = request.install_args.get("install_deps")
 
         if install_deps:
-            for dep in request.traverse_dependencies():
+            for dep in request.traverse_dependencies(visited=visited):
                 dep_pkg = dep.package
 
                 dep_id = package_id(dep)
@@ -1728,12 +2094,14 @@ def _add_tasks(self, request: BuildRequest, all_deps):
                 # Clear any persistent failure markings _unless_ they are
                 # associated with another process in this parallel build
                 # of the spec.
-                spack.store.STORE.failure_tracker.clear(dep, force=False)
+                if self._spec_status(dep).failed:
+                    spack.store.STORE.failure_tracker.clear(dep, force=False)
 
         install_package = request.install_args.get("install_package")
         if install_package and request.pkg_id not in self.build_tasks:
             # Be sure to clear any previous failure
-            spack.store.STORE.failure_tracker.clear(request.spec, force=True)
+            if self._spec_status(request.spec).failed:
+                spack.store.STORE.failure_tracker.clear(request.spec, force=True)
 
             # If not installing dependencies, then determine their
             # installation status before proceeding
@@ -1755,7 +2123,15 @@ def _install_task(self, task: Task, install_status: InstallStatus) -> None:
         Args:
             task: the installation task for a package
             install_status: the installation status for the package"""
-        rc = task.execute(install_status)
+        self._handle_execute_result(task, task.execute(install_status))
+
+    def _handle_execute_result(self, task: Task, rc: ExecuteResult) -> None:
+        """
+        Update the installer state according to the result of a task.
+
+        Args:
+            task: the installation task for a package
+            rc: the result of executing the task"""
         if rc == ExecuteResult.MISSING_BUILD_SPEC:
             self._requeue_with_build_spec_tasks(task)
         else:  # if rc == ExecuteResult.SUCCESS or rc == ExecuteResult.FAILED
@@ -1823,6 +2199,8 @@ def _push_task(self, task: Task) -> None:
         # was decremented due to the installation of one of its dependencies.
         self.build_tasks[task.pkg_id] = task
         heapq.heappush(self.build_pq, (task.key, task))
+        if task.pkg_id not in self.prefetches:
+            heapq.heappush(self.prefetch_pq, (task.key, task))
 
     def _release_lock(self, pkg_id: str) -> None:
         """
@@ -1959,11 +2337,31 @@ def _flag_installed(
 
     def _init_queue(self) -> None:
         """Initialize the build queue from the list of build requests."""
+        start = time.time()
+        with spack.util.trace.span("initialize queue", "queue"):
+            self._init_tasks()
+        tty.debug(
+            f"Initialized the build queue with {len(self.build_tasks)} tasks in "
+            f"{pretty_hms(time.time() - start)}"
+        )
+
+    def _init_tasks(self) -> None:
+        """Create the tasks of the build requests, with a single traversal of their specs."""
         all_dependencies: Dict[str, Set[str]] = defaultdict(set)
 
+        tty.debug("Resolving the install status of the specs of the build requests")
+        self._resolve_spec_status()
+
         tty.debug("Initializing the build queue from the build requests")
-        for request in self.build_requests:
-            self._add_tasks(request, all_dependencies)
+        visited: Set[Tuple[str, int]] = set()
+        try:
+            for request in self.build_requests:
+                self._add_tasks(request, all_dependencies, visited)
+        finally:
+            # The status changes during the install, so later tasks query it again
+            self.spec_status.clear()
+            for request in self.build_requests:
+                request.installed_hashes = None
 
         # Add any missing dependents to ensure proper uninstalled dependency
         # tracking when installing multiple specs
@@ -1976,6 +2374,37 @@ def _init_queue(self) -> None:
                     task.add_dependent(dependent_id)
         self.all_dependencies = all_dependencies
 
+        self._set_critical_paths()
+
+    def _set_critical_paths(self) -> None:
+        """Set the critical path of all the queued tasks, and restore the queue order.
+
+        The duration of each task is taken from the build history. Packages that were never
+        built are assumed to take the average duration of those that were, so that without
+        any history tasks are ordered by the length of their chain of dependents.
+        """
+        history = spack.build_history.BuildHistory()
+        history_durations = {
+            pkg_id: history.duration(task.pkg.spec) for pkg_id, task in self.build_tasks.items()
+        }
+        known = [d for d in history_durations.values() if d is not None]
+        default = sum(known) / len(known) if known else 1.0
+        durations = {
+            pkg_id: default if d is None else d for pkg_id, d in history_durations.items()
+        }
+
+        dependents = {
+            pkg_id: {d for d in task.dependents if d in self.build_tasks}
+            for pkg_id, task in self.build_tasks.items()
+        }
+        critical_paths, _ = spack.build_history.longest_chains(durations, dependents)
+        for pkg_id, task in self.build_tasks.items():
+            task.critical_path = critical_paths[pkg_id]
+
+        self.build_pq = [(task.key, task) for task in self.build_tasks.values()]
+        heapq.heapify(self.build_pq)
+        self.prefetch_pq = list(self.build_pq)
+
     def _install_action(self, task: Task) -> InstallAction:
         """
         Determine whether the installation should be overwritten (if it already
@@ -2012,13 +2441,359 @@ def _install_action(self, task: Task) -> InstallAction:
         # back on failure
         return InstallAction.OVERWRITE
 
+    def _can_launch_task(self) -> bool:
+        """Determine if another task can be launched while builds are in progress
+
+        Return:
+            True if there is a free build slot and the next task has priority 0, or if no
+            build is in progress; False otherwise
+        """
+        # Drop removed tasks at the front of the queue, so that the priority check
+        # below is done on the task that will actually be processed next
+        while self.build_pq and self.build_pq[0][1].status == BuildStatus.REMOVED:
+            heapq.heappop(self.build_pq)
+
+        if not self.build_pq:
+            return False
+
+        if not self.active_tasks:
+            return True
+
+        return len(self.active_tasks) < self.max_active_tasks and self._next_is_pri0()
+
+    def _wait_for_active_tasks(self) -> List[BuildTask]:
+        """Block until at least one active task can be completed, and return those tasks."""
+        finished = [task for task in self.active_tasks.values() if task.poll()]
+        if not finished:
+            sentinels = [
+                task.build_process.sentinel
+                for task in self.active_tasks.values()
+                if task.build_process is not None
+            ]
+            if self.ledger is None:
+                multiprocessing.connection.wait(sentinels)
+            else:
+                self._wait_for_ledger(sentinels)
+            finished = [task for task in self.active_tasks.values() if task.poll()]
+        return finished
+
+    def _join_ledger(self) -> Optional[spack.install_ledger.TaskLedger]:
+        """Register this installer in the ledger of the store, if it is cooperative."""
+        if not self.cooperative:
+            return None
+
+        db = spack.store.STORE.db
+        ledger = spack.install_ledger.TaskLedger(db.database_directory, timeout=db.db_lock_timeout)
+        ledger.join()
+        return ledger
+
+    def _update_ledger(self, install_status: InstallStatus) -> None:
+        """Release the claims on the packages that this installer is done with, and requeue
+        the tasks set aside once other installers released packages."""
+        assert self.ledger is not None
+        in_progress = {task.pkg.spec.dag_hash() for task in self.active_tasks.values()}
+        done = self.ledger.claimed - in_progress
+        if done:
+            self.ledger.release(done)
+        else:
+            self.ledger.heartbeat()
+
+        if self.deferred_tasks and self.ledger.current_version() != self.deferred_version:
+            for task in self.deferred_tasks.values():
+                self._requeue_task(task, install_status)
+            self.deferred_tasks.clear()
+
+    def _wait_for_ledger(self, sentinels: List[Any]) -> None:
+        """Block until one of the ``sentinels`` of the active builds is ready, another
+        installer released packages that were set aside, or the heartbeat is due."""
+        assert self.ledger is not None
+        if not sentinels:
+            self.ledger.wait(self.deferred_version, timeout=self.ledger.heartbeat_interval)
+            return
+
+        deadline = time.monotonic() + self.ledger.heartbeat_interval
+        while time.monotonic() < deadline:
+            if self.deferred_tasks and self.ledger.current_version() != self.deferred_version:
+                return
+            if multiprocessing.connection.wait(
+                sentinels, timeout=spack.install_ledger.POLL_INTERVAL
+            ):
+                return
+
+    def _terminate_active_tasks(self) -> None:
+        """Terminate the child processes of all the active tasks."""
+        for pkg_id, task in self.active_tasks.items():
+            if task.build_process is not None:
+                tty.debug(f"Terminating the build of {pkg_id}")
+                task.build_process.terminate()
+                task.build_process = None
+        self.active_tasks.clear()
+
+    def _handle_install_failure(
+        self,
+        task: Task,
+        exc: BaseException,
+        failed_build_requests: List[Tuple["spack.package_base.PackageBase", str, str]],
+        single_requested_spec: bool,
+    ) -> None:
+        """
+        Flag the task as failed, and either record the failure or raise, depending on
+        the fail fast setting and on the build request associated with the task.
+
+        Args:
+            task: the task whose installation failed
+            exc: the exception raised by the installation
+            failed_build_requests: failed build requests to be summarized at the end
+            single_requested_spec: ``True`` if there is a single build request
+        """
+        pkg = task.pkg
+        self._update_failed(task, True, exc)
+
+        # Best effort installs suppress the exception and mark the
+        # package as a failure.
+        if not isinstance(exc, spack.error.SpackError) or not exc.printed:  # type: ignore[union-attr] # noqa: E501
+            exc.printed = True  # type: ignore[union-attr]
+            # SpackErrors can be printed by the build process or at
+            # lower levels -- skip printing if already printed.
+            # TODO: sort out this and SpackError.print_context()
+            tty.error(
+                f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
+            )
+        # Terminate if requested to do so on the first failure.
+        if self.fail_fast:
+            raise spack.error.InstallError(f"{_FAIL_FAST_ERR}: {str(exc)}", pkg=pkg) from exc
+
+        # Terminate when a single build request has failed, or summarize errors later.
+        if task.is_build_request:
+            if single_requested_spec:
+                raise exc
+            failed_build_requests.append((pkg, task.pkg_id, str(exc)))
+
+    def _complete_active_task(
+        self,
+        task: BuildTask,
+        failed_build_requests: List[Tuple["spack.package_base.PackageBase", str, str]],
+        single_requested_spec: bool,
+    ) -> None:
+        """
+        Complete the installation of a package whose build was running in a child process.
+
+        Args:
+            task: the active task to be completed
+            failed_build_requests: failed build requests to be summarized at the end
+            single_requested_spec: ``True`` if there is a single build request
+        """
+        pkg = task.pkg
+        keep_prefix = task.request.install_args.get("keep_prefix")
+        del self.active_tasks[task.pkg_id]
+
+        try:
+            with spack.util.trace.track(self.slots[task.pkg_id][0]):
+                rc = task.complete()
+            if rc is None:
+                # The package is now built from sources in a new child process
+                self.active_tasks[task.pkg_id] = task
+                return
+
+            self._handle_execute_result(task, rc)
+
+            # If we installed then we should keep the prefix
+            stop_before_phase = getattr(pkg, "stop_before_phase", None)
+            last_phase = getattr(pkg, "last_phase", None)
+            keep_prefix = keep_prefix or (stop_before_phase is None and last_phase is None)
+
+        except KeyboardInterrupt as exc:
+            tty.error(
+                f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
+            )
+            raise
+
+        except (Exception, SystemExit) as exc:
+            self._handle_install_failure(task, exc, failed_build_requests, single_requested_spec)
+
+        finally:
+            if task.pkg_id not in self.active_tasks:
+                self._end_slot(task)
+                if not keep_prefix:
+                    pkg.remove_prefix()
+
+        if pkg.spec.installed:
+            self._cleanup_task(pkg)
+
+    def _start_slot(self, task: Task) -> int:
+        """Assign the first free trace track to a task that is being installed."""
+        used = {slot for slot, _ in self.slots.values()}
+        slot = next(i for i in itertools.count(1) if i not in used)
+        self.slots[task.pkg_id] = (slot, spack.util.trace.now())
+        spack.util.trace.name_track(slot, f"build slot {slot}")
+        return slot
+
+    def _end_slot(self, task: Task) -> None:
+        """Emit the span of a task whose installation is over, and free its track."""
+        if task.pkg_id not in self.slots:
+            return
+        slot, start = self.slots.pop(task.pkg_id)
+        if spack.util.trace.enabled():
+            name = task.pkg.spec.format("{name}{@version}{/hash:7}")
+            spack.util.trace.complete(name, "install", start, spack.util.trace.now(), tid=slot)
+
+    def _create_jobserver(self) -> Optional[spack.util.jobserver.JobServer]:
+        """Create a make jobserver shared by all the concurrent builds, if needed.
+
+        The jobserver bounds the total number of make jobs across builds to the number of
+        jobs given on the command line, or to the number of CPUs available otherwise.
+
+        Return:
+            The jobserver, or None if packages are not built concurrently, or if this
+            process already runs under a jobserver
+        """
+        if self.max_active_tasks < 2 or sys.platform == "win32":
+            return None
+
+        if spack.build_environment.jobserver_enabled():
+            tty.debug("Using the jobserver inherited from the parent process")
+            return None
+
+        try:
+            num_jobs = spack.config.get("config:build_jobs", default=None, scope="command_line")
+        except ValueError:
+            num_jobs = None
+        jobserver = spack.util.jobserver.JobServer(num_jobs or cpus_available())
+        tty.debug(f"Created a jobserver with {jobserver.num_jobs} job slots at {jobserver.fifo}")
+
+        for request in self.build_requests:
+            request.install_args["jobserver"] = jobserver.connection
+        return jobserver
+
+    def _create_prefetch_executor(self) -> Optional[concurrent.futures.Executor]:
+        """Create the worker processes that download binary packages ahead of their install.
+
+        Return:
+            The executor, or None if no binary mirror is configured or if worker processes
+            cannot be forked
+        """
+        if multiprocessing.get_start_method() != "fork":
+            return None
+
+        if not spack.mirror.MirrorCollection(binary=True):
+            return None
+
+        return concurrent.futures.ProcessPoolExecutor(_PREFETCH_JOBS)
+
+    def _prefetch_binaries(self) -> None:
+        """Start downloading the binary packages of queued tasks, in queue order.
+
+        Downloads happen in worker processes while other packages are installed. The number
+        of concurrent downloads, and the total size of the downloaded packages waiting to be
+        installed, are bounded. Each queued task is considered only once, when there is room
+        for a new download.
+        """
+        if self.prefetch_executor is None or not self.prefetch_pq:
+            return
+
+        for pkg_id in list(self.prefetches_running):
+            self._account_prefetch(pkg_id)
+
+        # Downloaded packages that left the queue are installed, or will never be
+        for pkg_id in [i for i in self.prefetched_bytes if i not in self.build_tasks]:
+            del self.prefetched_bytes[pkg_id]
+        pending_bytes = sum(self.prefetched_bytes.values())
+
+        while self.prefetch_pq:
+            if (
+                len(self.prefetches_running) >= _PREFETCH_JOBS
+                or pending_bytes >= _PREFETCH_MAX_BYTES
+            ):
+                return
+
+            key, task = heapq.heappop(self.prefetch_pq)
+            # Skip tasks already considered, and entries left behind by a requeued task
+            if (
+                task.pkg_id in self.prefetches
+                or self.build_tasks.get(task.pkg_id) is not task
+                or task.key != key
+                or not isinstance(task, BuildTask)
+            ):
+                continue
+
+            spec = task.pkg.spec
+            self.prefetches[task.pkg_id] = None
+            if not task.use_cache or spec.external or spec.installed:
+                continue
+
+            matches = binary_distribution.get_mirrors_for_spec(spec, index_only=True)
+            if not matches:
+                continue
+
+            tty.debug(f"Downloading the binary package of {task.pkg_id} ahead of its install")
+            task.prefetch = self.prefetch_executor.submit(
+                _prefetch_binary,
+                spec.build_spec,
+                task.request.install_args.get("unsigned"),
+                matches,
+            )
+            self.prefetches[task.pkg_id] = task.prefetch
+            self._account_prefetch(task.pkg_id)
+            pending_bytes += self.prefetched_bytes.get(task.pkg_id, 0)
+
+    def _account_prefetch(self, pkg_id: str) -> None:
+        """Track a download ahead of install as running, or the size of the downloaded
+        package once it is done."""
+        prefetch = self.prefetches[pkg_id]
+        assert prefetch is not None
+        if not prefetch.done():
+            self.prefetches_running.add(pkg_id)
+            return
+
+        self.prefetches_running.discard(pkg_id)
+        if not prefetch.cancelled() and prefetch.exception() is None and prefetch.result():
+            self.prefetched_bytes[pkg_id] = prefetch.result()[1]
+
+    def _close_prefetch_executor(self) -> None:
+        """Stop the downloads ahead of install, and remove the packages left unused."""
+        if self.prefetch_executor is None:
+            return
+
+        for prefetch in self.prefetches.values():
+            if prefetch is not None:
+                prefetch.cancel()
+        self.prefetch_executor.shutdown(wait=True)
+        self.prefetch_executor = None
+
+        for prefetch in self.prefetches.values():
+            if prefetch is None or prefetch.cancelled() or prefetch.exception() is not None:
+                continue
+            result = prefetch.result()
+            if result is not None:
+                # Stages of installed packages are already empty
+                result[0]["tarball_stage"].destroy()
+                result[0]["specfile_stage"].destroy()
+
     def install(self) -> None:
         """Install the requested package(s) and or associated dependencies."""
-
+        jobserver = self._create_jobserver()
+        self.prefetch_executor = self._create_prefetch_executor()
+        self.ledger = self._join_ledger()
+        try:
+            # Group the database updates of the installed packages, so that the index is not
+            # written again after each of them
+            with spack.store.STORE.db.group_commit():
+                self._install()
+        except BaseException:
+            self._terminate_active_tasks()
+            raise
+        finally:
+            self._close_prefetch_executor()
+            if jobserver is not None:
+                jobserver.close()
+            if self.ledger is not None:
+                self.ledger.leave()
+                self.ledger = None
+
+    def _install(self) -> None:
         self._init_queue()
-        fail_fast_err = "Terminating after first install failure"
         single_requested_spec = len(self.build_requests) == 1
-        failed_build_requests = []
+        failed_build_requests: List[Tuple["spack.package_base.PackageBase", str, str]] = []
 
         install_status = InstallStatus(len(self.build_pq))
 
@@ -2028,7 +2803,33 @@ def install(self) -> None:
             enabled=sys.stdout.isatty() and tty.msg_enabled() and not tty.is_debug()
         )
 
-        while self.build_pq:
+        while self.build_pq or self.active_tasks or self.deferred_tasks:
+            self._prefetch_binaries()
+
+            if self.ledger is not None:
+                self._update_ledger(install_status)
+
+            # Complete the builds in progress when no other task can be launched, or as
+            # soon as they are done, so that their dependents are released.
+            if self.active_tasks:
+                if self._can_launch_task():
+                    finished = [task for task in self.active_tasks.values() if task.poll()]
+                else:
+                    finished = self._wait_for_active_tasks()
+
+                for active_task in finished:
+                    self._complete_active_task(
+                        active_task, failed_build_requests, single_requested_spec
+                    )
+
+                if not self._can_launch_task():
+                    continue
+
+            elif self.deferred_tasks and not (self._can_launch_task() and self._next_is_pri0()):
+                # All the packages that can be installed are claimed by other installers
+                self._wait_for_ledger([])
+                continue
+
             task = self._pop_task()
             if task is None:
                 continue
@@ -2080,22 +2881,34 @@ def install(self) -> None:
                 self._update_failed(task)
 
                 if self.fail_fast:
-                    raise spack.error.InstallError(fail_fast_err, pkg=pkg)
+                    raise spack.error.InstallError(_FAIL_FAST_ERR, pkg=pkg)
 
                 continue
 
+            # Set the task aside while another cooperative installer is working on it, and
+            # proceed with other tasks in the meantime.
+            if self.ledger is not None and not self.ledger.claim(spec.dag_hash()):
+                tty.debug(
+                    f"{install_msg(pkg_id, self.pid, install_status)} claimed by another process"
+                )
+                if not self.deferred_tasks:
+                    self.deferred_version = self.ledger.version
+                self.deferred_tasks[pkg_id] = task
+                continue
+
             # Attempt to get a write lock.  If we can't get the lock then
             # another process is likely (un)installing the spec or has
             # determined the spec has already been installed (though the
             # other process may be hung).
             install_status.set_term_title(f"Acquiring lock for {pkg.name}")
             term_status.add(pkg_id)
-            ltype, lock = self._ensure_locked("write", pkg)
-            if lock is None:
-                # Attempt to get a read lock instead.  If this fails then
-                # another process has a write lock so must be (un)installing
-                # the spec (or that process is hung).
-                ltype, lock = self._ensure_locked("read", pkg)
+            with spack.util.trace.span(f"lock {pkg.name}", "lock"):
+                ltype, lock = self._ensure_locked("write", pkg)
+                if lock is None:
+                    # Attempt to get a read lock instead.  If this fails then
+                    # another process has a write lock so must be (un)installing
+                    # the spec (or that process is hung).
+                    ltype, lock = self._ensure_locked("read", pkg)
             # Requeue the spec if we cannot get at least a read lock so we
             # can check the status presumably established by another process
             # -- failed, installed, or uninstalled -- on the next pass.
@@ -2156,12 +2969,24 @@ def install(self) -> None:
             try:
                 action = self._install_action(task)
 
-                if action == InstallAction.INSTALL:
-                    self._install_task(task, install_status)
-                elif action == InstallAction.OVERWRITE:
-                    # spack.store.STORE.db is not really a Database object, but a small
-                    # wrapper -- silence mypy
-                    OverwriteInstall(self, spack.store.STORE.db, task, install_status).install()  # type: ignore[arg-type] # noqa: E501
+                with spack.util.trace.track(self._start_slot(task)):
+                    # Cooperative installers build in child processes even with a single
+                    # build slot, so that they keep their heartbeat in the ledger.
+                    concurrent = self.max_active_tasks > 1 or self.ledger is not None
+                    if action == InstallAction.INSTALL and concurrent:
+                        rc = task.launch(install_status, concurrent=True)
+                        if rc is None:
+                            # The package is being built in a child process, which is
+                            # completed once it is done.
+                            self.active_tasks[pkg_id] = task  # type: ignore[assignment]
+                        else:
+                            self._handle_execute_result(task, rc)
+                    elif action == InstallAction.INSTALL:
+                        self._install_task(task, install_status)
+                    elif action == InstallAction.OVERWRITE:
+                        # spack.store.STORE.db is not really a Database object, but a small
+                        # wrapper -- silence mypy
+                        OverwriteInstall(self, spack.store.STORE.db, task, install_status).install()  # type: ignore[arg-type] # noqa: E501
 
                 # If we installed then we should keep the prefix
                 stop_before_phase = getattr(pkg, "stop_before_phase", None)
@@ -2191,37 +3016,26 @@ def install(self) -> None:
                 continue
 
             except (Exception, SystemExit) as exc:
-                self._update_failed(task, True, exc)
-
-                # Best effort installs suppress the exception and mark the
-                # package as a failure.
-                if not isinstance(exc, spack.error.SpackError) or not exc.printed:  # type: ignore[union-attr] # noqa: E501
-                    exc.printed = True  # type: ignore[union-attr]
-                    # SpackErrors can be printed by the build process or at
-                    # lower levels -- skip printing if already printed.
-                    # TODO: sort out this and SpackError.print_context()
-                    tty.error(
-                        f"Failed to install {pkg.name} due to "
-                        f"{exc.__class__.__name__}: {str(exc)}"
-                    )
-                # Terminate if requested to do so on the first failure.
-                if self.fail_fast:
-                    raise spack.error.InstallError(
-                        f"{fail_fast_err}: {str(exc)}", pkg=pkg
-                    ) from exc
-
-                # Terminate when a single build request has failed, or summarize errors later.
-                if task.is_build_request:
-                    if single_requested_spec:
-                        raise
-                    failed_build_requests.append((pkg, pkg_id, str(exc)))
+                self._handle_install_failure(
+                    task, exc, failed_build_requests, single_requested_spec
+                )
 
             finally:
+                if pkg_id not in self.active_tasks:
+                    self._end_slot(task)
+
                 # Remove the install prefix if anything went wrong during
-                # install.
-                if not keep_prefix and not action == InstallAction.OVERWRITE:
+                # install, unless the package is still being built.
+                if (
+                    not keep_prefix
+                    and not action == InstallAction.OVERWRITE
+                    and pkg_id not in self.active_tasks
+                ):
                     pkg.remove_prefix()
 
+            if pkg_id in self.active_tasks:
+                continue
+
             # Perform basic task cleanup for the installed spec to
             # include downgrading the write to a read lock
             if pkg.spec.installed:
@@ -2298,6 +3112,8 @@ def __init__(self, pkg: "spack.package_base.PackageBase", install_args: dict):
         self.keep_stage = is_develop or install_args.get("keep_stage", False)
         # whether to restage
         self.restage = (not is_develop) and install_args.get("restage", False)
+        # whether to resume the build from the phases completed by a previous build
+        self.resume = install_args.get("resume", False)
 
         # whether to skip the patch phase
         self.skip_patch = install_args.get("skip_patch", False)
@@ -2313,6 +3129,12 @@ def __init__(self, pkg: "spack.package_base.PackageBase", install_args: dict):
 
         # env modifications by Spack
         self.env_mods = install_args.get("env_modifications", EnvironmentModifications())
+        self.shell_modifications = self.env_mods.shell_modifications(
+            explicit=True, env=self.unmodified_env
+        )
+
+        # phases completed by this build, or a previous one in the same stage
+        self.checkpoint = PhaseCheckpoint(pkg, self.shell_modifications)
 
         # timer for build phases
         self.timer = timer.Timer()
@@ -2332,17 +3154,20 @@ def run(self) -> bool:
         stage = self.pkg.stage
         stage.keep = self.keep_stage
 
-        if self.restage:
+        # A resumed build needs the stage of the previous build
+        resumed = self.resume and not self.fake and self.checkpoint.load()
+        if self.restage and not resumed:
             stage.destroy()
 
         with stage:
             self.timer.start("stage")
 
             if not self.fake:
-                if not self.skip_patch:
-                    self.pkg.do_patch()
-                else:
-                    self.pkg.do_stage()
+                with spack.util.trace.span(f"stage {self.pkg.name}", "stage"):
+                    if not self.skip_patch:
+                        self.pkg.do_patch()
+                    else:
+                        self.pkg.do_stage()
 
             self.timer.stop("stage")
 
@@ -2406,8 +3231,7 @@ def _real_install(self) -> None:
             # Save just the changes to the environment.  This file can be
             # safely installed, since it does not contain secret variables.
             with open(pkg.env_mods_path, "w") as env_mods_file:
-                mods = self.env_mods.shell_modifications(explicit=True, env=self.unmodified_env)
-                env_mods_file.write(mods)
+                env_mods_file.write(self.shell_modifications)
 
             for attr in ("configure_args", "cmake_args"):
                 try:
@@ -2427,7 +3251,22 @@ def _real_install(self) -> None:
             # Spawn a daemon that reads from a pipe and redirects
             # everything to log_path, and provide the phase for logging
             builder = spack.builder.create(pkg)
+            phases = [phase_fn.name for phase_fn in builder]
+            resumed = self.checkpoint.phases
+            if not resumed or resumed != phases[: len(resumed)]:
+                self.checkpoint.clear()
+
+            # Phases are recorded as long as they don't write to the prefix, since the prefix
+            # of a failed build is removed
+            checkpoint = True
             for i, phase_fn in enumerate(builder):
+                if i < len(self.checkpoint.phases):
+                    tty.msg(
+                        f"{self.pre} Skipping phase: '{phase_fn.name}' "
+                        "(completed by a previous build)"
+                    )
+                    continue
+
                 # Keep a log file for each phase
                 log_dir = os.path.dirname(pkg.log_path)
                 log_file = "spack-build-%02d-%s-out.txt" % (i + 1, phase_fn.name.lower())
@@ -2454,13 +3293,22 @@ def _real_install(self) -> None:
 
                         # Catch any errors to report to logging
                         self.timer.start(phase_fn.name)
-                        phase_fn.execute()
+                        try:
+                            with spack.util.trace.span(f"{phase_fn.name} {pkg.name}", "phase"):
+                                phase_fn.execute()
+                        except spack.error.StopPhase:
+                            # Stopping at this phase, after it completed
+                            if getattr(pkg, "last_phase", None) == phase_fn.name:
+                                self._record_phase(phase_fn.name, checkpoint)
+                            raise
                         self.timer.stop(phase_fn.name)
 
                 except BaseException:
                     combine_phase_logs(pkg.phase_log_files, pkg.log_path)
                     raise
 
+                checkpoint = self._record_phase(phase_fn.name, checkpoint)
+
                 # We assume loggers share echo True/False
                 self.echo = logger.echo
 
@@ -2468,6 +3316,85 @@ def _real_install(self) -> None:
         combine_phase_logs(pkg.phase_log_files, pkg.log_path)
         log(pkg)
 
+    def _record_phase(self, phase: str, checkpoint: bool) -> bool:
+        """Record a completed phase in the checkpoint, if the prefix is untouched so far.
+
+        Returns whether later phases can be recorded.
+        """
+        prefix = self.pkg.prefix
+        metadata_dir = spack.store.STORE.layout.metadata_dir
+        if not checkpoint or (os.path.isdir(prefix) and set(os.listdir(prefix)) - {metadata_dir}):
+            return False
+        self.checkpoint.record(phase)
+        return True
+
+
+class PhaseCheckpoint:
+    """Phases completed by a build from sources, recorded in the stage of the package.
+
+    The phases are recorded together with a fingerprint of the build: the hash of the spec,
+    a digest of the source archives, and a digest of the modifications made by Spack to the
+    build environment. A later build with the same fingerprint can skip these phases.
+    """
+
+    def __init__(self, pkg: "spack.package_base.PackageBase", environment: str) -> None:
+        self.pkg = pkg
+        self.environment = hashlib.sha256(environment.encode()).hexdigest()
+        self._fingerprint: Optional[Dict[str, str]] = None
+        #: Completed phases, in order of execution
+        self.phases: List[str] = []
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.pkg.stage.path, _CHECKPOINT_FILE)
+
+    def fingerprint(self) -> Dict[str, str]:
+        """Fingerprint of the build, which must match for the phases to be reused"""
+        if self._fingerprint is not None:
+            return self._fingerprint
+
+        sources = hashlib.sha256()
+        for stage in self.pkg.stage:
+            archive = getattr(stage, "archive_file", None)
+            if archive and os.path.isfile(archive):
+                sources.update(spack.util.crypto.checksum(hashlib.sha256, archive).encode())
+        self._fingerprint = {
+            "spec": self.pkg.spec.dag_hash(),
+            "sources": sources.hexdigest(),
+            "environment": self.environment,
+        }
+        return self._fingerprint
+
+    def load(self) -> bool:
+        """Read the phases completed by a previous build with the same fingerprint.
+
+        Returns whether any phase can be skipped.
+        """
+        try:
+            with open(self.path, "r") as f:
+                data = sjson.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if data.get("fingerprint") != self.fingerprint():
+            tty.debug(f"{self.pkg.name}: cannot resume a build with a different fingerprint")
+            return False
+
+        self.phases = list(data.get("phases", []))
+        return bool(self.phases)
+
+    def record(self, phase: str) -> None:
+        """Record that a phase completed."""
+        self.phases.append(phase)
+        with open(self.path, "w") as f:
+            sjson.dump({"fingerprint": self.fingerprint(), "phases": self.phases}, f)
+
+    def clear(self) -> None:
+        """Forget the completed phases."""
+        self.phases = []
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
 
 def build_process(pkg: "spack.package_base.PackageBase", install_args: dict) -> bool:
     """Perform the installation/build of the package.
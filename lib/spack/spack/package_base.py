@@ -2368,9 +2368,12 @@ def possible_dependencies(
 ) -> Dict[str, Set[str]]:
     """Get the possible dependencies of a number of packages.
 
-    See ``PackageBase.possible_dependencies`` for details.
+    See ``PackageBase.possible_dependencies`` for details. Dependencies of packages
+    given by name are computed from the dependency index of the repository, without
+    loading their package classes.
     """
     packages = []
+    names = []
     for pos in pkg_or_spec:
         if isinstance(pos, PackageMeta) and issubclass(pos, PackageBase):
             packages.append(pos)
@@ -2380,10 +2383,14 @@ def possible_dependencies(
             pos = spack.spec.Spec(pos)
 
         if spack.repo.PATH.is_virtual(pos.name):
-            packages.extend(p.package_class for p in spack.repo.PATH.providers_for(pos.name))
-            continue
-        else:
+            names.extend(p.name for p in spack.repo.PATH.providers_for(pos.name))
+        elif pos.namespace:
+            # The index has the packages of the first repository with a given name
             packages.append(pos.package_class)
+        elif spack.repo.PATH.exists(pos.name):
+            names.append(pos.name)
+        else:
+            raise spack.repo.UnknownPackageError(pos.name)
 
     visited: Dict[str, Set[str]] = {}
     for pkg in packages:
@@ -2396,6 +2403,15 @@ def possible_dependencies(
             virtuals=virtuals,
         )
 
+    spack.repo.PATH.dependency_index.possible_dependencies(
+        *names,
+        visited=visited,
+        transitive=transitive,
+        expand_virtuals=expand_virtuals,
+        depflag=depflag,
+        missing=missing,
+        virtuals=virtuals,
+    )
     return visited
 
 
@@ -36,6 +36,7 @@
 
 import spack.caches
 import spack.config
+import spack.dependency_index
 import spack.error
 import spack.patch
 import spack.provider_index
@@ -549,6 +550,22 @@ def write(self, stream):
         self.index.to_json(stream)
 
 
+class DependencyIndexer(Indexer):
+    """Lifecycle methods for the index of direct dependencies."""
+
+    def _create(self):
+        return spack.dependency_index.DependencyIndex(repository=self.repository)
+
+    def read(self, stream):
+        self.index = spack.dependency_index.DependencyIndex.from_json(stream, self.repository)
+
+    def update(self, pkg_fullname):
+        self.index.update_package(pkg_fullname.split(".")[-1])
+
+    def write(self, stream):
+        self.index.to_json(stream)
+
+
 class PatchIndexer(Indexer):
     """Lifecycle methods for patch cache."""
 
@@ -691,6 +708,7 @@ def __init__(
         self._provider_index: Optional[spack.provider_index.ProviderIndex] = None
         self._patch_index: Optional[spack.patch.PatchCache] = None
         self._tag_index: Optional[spack.tag.TagIndex] = None
+        self._dependency_index: Optional[spack.dependency_index.DependencyIndex] = None
 
         # Add each repo to this path.
         for repo in repos:
@@ -805,6 +823,15 @@ def tag_index(self) -> spack.tag.TagIndex:
                 self._tag_index.merge(repo.tag_index)
         return self._tag_index
 
+    @property
+    def dependency_index(self) -> spack.dependency_index.DependencyIndex:
+        """Merged DependencyIndex from all Repos in the RepoPath."""
+        if self._dependency_index is None:
+            self._dependency_index = spack.dependency_index.DependencyIndex(repository=self)
+            for repo in reversed(self.repos):
+                self._dependency_index.merge(repo.dependency_index)
+        return self._dependency_index
+
     @property
     def patch_index(self) -> spack.patch.PatchCache:
         """Merged PatchIndex from all Repos in the RepoPath."""
@@ -1146,6 +1173,7 @@ def index(self) -> RepoIndex:
             self._repo_index.add_indexer("providers", ProviderIndexer(self))
             self._repo_index.add_indexer("tags", TagIndexer(self))
             self._repo_index.add_indexer("patches", PatchIndexer(self))
+            self._repo_index.add_indexer("dependencies", DependencyIndexer(self))
         return self._repo_index
 
     @property
@@ -1158,6 +1186,11 @@ def tag_index(self) -> spack.tag.TagIndex:
         """Index of tags and which packages they're defined on."""
         return self.index["tags"]
 
+    @property
+    def dependency_index(self) -> spack.dependency_index.DependencyIndex:
+        """Index of the direct dependencies of packages in this repo."""
+        return self.index["dependencies"]
+
     @property
     def patch_index(self) -> spack.patch.PatchCache:
         """Index of patches and packages they're defined on."""
@@ -24,6 +24,7 @@
                         "type": "object",
                         "properties": {
                             "roots": {"type": "boolean"},
+                            "max_per_package": {"type": "integer", "minimum": 1},
                             "include": LIST_OF_SPECS,
                             "exclude": LIST_OF_SPECS,
                             "from": {
@@ -45,6 +46,9 @@
                 ]
             },
             "enable_node_namespace": {"type": "boolean"},
+            "cache": {"type": "boolean"},
+            "timeout": {"type": "number", "minimum": 0},
+            "explain": {"type": "boolean"},
             "targets": {
                 "type": "object",
                 "properties": {
@@ -55,6 +59,7 @@
             "unify": {
                 "oneOf": [{"type": "boolean"}, {"type": "string", "enum": ["when_possible"]}]
             },
+            "incremental": {"type": "boolean"},
             "splice": {
                 "type": "object",
                 "additionalProperties": False,
@@ -82,6 +87,21 @@
                 },
             },
             "os_compatible": {"type": "object", "additionalProperties": {"type": "array"}},
+            "portfolio": {
+                "type": "array",
+                "default": [],
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "properties": {
+                        "name": {"type": "string"},
+                        "configuration": {"type": "string"},
+                        "heuristic": {"type": "string"},
+                        "opt_strategy": {"type": "string"},
+                        "parallel_mode": {"type": "string"},
+                    },
+                },
+            },
         },
     }
 }
@@ -13,11 +13,24 @@
 import pprint
 import re
 import sys
+import time
 import types
 import typing
 import warnings
 from contextlib import contextmanager
-from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 import archspec.cpu
 
@@ -40,6 +53,7 @@
 import spack.repo
 import spack.spec
 import spack.store
+import spack.traverse
 import spack.util.crypto
 import spack.util.libc
 import spack.util.path
@@ -51,6 +65,7 @@
 from spack.config import get_mark_from_yaml_data
 from spack.error import SpecSyntaxError
 
+from . import portfolio, profile
 from .core import (
     AspFunction,
     NodeArgument,
@@ -62,8 +77,18 @@
     fn,
     parse_files,
     parse_term,
+    solve_with_timeout,
+)
+from .counter import Counter, FullDuplicatesCounter, MinimalDuplicatesCounter, NoDuplicatesCounter
+from .fact_cache import (
+    FactId,
+    PackageFactCache,
+    UncacheableFact,
+    fact_template,
+    package_hash,
+    render_facts,
 )
-from .counter import FullDuplicatesCounter, MinimalDuplicatesCounter, NoDuplicatesCounter
+from .result_cache import ConcretizationCache, solve_key
 from .version_order import concretization_version_order
 
 GitOrStandardVersion = Union[spack.version.GitVersion, spack.version.StandardVersion]
@@ -81,8 +106,9 @@
 #:     stats (bool): Whether to output Clingo's internal solver statistics.
 #:     out: Optional output stream for the generated ASP program.
 #:     setup_only (bool): if True, stop after setup and don't solve (default False).
+#:     profile (bool): if True, attach a profile of the solve to the result (default False).
 OutputConfiguration = collections.namedtuple(
-    "OutputConfiguration", ["timers", "stats", "out", "setup_only"]
+    "OutputConfiguration", ["timers", "stats", "out", "setup_only", "profile"], defaults=[False]
 )
 
 #: Default output configuration for a solve
@@ -93,11 +119,7 @@
 
 def default_clingo_control():
     """Return a control object with the default settings used in Spack"""
-    control = clingo().Control()
-    control.configuration.configuration = "tweety"
-    control.configuration.solver.heuristic = "Domain"
-    control.configuration.solver.opt_strategy = "usc,one"
-    return control
+    return portfolio.DEFAULT_CONFIGURATION.control()
 
 
 class Provenance(enum.IntEnum):
@@ -361,10 +383,20 @@ class Result:
     def __init__(self, specs, asp=None):
         self.asp = asp
         self.satisfiable = None
+        # False if the solver was stopped before proving the best model optimal
         self.optimal = None
         self.warnings = None
         self.nmodels = 0
 
+        # Name of the configuration that won the portfolio race, if any
+        self.solver_configuration = None
+
+        # Profile of the solve, if requested
+        self.profile = None
+
+        # Timer of the phases of the solve
+        self.timer = None
+
         # Saved control object for reruns when necessary
         self.control = None
 
@@ -383,6 +415,16 @@ def __init__(self, specs, asp=None):
         self._concrete_specs = None
         self._unsolved_specs = None
 
+    def format_criteria(self):
+        """Format the optimization criteria of the best answer, one per line."""
+        lines = []
+        for installed_cost, build_cost, name in self.criteria:
+            if build_cost is None:
+                lines.append(f"    {name}: {installed_cost}")
+            else:
+                lines.append(f"    {name}: {installed_cost} (installed), {build_cost} (to build)")
+        return "\n".join(lines)
+
     def format_core(self, core):
         """
         Format an unsatisfiable core for human readability
@@ -407,13 +449,14 @@ def format_core(self, core):
 
         return sorted(str(symbol) for symbol in core_symbols)
 
-    def minimize_core(self, core):
+    def minimize_core(self, core, deadline: Optional[float] = None):
         """
         Return a subset-minimal subset of the core.
 
         Clingo cores may be thousands of lines when two facts are sufficient to
         ensure unsatisfiability. This algorithm reduces the core to only those
-        essential facts.
+        essential facts. If a deadline, as given by ``time.monotonic()``, is
+        passed, the core is reduced only until then.
         """
         error_msg = (
             "Internal Error: ASP Result.control not populated. Please report to the spack"
@@ -423,6 +466,8 @@ def minimize_core(self, core):
 
         min_core = core[:]
         for fact in core:
+            if deadline is not None and time.monotonic() > deadline:
+                break
             # Try solving without this fact
             min_core.remove(fact)
             ret = self.control.solve(assumptions=min_core)
@@ -430,19 +475,21 @@ def minimize_core(self, core):
                 min_core.append(fact)
         return min_core
 
-    def minimal_cores(self):
+    def minimal_cores(self, timeout: Optional[float] = None):
         """
-        Return a list of subset-minimal unsatisfiable cores.
+        Return a list of subset-minimal unsatisfiable cores. If a timeout is given,
+        the cores are reduced only for that many seconds.
         """
-        return [self.minimize_core(core) for core in self.cores]
+        deadline = time.monotonic() + timeout if timeout else None
+        return [self.minimize_core(core, deadline=deadline) for core in self.cores]
 
-    def format_minimal_cores(self):
+    def format_minimal_cores(self, timeout: Optional[float] = None):
         """List of facts for each core
 
         Separate cores are separated by an empty line
         """
         string_list = []
-        for core in self.minimal_cores():
+        for core in self.minimal_cores(timeout=timeout):
             if string_list:
                 string_list.append("\n")
             string_list.extend(self.format_core(core))
@@ -475,8 +522,11 @@ def raise_if_unsat(self):
         if len(constraints) == 1:
             constraints = constraints[0]
 
-        conflicts = self.format_minimal_cores()
-        raise SolverError(constraints, conflicts=conflicts)
+        if not spack.config.get("concretizer:explain", True):
+            raise SolverError(constraints, conflicts=None)
+
+        timeout = spack.config.get("concretizer:timeout", 0)
+        raise SolverError(constraints, conflicts=lambda: self.format_minimal_cores(timeout))
 
     @property
     def specs(self):
@@ -715,10 +765,38 @@ def message(self, errors) -> str:
         return "\n".join((header, *messages))
 
     def raise_if_errors(self):
+        """Raise an error if the model has errors.
+
+        The errors are formatted right away, so that a bug in formatting them is not taken
+        for an unsatisfiable spec. Their causes, which are expensive to compute, are added
+        only when the message of the error is needed.
+        """
         initial_error_args = extract_args(self.model, "error")
         if not initial_error_args:
             return
 
+        try:
+            msg = self.message(_sorted_errors(initial_error_args))
+        except Exception as e:
+            msg = (
+                f"unexpected error during concretization [{str(e)}]. "
+                f"Please report a bug at https://github.com/spack/spack/issues"
+            )
+            raise spack.error.SpackError(msg) from e
+
+        if not spack.config.get("concretizer:explain", True):
+            raise UnsatisfiableSpecError(
+                f"{msg}\n    Use the --explain option to show the causes of the errors"
+            )
+
+        timeout = spack.config.get("concretizer:timeout", 0)
+        raise UnsatisfiableSpecError(lambda: self.explanation(msg, timeout=timeout))
+
+    def _solve_for_causes(self, timeout: Optional[float]) -> bool:
+        """Solve again with the model as input, to compute the causes of the errors.
+
+        Returns True if the causes were computed within the timeout.
+        """
         error_causation = clingo().Control()
 
         parent_dir = pathlib.Path(__file__).parent
@@ -734,22 +812,40 @@ def on_model(model):
 
             error_causation.load(str(errors_lp))
             error_causation.ground([("base", []), ("error_messages", [])])
-            _ = error_causation.solve(on_model=on_model)
+            _ = solve_with_timeout(error_causation, timeout, on_model=on_model)
+
+        return self.full_model is not None
+
+    def explanation(self, initial_message: str, *, timeout: float) -> str:
+        """Return the message for the errors of the model, with the conditions that cause
+        each of them.
+
+        Arguments:
+            initial_message: message for the errors, without their causes
+            timeout: seconds after which the computation of the causes is stopped
+        """
+        if not self._solve_for_causes(timeout):
+            note = f"The causes of the errors were not computed within {timeout} seconds"
+            return f"{initial_message}\n    {note}"
 
         # No choices so there will be only one model
         error_args = extract_args(self.full_model, "error")
-        errors = sorted(
-            [(int(priority), msg, args) for priority, msg, *args in error_args], reverse=True
-        )
         try:
-            msg = self.message(errors)
+            return self.message(_sorted_errors(error_args))
         except Exception as e:
-            msg = (
-                f"unexpected error during concretization [{str(e)}]. "
-                f"Please report a bug at https://github.com/spack/spack/issues"
+            # The message is being printed, so the error can only be reported in it
+            tty.debug(f"unexpected error while explaining a concretization error: {e}")
+            return (
+                f"{initial_message}\n    The causes of the errors could not be computed "
+                f"[{str(e)}]. Please report a bug at https://github.com/spack/spack/issues"
             )
-            raise spack.error.SpackError(msg) from e
-        raise UnsatisfiableSpecError(msg)
+
+
+def _sorted_errors(error_args) -> List[Tuple[int, str, List[Any]]]:
+    """Errors of a model, from the highest to the lowest priority"""
+    return sorted(
+        [(int(priority), msg, args) for priority, msg, *args in error_args], reverse=True
+    )
 
 
 class RequirementRule(NamedTuple):
@@ -796,7 +892,29 @@ def __init__(self, cores=True):
         # This attribute will be reset at each call to solve
         self.control = None
 
-    def solve(self, setup, specs, reuse=None, output=None, control=None, allow_deprecated=False):
+    @staticmethod
+    def _profile(specs, timer, gen, ground=None, statistics=None):
+        """Return the profile of a solve, with the phases and setup that ran so far"""
+        result = {
+            "specs": [str(s) for s in specs],
+            "phases": timer.write_json(out=None)["phases"],
+            "setup": gen.profiler.profile(gen.asp_problem),
+            "ground": ground,
+        }
+        if statistics is not None:
+            result.update(profile.statistics_profile(statistics))
+        return result
+
+    def solve(
+        self,
+        setup,
+        specs,
+        reuse=None,
+        output=None,
+        control=None,
+        allow_deprecated=False,
+        node_counter=None,
+    ):
         """Set up the input and solve for dependencies of ``specs``.
 
         Arguments:
@@ -808,6 +926,7 @@ def solve(self, setup, specs, reuse=None, output=None, control=None, allow_depre
             control (clingo.Control): configuration for the solver. If None,
                 default values will be used
             allow_deprecated: if True, allow deprecated versions in the solve
+            node_counter: possible packages of the solve, if already computed
 
         Return:
             A tuple of the solve result, the timer for the different phases of the
@@ -819,7 +938,12 @@ def solve(self, setup, specs, reuse=None, output=None, control=None, allow_depre
         output = output or DEFAULT_OUTPUT_CONFIGURATION
         timer = spack.util.timer.Timer()
 
-        # Initialize the control object for the solver
+        # Initialize the control object for the solver. With more than one configuration
+        # in the portfolio, the configurations race in separate processes instead.
+        configurations = portfolio.configurations(spack.config.get("concretizer:portfolio", []))
+        if control is None and len(configurations) == 1:
+            control = configurations[0].control()
+        race = control is None and len(configurations) > 1 and not output.profile
         self.control = control or default_clingo_control()
 
         # ensure core deps are present on Windows
@@ -829,102 +953,176 @@ def solve(self, setup, specs, reuse=None, output=None, control=None, allow_depre
             tty.debug("Ensuring basic dependencies {win-sdk, wgl} available")
             spack.bootstrap.core.ensure_winsdk_external_or_raise()
 
+        # Facts are added to the solver as they are generated, unless the text of the whole
+        # problem is needed to race solver configurations, or to profile the setup
         timer.start("setup")
-        asp_problem = setup.setup(specs, reuse=reuse, allow_deprecated=allow_deprecated)
-        if output.out is not None:
-            output.out.write(asp_problem)
-        if output.setup_only:
-            return Result(specs), None, None
+        setup_kwargs = {
+            "reuse": reuse,
+            "allow_deprecated": allow_deprecated,
+            "node_counter": node_counter,
+        }
+        streaming = not race and not output.profile
+        if streaming:
+            with self.control.backend() as backend:
+                gen = StreamingProblemBuilder(backend, out=output.out)
+                asp_problem = setup.setup(specs, gen=gen, **setup_kwargs)
+        else:
+            gen = _ProfilingBuilder() if output.profile else ProblemInstanceBuilder()
+            asp_problem = setup.setup(specs, gen=gen, **setup_kwargs)
+            if output.out is not None:
+                output.out.write(asp_problem)
         timer.stop("setup")
+        if output.setup_only:
+            result = Result(specs)
+            if output.profile:
+                result.profile = self._profile(specs, timer, gen)
+            return result, None, None
 
-        timer.start("load")
-        # Add the problem instance
-        self.control.add("base", [], asp_problem)
-        # Load the file itself
+        # Logic programs to be loaded along with the problem instance
         parent_dir = os.path.dirname(__file__)
-        self.control.load(os.path.join(parent_dir, "concretize.lp"))
-        self.control.load(os.path.join(parent_dir, "heuristic.lp"))
-        self.control.load(os.path.join(parent_dir, "display.lp"))
+        files = ["concretize.lp", "heuristic.lp", "display.lp"]
         if not setup.concretize_everything:
-            self.control.load(os.path.join(parent_dir, "when_possible.lp"))
+            files.append("when_possible.lp")
 
         # Binary compatibility is based on libc on Linux, and on the os tag elsewhere
         if using_libc_compatibility():
-            self.control.load(os.path.join(parent_dir, "libc_compatibility.lp"))
+            files.append("libc_compatibility.lp")
         else:
-            self.control.load(os.path.join(parent_dir, "os_compatibility.lp"))
-
-        timer.stop("load")
+            files.append("os_compatibility.lp")
+        files = [os.path.join(parent_dir, f) for f in files]
 
-        # Grounding is the first step in the solve -- it turns our facts
-        # and first-order logic rules into propositional logic.
-        timer.start("ground")
-        self.control.ground([("base", [])])
-        timer.stop("ground")
+        # Seconds after which the optimization stops, and the best model so far is used
+        timeout = spack.config.get("concretizer:timeout", 0)
 
-        # With a grounded program, we can run the solve.
         models = []  # stable models if things go well
         cores = []  # unsatisfiable cores if they do not
+        winner = None
+        ground = None
+        if race:
+            timer.start("solve")
+            winner = portfolio.race(
+                configurations, asp_problem, files, setup.assumptions, timeout=timeout
+            )
+            timer.stop("solve")
+            if winner.satisfiable is None:
+                raise SolverTimeoutError(timeout)
+            tty.verbose(
+                f"The solver configuration '{winner.configuration.name}' won the race. Set "
+                "concretizer:portfolio to that configuration only to use it without racing."
+            )
+            if winner.satisfiable:
+                models.append(winner.best_model)
+
+        # Without a winner, or to explain why the problem is unsatisfiable, solve here. The
+        # cores of the winner refer to literals of its own process, so they can't be used.
+        if winner is None or not winner.satisfiable:
+            timer.start("load")
+            # Add the problem instance
+            self.control.add("base", [], asp_problem)
+            # Load the files
+            for path in files:
+                self.control.load(path)
+            timer.stop("load")
+
+            # Grounding is the first step in the solve -- it turns our facts
+            # and first-order logic rules into propositional logic.
+            timer.start("ground")
+            self.control.ground([("base", [])])
+            timer.stop("ground")
+            ground = profile.ground_profile(self.control) if output.profile else None
+
+            # With a grounded program, we can run the solve.
+            def on_model(model):
+                models.append((model.cost, model.symbols(shown=True, terms=True)))
+
+            solve_kwargs = {
+                "assumptions": setup.assumptions,
+                "on_model": on_model,
+                "on_core": cores.append,
+            }
 
-        def on_model(model):
-            models.append((model.cost, model.symbols(shown=True, terms=True)))
-
-        solve_kwargs = {
-            "assumptions": setup.assumptions,
-            "on_model": on_model,
-            "on_core": cores.append,
-        }
-
-        if clingo_cffi():
-            solve_kwargs["on_unsat"] = cores.append
+            if clingo_cffi():
+                solve_kwargs["on_unsat"] = cores.append
 
-        timer.start("solve")
-        solve_result = self.control.solve(**solve_kwargs)
-        timer.stop("solve")
+            timer.start("solve")
+            solve_result = solve_with_timeout(self.control, timeout, **solve_kwargs)
+            timer.stop("solve")
+            if solve_result.satisfiable is None:
+                raise SolverTimeoutError(timeout)
+            satisfiable, optimal = solve_result.satisfiable, not solve_result.interrupted
+        else:
+            satisfiable, optimal = True, winner.optimal
 
         # once done, construct the solve result
         result = Result(specs)
-        result.satisfiable = solve_result.satisfiable
-
-        if result.satisfiable:
-            # get the best model
-            builder = SpecBuilder(specs, hash_lookup=setup.reusable_and_possible)
-            min_cost, best_model = min(models)
+        result.satisfiable = satisfiable
+        result.optimal = optimal
+        result.timer = timer
+        if winner is not None:
+            result.solver_configuration = winner.configuration.name
+
+        statistics = (
+            winner.statistics if winner and winner.satisfiable else self.control.statistics
+        )
+        try:
+            if result.satisfiable:
+                # get the best model
+                builder = SpecBuilder(specs, hash_lookup=setup.reusable_and_possible)
+                min_cost, best_model = min(models)
+
+                # first check for errors
+                error_handler = ErrorHandler(best_model, specs)
+                error_handler.raise_if_errors()
+
+                # build specs from spec attributes in the model
+                timer.start("build")
+                spec_attrs = [
+                    (name, tuple(rest)) for name, *rest in extract_args(best_model, "attr")
+                ]
+                answers = builder.build_specs(spec_attrs)
+                timer.stop("build")
 
-            # first check for errors
-            error_handler = ErrorHandler(best_model, specs)
-            error_handler.raise_if_errors()
+                # add best spec to the results
+                result.answers.append((list(min_cost), 0, answers))
 
-            # build specs from spec attributes in the model
-            spec_attrs = [(name, tuple(rest)) for name, *rest in extract_args(best_model, "attr")]
-            answers = builder.build_specs(spec_attrs)
+                # get optimization criteria
+                criteria_args = extract_args(best_model, "opt_criterion")
+                result.criteria = build_criteria_names(min_cost, criteria_args)
 
-            # add best spec to the results
-            result.answers.append((list(min_cost), 0, answers))
+                # record the number of models the solver considered
+                result.nmodels = winner.nmodels if winner else len(models)
 
-            # get optimization criteria
-            criteria_args = extract_args(best_model, "opt_criterion")
-            result.criteria = build_criteria_names(min_cost, criteria_args)
+                # record the possible dependencies in the solve
+                result.possible_dependencies = setup.pkgs
 
-            # record the number of models the solver considered
-            result.nmodels = len(models)
+                if not result.optimal:
+                    tty.warn(
+                        f"the solver stopped after {timeout} seconds, so the solution is the "
+                        f"best one found but might not be optimal. Its optimization criteria "
+                        f"are:\n{result.format_criteria()}"
+                    )
 
-            # record the possible dependencies in the solve
-            result.possible_dependencies = setup.pkgs
+            elif cores:
+                result.control = self.control
+                result.cores.extend(cores)
 
-        elif cores:
-            result.control = self.control
-            result.cores.extend(cores)
+            if output.timers:
+                timer.write_tty()
+                print()
 
-        if output.timers:
-            timer.write_tty()
-            print()
+            if output.stats:
+                print("Statistics:")
+                pprint.pprint(statistics)
 
-        if output.stats:
-            print("Statistics:")
-            pprint.pprint(self.control.statistics)
+            if output.profile:
+                result.profile = self._profile(specs, timer, gen, ground, statistics)
 
-        result.raise_if_unsat()
+            result.raise_if_unsat()
+        except spack.error.SpackError as e:
+            # Unsatisfiable problems are often the slowest to solve, so they are profiled too
+            if output.profile:
+                e.profile = result.profile or self._profile(specs, timer, gen, ground, statistics)
+            raise
 
         if result.satisfiable and result.unsolved_specs and setup.concretize_everything:
             unsolved_str = Result.format_unsolved(result.unsolved_specs)
@@ -934,7 +1132,7 @@ def on_model(model):
                 f"https://github.com/spack/spack/issues\n\t{unsolved_str}"
             )
 
-        return result, timer, self.control.statistics
+        return result, timer, statistics
 
 
 class ConcreteSpecsByHash(collections.abc.Mapping):
@@ -1163,6 +1361,9 @@ def __init__(self, tests: bool = False):
         # list of unique libc specs targeted by compilers (or an educated guess if no compiler)
         self.libcs: List[spack.spec.Spec] = []
 
+        # Cache of the facts derived from package directives, if enabled
+        self.fact_cache: Optional[PackageFactCache] = None
+
     def pkg_version_rules(self, pkg):
         """Output declared versions of a package.
 
@@ -1318,6 +1519,47 @@ def pkg_rules(self, pkg, tests):
         self.pkg_version_rules(pkg)
         self.gen.newline()
 
+        # languages, variants, conflicts, virtuals and dependencies
+        self.directive_rules(pkg)
+
+        # virtual preferences
+        self.virtual_preferences(
+            pkg.name,
+            lambda v, p, i: self.gen.fact(fn.pkg_fact(pkg.name, fn.provider_preference(v, p, i))),
+        )
+
+        self.package_requirement_rules(pkg)
+
+        # trigger and effect tables
+        self.trigger_rules()
+        self.effect_rules()
+
+    def directive_rules(self, pkg):
+        """Emit the facts derived from the directives of a package.
+
+        If ``concretizer:cache`` is enabled, or the setup is shared, the facts are replayed
+        from the cache of package facts, or recorded into it.
+        """
+        # Flush pending conditions, so that the facts of the package don't refer to them
+        self.trigger_rules()
+        self.effect_rules()
+
+        if self.fact_cache is None:
+            self._directive_rules(pkg)
+            return
+
+        tests = bool(self.tests) and (isinstance(self.tests, bool) or pkg.name in self.tests)
+        virtuals = [v for v in pkg.provided_virtual_names() if v in self.possible_virtuals]
+        key = self.fact_cache.key(pkg, tests=tests, virtuals=virtuals)
+        facts = self.fact_cache.load(pkg.name, key, pkg_class=self.pkg_class)
+        if facts is None:
+            facts = self._record_directive_rules(pkg)
+            if facts is None:
+                return
+            self.fact_cache.store(pkg.name, key, facts)
+        self._replay_directive_rules(pkg, facts)
+
+    def _directive_rules(self, pkg):
         # languages
         self.package_languages(pkg)
 
@@ -1333,18 +1575,134 @@ def pkg_rules(self, pkg, tests):
         # dependencies
         self.package_dependencies_rules(pkg)
 
-        # virtual preferences
-        self.virtual_preferences(
-            pkg.name,
-            lambda v, p, i: self.gen.fact(fn.pkg_fact(pkg.name, fn.provider_preference(v, p, i))),
-        )
-
-        self.package_requirement_rules(pkg)
-
         # trigger and effect tables
         self.trigger_rules()
         self.effect_rules()
 
+    def _record_directive_rules(self, pkg) -> Optional[Dict[str, Any]]:
+        """Record the facts derived from the directives of a package, together with the
+        state of the setup they update.
+
+        Returns the facts in the format of the cache of package facts, or None if they
+        cannot be cached. In the latter case the facts are emitted directly.
+        """
+        saved = (
+            self.gen,
+            self.variant_ids_by_def_id,
+            self.variant_values_from_specs,
+            self.version_constraints,
+            self.target_constraints,
+            self.compiler_version_constraints,
+        )
+        recorder = _FactRecorder()
+        first_id = next(self._id_counter)
+        self.gen = recorder
+        self._id_counter = map(FactId, itertools.count(first_id))
+        self.variant_ids_by_def_id = {}
+        self.variant_values_from_specs = set()
+        self.version_constraints = set()
+        self.target_constraints = set()
+        self.compiler_version_constraints = set()
+        try:
+            self._directive_rules(pkg)
+            recorded = (
+                self.variant_ids_by_def_id,
+                self.variant_values_from_specs,
+                self.version_constraints,
+                self.target_constraints,
+                self.compiler_version_constraints,
+            )
+        finally:
+            (
+                self.gen,
+                self.variant_ids_by_def_id,
+                self.variant_values_from_specs,
+                self.version_constraints,
+                self.target_constraints,
+                self.compiler_version_constraints,
+            ) = saved
+            num_ids = next(self._id_counter) - first_id
+            self._id_counter = itertools.count(first_id + num_ids)
+
+        variant_ids, variant_values, version_constraints, targets, compilers = recorded
+        try:
+            templates = [
+                item if isinstance(item, str) else fact_template(item, first_id)
+                for item in recorder.asp_problem
+            ]
+        except UncacheableFact as e:
+            tty.debug(f"Cannot cache the facts of {pkg.name}: {e}")
+            for item in recorder.asp_problem:
+                if isinstance(item, str):
+                    self.gen.append(item)
+                else:
+                    self.gen.fact(item)
+            self.variant_ids_by_def_id.update(variant_ids)
+            self.variant_values_from_specs.update(variant_values)
+            self.version_constraints.update(version_constraints)
+            self.target_constraints.update(targets)
+            self.compiler_version_constraints.update(compilers)
+            return None
+
+        # The ids are allocated again when the facts are replayed
+        self._id_counter = itertools.count(first_id)
+
+        def variant_definitions(pkg_cls) -> Dict[int, Tuple[str, int]]:
+            return {
+                id(variant_def): (name, idx)
+                for name in pkg_cls.variant_names()
+                for idx, (_, variant_def) in enumerate(pkg_cls.variant_definitions(name))
+            }
+
+        definitions = variant_definitions(pkg)
+        values = []
+        for pkg_name, def_id, value in sorted(variant_values, key=str):
+            pkg_cls = self.pkg_class(pkg_name)
+            name, idx = variant_definitions(pkg_cls)[def_id]
+            if not isinstance(value, (bool, int)):
+                value = str(value)
+            values.append([pkg_name, name, idx, value])
+
+        return {
+            "ids": num_ids,
+            "facts": templates,
+            "variant_ids": [[*definitions[d], vid - first_id] for d, vid in variant_ids.items()],
+            "variant_values": values,
+            "version_constraints": sorted([n, str(v)] for n, v in version_constraints),
+            "target_constraints": sorted(str(t) for t in targets),
+            "compiler_version_constraints": sorted(str(c) for c in compilers),
+            "dependencies": {
+                name: package_hash(self.pkg_class(name)) for name in sorted({v[0] for v in values})
+            },
+        }
+
+    def _replay_directive_rules(self, pkg, facts: Dict[str, Any]):
+        """Emit the facts derived from the directives of a package, from a recording."""
+        first_id = next(self._id_counter)
+        ids = list(range(first_id, first_id + facts["ids"]))
+        self._id_counter = itertools.count(first_id + facts["ids"])
+
+        for text in render_facts(facts["facts"], ids):
+            self.gen.append(text)
+
+        for name, idx, vid in facts["variant_ids"]:
+            _, variant_def = pkg.variant_definitions(name)[idx]
+            self.variant_ids_by_def_id[id(variant_def)] = ids[vid]
+
+        for pkg_name, name, idx, value in facts["variant_values"]:
+            _, variant_def = self.pkg_class(pkg_name).variant_definitions(name)[idx]
+            self.variant_values_from_specs.add((pkg_name, id(variant_def), value))
+
+        self.version_constraints.update(
+            (name, vn.VersionList(versions)) for name, versions in facts["version_constraints"]
+        )
+        self.target_constraints.update(
+            spack.spec._make_microarchitecture(t) for t in facts["target_constraints"]
+        )
+        self.compiler_version_constraints.update(
+            spack.spec.CompilerSpec(c) for c in facts["compiler_version_constraints"]
+        )
+
     def trigger_rules(self):
         """Flushes all the trigger rules collected so far, and clears the cache."""
         if not self._trigger_cache:
@@ -2562,6 +2920,8 @@ def setup(
         *,
         reuse: Optional[List[spack.spec.Spec]] = None,
         allow_deprecated: bool = False,
+        node_counter: Optional[Counter] = None,
+        gen: Optional["ProblemInstanceBuilder"] = None,
     ) -> str:
         """Generate an ASP program with relevant constraints for specs.
 
@@ -2573,10 +2933,13 @@ def setup(
             specs: list of Specs to solve
             reuse: list of concrete specs that can be reused
             allow_deprecated: if True adds deprecated versions into the solve
+            node_counter: possible packages of the solve, if already computed
+            gen: builder of the problem instance. If None, the whole problem is returned as text
         """
         check_packages_exist(specs)
 
-        node_counter = _create_counter(specs, tests=self.tests)
+        if node_counter is None:
+            node_counter = _create_counter(specs, tests=self.tests)
         self.possible_virtuals = node_counter.possible_virtuals()
         self.pkgs = node_counter.possible_dependencies()
         self.libcs = sorted(all_libcs())  # type: ignore[type-var]
@@ -2593,7 +2956,11 @@ def setup(
             if node.namespace is not None:
                 self.explicitly_required_namespaces[node.name] = node.namespace
 
-        self.gen = ProblemInstanceBuilder()
+        self.gen = gen or ProblemInstanceBuilder()
+        if _SHARED_SETUP is not None:
+            self.fact_cache = _SHARED_SETUP.fact_cache
+        elif spack.config.get("concretizer:cache", False):
+            self.fact_cache = PackageFactCache()
         compiler_parser = CompilerParser(configuration=spack.config.CONFIG).with_input_specs(specs)
 
         if using_libc_compatibility():
@@ -2725,7 +3092,7 @@ def visit(node):
                                 arg = ast_sym(ast_sym(term.atom).arguments[0])
                                 symbol = AspFunction(name)(arg.string)
                                 self.assumptions.append((parse_term(str(symbol)), True))
-                                self.gen.asp_problem.append(f"{{ {symbol} }}.\n")
+                                self.gen.append(f"{{ {symbol} }}.\n")
 
         path = os.path.join(parent_dir, "concretize.lp")
         parse_files([path], visit)
@@ -2940,12 +3307,12 @@ def append(self, rule: str) -> None:
         self.asp_problem.append(rule)
 
     def title(self, header: str, char: str) -> None:
-        self.asp_problem.append("\n")
-        self.asp_problem.append("%" + (char * 76))
-        self.asp_problem.append("\n")
-        self.asp_problem.append(f"% {header}\n")
-        self.asp_problem.append("%" + (char * 76))
-        self.asp_problem.append("\n")
+        self.append("\n")
+        self.append("%" + (char * 76))
+        self.append("\n")
+        self.append(f"% {header}\n")
+        self.append("%" + (char * 76))
+        self.append("\n")
 
     def h1(self, header: str) -> None:
         self.title(header, "=")
@@ -2954,15 +3321,72 @@ def h2(self, header: str) -> None:
         self.title(header, "-")
 
     def h3(self, header: str):
-        self.asp_problem.append(f"% {header}\n")
+        self.append(f"% {header}\n")
 
     def newline(self):
-        self.asp_problem.append("\n")
+        self.append("\n")
 
     def value(self) -> str:
         return "".join(self.asp_problem)
 
 
+class StreamingProblemBuilder(ProblemInstanceBuilder):
+    """Adds facts to the backend of a control object as soon as they are generated.
+
+    Facts don't need to be formatted as text and parsed again by clingo, and the problem
+    instance is not kept in memory. Only rules and comments are kept, and returned by
+    ``value()``, since they need to be added to the control object as text.
+
+    >>> with control.backend() as backend:
+    ...     builder = StreamingProblemBuilder(backend)
+    ...     ...
+    >>> control.add("base", [], builder.value())
+    """
+
+    def __init__(self, backend, out=None):
+        super().__init__()
+        self.backend = backend
+        #: optional stream where the whole problem instance is written, for debugging
+        self.out = out
+
+    def fact(self, atom: AspFunction) -> None:
+        symbol = atom.symbol() if hasattr(atom, "symbol") else atom
+        if isinstance(symbol, str):
+            self.append(f"{symbol}.\n")
+            return
+        self.backend.add_rule([self.backend.add_atom(symbol)])
+        if self.out is not None:
+            self.out.write(f"{str(symbol)}.\n")
+
+    def append(self, rule: str) -> None:
+        super().append(rule)
+        if self.out is not None:
+            self.out.write(rule)
+
+
+class _ProfilingBuilder(ProblemInstanceBuilder):
+    """Records where each section of the problem starts, and when"""
+
+    def __init__(self):
+        super().__init__()
+        self.profiler = profile.SetupProfiler()
+
+    def title(self, header: str, char: str) -> None:
+        self.profiler.mark(len(self.asp_problem), 1 if char == "=" else 2, header)
+        super().title(header, char)
+
+    def value(self) -> str:
+        self.profiler.stop()
+        return super().value()
+
+
+class _FactRecorder(ProblemInstanceBuilder):
+    """Records facts as ASP functions, so that they can be turned into templates"""
+
+    def fact(self, atom: AspFunction) -> None:
+        self.asp_problem.append(atom if isinstance(atom, AspFunction) else f"{atom}.\n")
+
+
 def parse_spec_from_yaml_string(string: str) -> "spack.spec.Spec":
     """Parse a spec from YAML and add file/line info to errors, if it's available.
 
@@ -3591,10 +4015,12 @@ def external_spec_selected(self, node, idx):
             package.update_external_dependencies(self._specs.get(extendee_node, None))
 
     def depends_on(self, parent_node, dependency_node, type):
+        self._depends_on(parent_node, dependency_node, dt.flag_from_string(type))
+
+    def _depends_on(self, parent_node, dependency_node, depflag):
         dependency_spec = self._specs[dependency_node]
         edges = self._specs[parent_node].edges_to_dependencies(name=dependency_spec.name)
         edges = [x for x in edges if id(x.spec) == id(dependency_spec)]
-        depflag = dt.flag_from_string(type)
 
         if not edges:
             self._specs[parent_node].add_dependency_edge(
@@ -3641,9 +4067,9 @@ def reorder_flags(self):
             if spec.compiler in compilers:
                 flagmap_from_compiler = compilers[spec.compiler].flags
 
+            node = SpecBuilder.make_node(pkg=spec.name)
+            topo_order = None
             for flag_type in spec.compiler_flags.valid_compiler_flags():
-                node = SpecBuilder.make_node(pkg=spec.name)
-
                 ordered_flags = []
 
                 # 1. Put compiler flags first
@@ -3666,7 +4092,10 @@ def reorder_flags(self):
                 # For flags that are applied by dependents, put flags from parents
                 # before children; we depend on the stability of traverse() to
                 # achieve a stable flag order for flags introduced in this manner.
-                topo_order = list(s.name for s in spec.traverse(order="post", direction="parents"))
+                # The order is computed only for specs with flags, since it needs
+                # a traversal of all the dependents.
+                if flag_groups and topo_order is None:
+                    topo_order = [s.name for s in spec.traverse(order="post", direction="parents")]
                 lex_order = list(sorted(flag_groups))
 
                 def _order_index(flag_group):
@@ -3743,13 +4172,16 @@ def sort_fn(function_tuple) -> Tuple[int, int]:
             return (-1, 0)
 
     def build_specs(self, function_tuples):
-        # Functions don't seem to be in particular order in output.  Sort
-        # them here so that directives that build objects (like node and
-        # node_compiler) are called in the right order.
-        self.function_tuples = sorted(set(function_tuples), key=self.sort_fn)
+        # Functions don't seem to be in particular order in output. Group them by name,
+        # and call the actions of each group in the order given by sort_fn, so that
+        # directives that build objects (like node and node_compiler) are called first.
+        args_by_name = collections.defaultdict(list)
+        for name, args in set(function_tuples):
+            args_by_name[name].append(args)
 
         self._specs = {}
-        for name, args in self.function_tuples:
+        virtuals: Dict[str, bool] = {}
+        for name in sorted(args_by_name, key=lambda x: (self.sort_fn((x,)), x)):
             if SpecBuilder.ignored_attributes.match(name):
                 continue
 
@@ -3757,8 +4189,9 @@ def build_specs(self, function_tuples):
 
             # print out unknown actions so we can display them for debugging
             if not action:
-                msg = 'UNKNOWN SYMBOL: attr("%s", %s)' % (name, ", ".join(str(a) for a in args))
-                tty.debug(msg)
+                for args in args_by_name[name]:
+                    args_str = ", ".join(str(a) for a in args)
+                    tty.debug(f'UNKNOWN SYMBOL: attr("{name}", {args_str})')
                 continue
 
             msg = (
@@ -3770,19 +4203,36 @@ def build_specs(self, function_tuples):
             # ignore predicates on virtual packages, as they're used for
             # solving but don't construct anything. Do not ignore error
             # predicates on virtual packages.
+            arguments = args_by_name[name]
             if name != "error":
-                node = args[0]
-                pkg = node.pkg
-                if spack.repo.PATH.is_virtual(pkg):
-                    continue
+                arguments = []
+                for args in args_by_name[name]:
+                    pkg = args[0].pkg
+                    if pkg not in virtuals:
+                        virtuals[pkg] = spack.repo.PATH.is_virtual(pkg)
+                    if virtuals[pkg]:
+                        continue
 
-                # if we've already gotten a concrete spec for this pkg,
-                # do not bother calling actions on it
-                spec = self._specs.get(args[0])
-                if spec and spec.concrete:
-                    continue
+                    # if we've already gotten a concrete spec for this pkg,
+                    # do not bother calling actions on it
+                    spec = self._specs.get(args[0])
+                    if spec and spec.concrete:
+                        continue
+
+                    arguments.append(args)
+
+            # The types of the same edge are added all at once
+            if name == "depends_on":
+                depflags: Dict[Tuple[NodeArgument, NodeArgument], dt.DepFlag] = {}
+                for parent_node, dependency_node, type in arguments:
+                    key = (parent_node, dependency_node)
+                    depflags[key] = depflags.get(key, dt.NONE) | dt.flag_from_string(type)
+                for (parent_node, dependency_node), depflag in depflags.items():
+                    self._depends_on(parent_node, dependency_node, depflag)
+                continue
 
-            action(*args)
+            for args in arguments:
+                action(*args)
 
         # fix flags after all specs are constructed
         self.reorder_flags()
@@ -3792,32 +4242,28 @@ def build_specs(self, function_tuples):
         # function will loop forever.
         roots = [spec.root for spec in self._specs.values() if not spec.root.installed]
         roots = dict((id(r), r) for r in roots)
-        for root in roots.values():
-            spack.spec.Spec.inject_patches_variant(root)
+        spack.spec.Spec.inject_patches_variant(*roots.values())
 
         # Add external paths to specs with just external modules
+        env = ev.active_environment()
         for s in self._specs.values():
             spack.spec.Spec.ensure_external_path_if_external(s)
-
-        for s in self._specs.values():
-            _develop_specs_from_env(s, ev.active_environment())
+            _develop_specs_from_env(s, env)
 
         # mark concrete and assign hashes to all specs in the solve
         for root in roots.values():
             root._finalize_concretization()
 
-        for s in self._specs.values():
-            spack.spec.Spec.ensure_no_deprecated(s)
+        spack.spec.Spec.ensure_no_deprecated(*self._specs.values())
 
         # Add git version lookup info to concrete Specs (this is generated for
         # abstract specs as well but the Versions may be replaced during the
         # concretization process)
-        for root in self._specs.values():
-            for spec in root.traverse():
-                if isinstance(spec.version, vn.GitVersion):
-                    spec.version.attach_lookup(
-                        spack.version.git_ref_lookup.GitRefLookup(spec.fullname)
-                    )
+        for spec in spack.traverse.traverse_nodes(self._specs.values()):
+            if isinstance(spec.version, vn.GitVersion):
+                spec.version.attach_lookup(
+                    spack.version.git_ref_lookup.GitRefLookup(spec.fullname)
+                )
 
         specs = self.execute_explicit_splices()
 
@@ -3925,9 +4371,16 @@ def _has_runtime_dependencies(spec: spack.spec.Spec) -> bool:
     return True
 
 
+#: Compiler, operating system and target family of a spec
+CompilerKey = Tuple[str, str, str]
+
+
 class SpecFilter:
     """Given a method to produce a list of specs, this class can filter them according to
     different criteria.
+
+    The specs produced by the factory are indexed by package name, so that only the specs
+    of the packages of interest need to be filtered.
     """
 
     def __init__(
@@ -3936,6 +4389,7 @@ def __init__(
         is_usable: Callable[[spack.spec.Spec], bool],
         include: List[str],
         exclude: List[str],
+        max_per_package: Optional[int] = None,
     ) -> None:
         """
         Args:
@@ -3944,11 +4398,26 @@ def __init__(
                 should not be considered for this filter, True otherwise.
             include: if present, a "good" spec must match at least one entry in the list
             exclude: if present, a "good" spec must not match any entry in the list
+            max_per_package: if present, at most this number of specs is selected for each
+                package, compiler and architecture, preferring the newest versions
         """
         self.factory = factory
         self.is_usable = is_usable
         self.include = include
         self.exclude = exclude
+        self.max_per_package = max_per_package
+
+    @property
+    def factory(self) -> Callable[[], List[spack.spec.Spec]]:
+        return self._factory
+
+    @factory.setter
+    def factory(self, value: Callable[[], List[spack.spec.Spec]]) -> None:
+        self._factory = value
+        self._index: Optional[Dict[str, List[spack.spec.Spec]]] = None
+        self._preloaded: Optional[Dict[str, List[spack.spec.Spec]]] = None
+        self._by_compiler: Optional[Dict[str, Dict[CompilerKey, List[spack.spec.Spec]]]] = None
+        self._compiler_specs: Dict[Tuple[str, CompilerKey], Optional[spack.spec.Spec]] = {}
 
     def is_selected(self, s: spack.spec.Spec) -> bool:
         if not self.is_usable(s):
@@ -3962,24 +4431,119 @@ def is_selected(self, s: spack.spec.Spec) -> bool:
 
         return True
 
-    def selected_specs(self) -> List[spack.spec.Spec]:
-        return [s for s in self.factory() if self.is_selected(s)]
+    def _candidates(self) -> Dict[str, List[spack.spec.Spec]]:
+        """Return the specs produced by the factory, by package name. The factory is called
+        only once."""
+        if self._index is None:
+            index: Dict[str, List[spack.spec.Spec]] = {}
+            for s in self.factory():
+                index.setdefault(s.name, []).append(s)
+            if self.max_per_package is not None:
+                for candidates in index.values():
+                    candidates.sort(key=lambda x: x.version, reverse=True)
+            self._index = index
+        return self._index
+
+    def _selected(self, name: str) -> List[spack.spec.Spec]:
+        """Return the selected specs of a package"""
+        if self._preloaded is not None:
+            return self._preloaded.get(name, [])
+
+        candidates = self._candidates().get(name, [])
+        if self.max_per_package is None:
+            return [s for s in candidates if self.is_selected(s)]
+
+        result = []
+        counts: Dict[Tuple[str, str], int] = collections.Counter()
+        for s in candidates:
+            configuration = (str(s.compiler), str(s.architecture))
+            if counts[configuration] < self.max_per_package and self.is_selected(s):
+                counts[configuration] += 1
+                result.append(s)
+        return result
+
+    def selected_specs(self, names: Optional[Set[str]] = None) -> List[spack.spec.Spec]:
+        """Return the selected specs.
+
+        Args:
+            names: if present, only specs of packages with these names are considered
+        """
+        return [
+            s
+            for name in self._candidates()
+            if names is None or name in names
+            for s in self._selected(name)
+        ]
+
+    def compiler_specs(self, skip: Set[str]) -> List[spack.spec.Spec]:
+        """Return a selected spec for each compiler, operating system and target family used
+        by the specs of packages that are not skipped. Specs are filtered only for compilers
+        that are not found yet.
+
+        Args:
+            skip: names of the packages whose specs are not considered
+        """
+        if self._by_compiler is None:
+            # Preloaded specs are already selected
+            specs_by_name = self._candidates() if self._preloaded is None else self._preloaded
+            self._by_compiler = {}
+            for name, candidates in specs_by_name.items():
+                by_compiler = self._by_compiler.setdefault(name, {})
+                for s in candidates:
+                    arch = s.architecture
+                    key = (str(s.compiler), str(arch.os), str(arch.target.family))
+                    by_compiler.setdefault(key, []).append(s)
+
+        preloaded = self._preloaded is not None
+        result, seen = [], set()
+        for name, by_compiler in self._by_compiler.items():
+            if name in skip:
+                continue
+            for key, candidates in by_compiler.items():
+                if key in seen:
+                    continue
+                if (name, key) not in self._compiler_specs:
+                    self._compiler_specs[(name, key)] = next(
+                        (s for s in candidates if preloaded or self.is_selected(s)), None
+                    )
+                spec = self._compiler_specs[(name, key)]
+                if spec is not None:
+                    seen.add(key)
+                    result.append(spec)
+        return result
+
+    def preload(self) -> None:
+        """Select the specs once, and return the same specs in later calls"""
+        self._preloaded = None
+        self._by_compiler = None
+        self._compiler_specs.clear()
+        self._preloaded = {name: self._selected(name) for name in self._candidates()}
 
     @staticmethod
-    def from_store(configuration, include, exclude) -> "SpecFilter":
+    def from_store(configuration, include, exclude, max_per_package=None) -> "SpecFilter":
         """Constructs a filter that takes the specs from the current store."""
         packages = _external_config_with_implicit_externals(configuration)
         is_reusable = functools.partial(_is_reusable, packages=packages, local=True)
         factory = functools.partial(_specs_from_store, configuration=configuration)
-        return SpecFilter(factory=factory, is_usable=is_reusable, include=include, exclude=exclude)
+        return SpecFilter(
+            factory=factory,
+            is_usable=is_reusable,
+            include=include,
+            exclude=exclude,
+            max_per_package=max_per_package,
+        )
 
     @staticmethod
-    def from_buildcache(configuration, include, exclude) -> "SpecFilter":
+    def from_buildcache(configuration, include, exclude, max_per_package=None) -> "SpecFilter":
         """Constructs a filter that takes the specs from the configured buildcaches."""
         packages = _external_config_with_implicit_externals(configuration)
         is_reusable = functools.partial(_is_reusable, packages=packages, local=False)
         return SpecFilter(
-            factory=_specs_from_mirror, is_usable=is_reusable, include=include, exclude=exclude
+            factory=_specs_from_mirror,
+            is_usable=is_reusable,
+            include=include,
+            exclude=exclude,
+            max_per_package=max_per_package,
         )
 
 
@@ -4038,35 +4602,116 @@ def __init__(self, configuration: spack.config.Configuration) -> None:
                 self.reuse_strategy = ReuseStrategy.DEPENDENCIES
             default_include = reuse_yaml.get("include", [])
             default_exclude = reuse_yaml.get("exclude", [])
+            max_per_package = reuse_yaml.get("max_per_package")
             default_sources = [{"type": "local"}, {"type": "buildcache"}]
             for source in reuse_yaml.get("from", default_sources):
                 include = source.get("include", default_include)
                 exclude = source.get("exclude", default_exclude)
                 if source["type"] == "local":
                     self.reuse_sources.append(
-                        SpecFilter.from_store(self.configuration, include=include, exclude=exclude)
+                        SpecFilter.from_store(
+                            self.configuration,
+                            include=include,
+                            exclude=exclude,
+                            max_per_package=max_per_package,
+                        )
                     )
                 elif source["type"] == "buildcache":
                     self.reuse_sources.append(
                         SpecFilter.from_buildcache(
-                            self.configuration, include=include, exclude=exclude
+                            self.configuration,
+                            include=include,
+                            exclude=exclude,
+                            max_per_package=max_per_package,
                         )
                     )
 
-    def reusable_specs(self, specs: List[spack.spec.Spec]) -> List[spack.spec.Spec]:
+    def reusable_specs(
+        self, specs: List[spack.spec.Spec], *, possible: Optional[Set[str]] = None
+    ) -> List[spack.spec.Spec]:
+        """Return the specs that can be reused to concretize the input specs.
+
+        Args:
+            specs: input specs
+            possible: if present, only specs of packages with these names are returned, since
+                others cannot be part of the solution. The compilers of the other reusable
+                specs can still be used, so one spec for each of them is returned as well.
+        """
         if self.reuse_strategy == ReuseStrategy.NONE:
             return []
 
         result = []
         for reuse_source in self.reuse_sources:
-            result.extend(reuse_source.selected_specs())
+            result.extend(reuse_source.selected_specs(possible))
 
         # If we only want to reuse dependencies, remove the root specs
         if self.reuse_strategy == ReuseStrategy.DEPENDENCIES:
             result = [spec for spec in result if not any(root in spec for root in specs)]
 
+        if possible is not None:
+            for reuse_source in self.reuse_sources:
+                result.extend(reuse_source.compiler_specs(skip=possible))
+
         return result
 
+    def preload(self) -> None:
+        """Read the specs of all the sources once, instead of at each solve"""
+        if self.reuse_strategy == ReuseStrategy.NONE:
+            return
+        for reuse_source in self.reuse_sources:
+            reuse_source.preload()
+
+
+class SharedSetup:
+    """Parts of the setup of a solve that are shared by many solves with the same
+    configuration, e.g. the solves of the roots of an environment with ``unify: false``.
+
+    The reusable specs are read once, and the facts of the package directives are kept
+    in memory.
+    """
+
+    def __init__(self, configuration: spack.config.Configuration) -> None:
+        self.selector = ReusableSpecsSelector(configuration=configuration)
+        self.selector.preload()
+        self.fact_cache = PackageFactCache(
+            persistent=configuration.get("concretizer:cache", False)
+        )
+
+
+#: Setup shared by the solves within ``shared_setup()``
+_SHARED_SETUP: Optional[SharedSetup] = None
+
+
+@contextmanager
+def shared_setup(warm_up: Optional[List[spack.spec.Spec]] = None, tests=False):
+    """Share the reusable specs and the facts of packages among the solves in this context.
+
+    Processes forked within the context inherit the shared setup. Processes started in any
+    other way, e.g. with the "spawn" start method of ``multiprocessing``, don't: they solve
+    without a shared setup, so there is no point in preparing one for them.
+
+    Arguments:
+        warm_up: if present, record upfront the facts of the packages that can be in the
+            solve of these specs
+        tests: whether test dependencies are concretized
+    """
+    global _SHARED_SETUP
+    previous = _SHARED_SETUP
+    _SHARED_SETUP = SharedSetup(configuration=spack.config.CONFIG)
+    try:
+        if warm_up:
+            allow_deprecated = spack.config.get("config:deprecated", False)
+            try:
+                SpackSolverSetup(tests=tests).setup(
+                    warm_up, reuse=[], allow_deprecated=allow_deprecated
+                )
+            except spack.error.SpackError as e:
+                # Errors are reported by the solves of the specs
+                tty.debug(f"Cannot record the facts of {warm_up}: {e}")
+        yield _SHARED_SETUP
+    finally:
+        _SHARED_SETUP = previous
+
 
 class Solver:
     """This is the main external interface class for solving.
@@ -4077,7 +4722,11 @@ class Solver:
 
     def __init__(self):
         self.driver = PyclingoDriver()
-        self.selector = ReusableSpecsSelector(configuration=spack.config.CONFIG)
+        if _SHARED_SETUP is not None:
+            self.selector = _SHARED_SETUP.selector
+        else:
+            self.selector = ReusableSpecsSelector(configuration=spack.config.CONFIG)
+        self.cache = ConcretizationCache()
 
     @staticmethod
     def _check_input_and_extract_concrete_specs(specs):
@@ -4100,6 +4749,8 @@ def solve(
         tests=False,
         setup_only=False,
         allow_deprecated=False,
+        reuse=None,
+        profile=False,
     ):
         """
         Arguments:
@@ -4112,20 +4763,84 @@ def solve(
             packages (defaults to False: do not concretize test dependencies).
           setup_only (bool): if True, stop after setup and don't solve (default False).
           allow_deprecated (bool): allow deprecated version in the solve
+          reuse (list): concrete specs that can be reused in addition to the ones
+            selected by the ``concretizer:reuse`` configuration
+          profile (bool): attach a profile of the solve to the result
         """
         # Check upfront that the variants are admissible
         specs = [s.lookup_hash() for s in specs]
         reusable_specs = self._check_input_and_extract_concrete_specs(specs)
-        reusable_specs.extend(self.selector.reusable_specs(specs))
+
+        reusable_specs.extend(reuse or [])
+
+        # Only specs of possible packages are turned into facts by the setup, so only those
+        # are selected, together with specs bringing the compilers of the others
+        check_packages_exist(specs)
+        node_counter = _create_counter(specs, tests)
+        possible = node_counter.possible_dependencies()
+        reusable_specs.extend(self.selector.reusable_specs(specs, possible=possible))
+
+        # Results are cached only for plain solves, not when the solve is inspected
+        key = None
+        if spack.config.get("concretizer:cache", False) and not (
+            out or timers or stats or setup_only or profile
+        ):
+            key = solve_key(
+                specs, reusable_specs, possible, tests, allow_deprecated, libcs=all_libcs()
+            )
+            result = self._cached_result(specs, key)
+            if result is not None:
+                tty.debug(f"Using the cached concretization {key}")
+                return result
+
         setup = SpackSolverSetup(tests=tests)
-        output = OutputConfiguration(timers=timers, stats=stats, out=out, setup_only=setup_only)
+        output = OutputConfiguration(
+            timers=timers, stats=stats, out=out, setup_only=setup_only, profile=profile
+        )
         result, _, _ = self.driver.solve(
-            setup, specs, reuse=reusable_specs, output=output, allow_deprecated=allow_deprecated
+            setup,
+            specs,
+            reuse=reusable_specs,
+            output=output,
+            allow_deprecated=allow_deprecated,
+            node_counter=node_counter,
         )
+
+        if key is not None and result.optimal and not result.unsolved_specs:
+            opt, _, _ = min(result.answers)
+            self.cache.store(
+                key, result.specs, cost=opt, criteria=result.criteria, nmodels=result.nmodels
+            )
+        return result
+
+    def _cached_result(self, specs, key) -> Optional[Result]:
+        """Return the result of a previous solve with the same key, if any."""
+        entry = self.cache.load(key)
+        if entry is None:
+            return None
+
+        result = Result(specs)
+        result.satisfiable = True
+        result.optimal = True
+        result.criteria = [tuple(c) for c in entry["criteria"]]
+        result.nmodels = entry["nmodels"]
+        answer = {SpecBuilder.make_node(pkg=s.name): s for s in entry["specs"]}
+        result.answers.append((entry["cost"], 0, answer))
+
+        # The entry doesn't match the input specs, e.g. in case of a hash collision
+        if result.unsolved_specs:
+            return None
         return result
 
     def solve_in_rounds(
-        self, specs, out=None, timers=False, stats=False, tests=False, allow_deprecated=False
+        self,
+        specs,
+        out=None,
+        timers=False,
+        stats=False,
+        tests=False,
+        allow_deprecated=False,
+        profile=False,
     ):
         """Solve for a stable model of specs in multiple rounds.
 
@@ -4142,17 +4857,24 @@ def solve_in_rounds(
             stats (bool): print internal statistics if set to True
             tests (bool): add test dependencies to the solve
             allow_deprecated (bool): allow deprecated version in the solve
+            profile (bool): attach a profile of the solve to the result of each round
         """
         specs = [s.lookup_hash() for s in specs]
         reusable_specs = self._check_input_and_extract_concrete_specs(specs)
-        reusable_specs.extend(self.selector.reusable_specs(specs))
+        check_packages_exist(specs)
+        node_counter = _create_counter(specs, tests)
+        reusable_specs.extend(
+            self.selector.reusable_specs(specs, possible=node_counter.possible_dependencies())
+        )
         setup = SpackSolverSetup(tests=tests)
 
         # Tell clingo that we don't have to solve all the inputs at once
         setup.concretize_everything = False
 
         input_specs = specs
-        output = OutputConfiguration(timers=timers, stats=stats, out=out, setup_only=False)
+        output = OutputConfiguration(
+            timers=timers, stats=stats, out=out, setup_only=False, profile=profile
+        )
         while True:
             result, _, _ = self.driver.solve(
                 setup,
@@ -4160,9 +4882,13 @@ def solve_in_rounds(
                 reuse=reusable_specs,
                 output=output,
                 allow_deprecated=allow_deprecated,
+                node_counter=node_counter,
             )
             yield result
 
+            # Later rounds solve for a subset of the input specs
+            node_counter = None
+
             # If we don't have unsolved specs we are done
             if not result.unsolved_specs:
                 break
@@ -4181,26 +4907,56 @@ def solve_in_rounds(
                 reusable_specs.extend(spec.traverse())
 
 
-class UnsatisfiableSpecError(spack.error.UnsatisfiableSpecError):
+class _LazyMessage:
+    """Mixin for errors whose message can be a function, called only when the message
+    is needed, e.g. when the error is printed."""
+
+    _message: Union[str, Callable[[], str]]
+
+    @property
+    def message(self) -> str:
+        if callable(self._message):
+            self._message = self._message()
+        return self._message
+
+    @message.setter
+    def message(self, value: Union[str, Callable[[], str]]) -> None:
+        self._message = value
+
+    def __reduce__(self):
+        return type(self), (self.message,)
+
+
+class UnsatisfiableSpecError(_LazyMessage, spack.error.UnsatisfiableSpecError):
     """There was an issue with the spec that was requested (i.e. a user error)."""
 
-    def __init__(self, msg):
+    def __init__(self, msg: Union[str, Callable[[], str]]):
         super(spack.error.UnsatisfiableSpecError, self).__init__(msg)
         self.provided = None
         self.required = None
         self.constraint_type = None
 
 
-class InternalConcretizerError(spack.error.UnsatisfiableSpecError):
+class InternalConcretizerError(_LazyMessage, spack.error.UnsatisfiableSpecError):
     """Errors that indicate a bug in Spack."""
 
-    def __init__(self, msg):
+    def __init__(self, msg: Union[str, Callable[[], str]]):
         super(spack.error.UnsatisfiableSpecError, self).__init__(msg)
         self.provided = None
         self.required = None
         self.constraint_type = None
 
 
+class SolverTimeoutError(spack.error.SpackError):
+    """Raised when the solver did not find any solution within the timeout."""
+
+    def __init__(self, timeout):
+        super().__init__(
+            f"the solver did not find any solution within {timeout} seconds",
+            "increase concretizer:timeout, or use the --solve-timeout option",
+        )
+
+
 class SolverError(InternalConcretizerError):
     """For cases where the solver is unable to produce a solution.
 
@@ -4209,20 +4965,29 @@ class SolverError(InternalConcretizerError):
     get a solution.
     """
 
-    def __init__(self, provided, conflicts):
-        msg = (
-            "Spack concretizer internal error. Please submit a bug report and include the "
-            "command, environment if applicable and the following error message."
-            f"\n    {provided} is unsatisfiable"
-        )
+    def __init__(self, provided, conflicts: Union[None, List[str], Callable[[], List[str]]]):
+        def _message():
+            msg = (
+                "Spack concretizer internal error. Please submit a bug report and include the "
+                "command, environment if applicable and the following error message."
+                f"\n    {provided} is unsatisfiable"
+            )
+            if conflicts is None:
+                return msg + "\n    Use the --explain option to show the unsatisfiable cores"
 
-        if conflicts:
-            msg += ", errors are:" + "".join([f"\n    {conflict}" for conflict in conflicts])
+            conflict_list = conflicts() if callable(conflicts) else conflicts
+            if conflict_list:
+                msg += ", errors are:" + "".join([f"\n    {c}" for c in conflict_list])
+            return msg
 
-        super().__init__(msg)
+        super().__init__(_message)
 
         self.provided = provided
 
         # Add attribute expected of the superclass interface
         self.required = None
         self.constraint_type = None
+
+    def __reduce__(self):
+        # The message is computed here, since it could be a function that can't be pickled
+        return InternalConcretizerError, (self.message,)
@@ -0,0 +1,360 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""Benchmark of the concretizer on a versioned corpus of specs and environments.
+
+Each case of the corpus is solved against the ``builtin.mock`` repository, so that the
+benchmark runs offline. Every repetition of a case runs in a new process: the samples
+are independent of each other, and the peak memory of each of them can be measured.
+
+The results of two versions of Spack are compared with a one-sided Mann-Whitney U test
+on the samples of each case. A case regresses on a metric when the test is significant,
+and the median of the samples also grows by more than a relative threshold.
+"""
+import collections
+import functools
+import math
+import multiprocessing
+import os
+import platform
+import sys
+import time
+import traceback
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import spack
+import spack.config
+import spack.error
+import spack.paths
+import spack.repo
+import spack.spec
+import spack.util.spack_json as sjson
+import spack.util.spack_yaml as syaml
+
+#: Corpus used when none is given
+DEFAULT_CORPUS = os.path.join(spack.paths.share_path, "perf", "concretize.yaml")
+
+#: Version of the format of the results
+FORMAT_VERSION = 1
+
+#: Phases of the solve that are timed, in order
+PHASES = ("setup", "load", "ground", "solve", "build")
+
+#: Metrics recorded for each repetition of a case
+METRICS = PHASES + ("total", "peak_memory")
+
+#: Metrics compared with a baseline by default
+DEFAULT_COMPARED_METRICS = ("total", "peak_memory")
+
+#: Largest number of samples for which the exact distribution of U is computed
+_EXACT_LIMIT = 20
+
+
+class Case(NamedTuple):
+    """Specs that are concretized together, as in an environment"""
+
+    #: name of the case, used in reports
+    name: str
+    #: abstract specs to be concretized
+    specs: List[str]
+    #: same meaning as ``concretizer:unify`` in an environment
+    unify: Union[bool, str] = True
+
+
+class Corpus(NamedTuple):
+    """Versioned list of cases"""
+
+    version: int
+    cases: List[Case]
+
+
+class Comparison(NamedTuple):
+    """Comparison of a metric of a case with its baseline"""
+
+    case: str
+    metric: str
+    baseline: float
+    current: float
+    #: relative change of the median
+    change: float
+    #: one-sided p-value of the samples being larger (or smaller) than the baseline
+    p_value: float
+    #: "regression", "improvement", or "" if there is no significant change
+    status: str
+
+
+def load_corpus(path: str = DEFAULT_CORPUS) -> Corpus:
+    """Read a corpus of cases from a YAML file"""
+    with open(path) as f:
+        data = syaml.load(f)
+
+    try:
+        corpus = data["corpus"]
+        version = int(corpus["version"])
+        cases = []
+        for entry in corpus["cases"]:
+            unify = entry.get("unify", True)
+            if unify not in (True, False, "when_possible"):
+                raise ValueError(f"invalid value of unify: {unify}")
+            specs = [str(s) for s in entry["specs"]]
+            cases.append(Case(name=str(entry["name"]), specs=specs, unify=unify))
+    except (KeyError, TypeError, ValueError) as e:
+        raise BenchmarkError(f"invalid corpus in {path}", str(e)) from e
+
+    names = [case.name for case in cases]
+    duplicates = sorted(name for name, n in collections.Counter(names).items() if n > 1)
+    if duplicates:
+        raise BenchmarkError(f"duplicate cases in {path}: {', '.join(duplicates)}")
+    return Corpus(version=version, cases=cases)
+
+
+def _peak_memory() -> Optional[int]:
+    """Peak resident set size of this process, in bytes, if it can be measured"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _solve_case(case: Case) -> Dict[str, Any]:
+    """Concretize the specs of a case, and return the metrics of the solve"""
+    import spack.solver.asp as asp
+
+    specs = [spack.spec.Spec(s) for s in case.specs]
+    results = []
+    start = time.perf_counter()
+    if case.unify is True:
+        results.append(asp.Solver().solve(specs))
+    elif case.unify == "when_possible":
+        results.extend(asp.Solver().solve_in_rounds(specs))
+    else:
+        with asp.shared_setup(warm_up=specs[:1] if len(specs) > 1 else None):
+            results.extend(asp.Solver().solve([spec]) for spec in specs)
+    total = time.perf_counter() - start
+
+    metrics: Dict[str, Any] = {phase: 0.0 for phase in PHASES}
+    for result in results:
+        for phase in PHASES:
+            metrics[phase] += result.timer.duration(phase)
+    metrics["total"] = total
+    metrics["peak_memory"] = _peak_memory()
+    metrics["nodes"] = sum(len(list(s.traverse())) for r in results for s in r.specs)
+    return metrics
+
+
+def _run_repetition(connection, case: Case, repository: str) -> None:
+    """Solve a case in a child process, and send its metrics through a connection"""
+    try:
+        # Solve from scratch, with a single configuration of clingo
+        with spack.repo.use_repositories(repository), spack.config.override(
+            "concretizer:reuse", False
+        ), spack.config.override("concretizer:cache", False), spack.config.override(
+            "concretizer:portfolio::", []
+        ):
+            connection.send((True, _solve_case(case)))
+    except BaseException:
+        connection.send((False, traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+def run_case(case: Case, repository: str = spack.paths.mock_packages_path) -> Dict[str, Any]:
+    """Solve a case once, in a new process, and return the metrics of the solve
+
+    Arguments:
+        case: case to be solved
+        repository: path of the repository of packages used in the solve
+    """
+    read_connection, write_connection = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_run_repetition, args=(write_connection, case, repository)
+    )
+    process.start()
+    write_connection.close()
+    try:
+        success, answer = read_connection.recv()
+    except EOFError:
+        success, answer = False, "the process solving the case exited unexpectedly"
+    finally:
+        read_connection.close()
+        process.join()
+
+    if not success:
+        raise BenchmarkError(f"cannot concretize the case '{case.name}'", answer)
+    return answer
+
+
+def run(
+    corpus: Corpus,
+    repetitions: int,
+    cases: Optional[Sequence[str]] = None,
+    on_sample: Optional[Callable[[Case, int, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Run the cases of a corpus, and return the results of the benchmark
+
+    Arguments:
+        corpus: corpus of cases
+        repetitions: number of times each case is solved
+        cases: names of the cases to be run, or None for all the cases
+        on_sample: function called with the case, the repetition and the metrics of
+            each sample
+    """
+    selected = corpus.cases
+    if cases:
+        unknown = set(cases) - {case.name for case in corpus.cases}
+        if unknown:
+            raise BenchmarkError(f"unknown cases: {', '.join(sorted(unknown))}")
+        selected = [case for case in corpus.cases if case.name in cases]
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for case in selected:
+        samples: Dict[str, List[Any]] = {metric: [] for metric in METRICS}
+        nodes = None
+        for i in range(repetitions):
+            metrics = run_case(case)
+            for metric in METRICS:
+                samples[metric].append(metrics[metric])
+            nodes = metrics["nodes"]
+            if on_sample is not None:
+                on_sample(case, i, metrics)
+        results[case.name] = {"nodes": nodes, "samples": samples}
+
+    return {
+        "benchmark": {
+            "format": FORMAT_VERSION,
+            "corpus": corpus.version,
+            "spack": spack.spack_version,
+            "commit": spack.get_spack_commit(),
+            "python": platform.python_version(),
+            "host": {"system": platform.system(), "machine": platform.machine()},
+            "repetitions": repetitions,
+            "cases": results,
+        }
+    }
+
+
+def write_results(results: Dict[str, Any], path: str) -> None:
+    with open(path, "w") as f:
+        sjson.dump(results, f)
+
+
+def read_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        data = sjson.load(f)
+    if not isinstance(data, dict) or "benchmark" not in data:
+        raise BenchmarkError(f"{path} does not contain the results of a benchmark")
+    if data["benchmark"].get("format") != FORMAT_VERSION:
+        raise BenchmarkError(f"{path} contains results in an unsupported format")
+    return data
+
+
+def median(samples: Sequence[float]) -> float:
+    values = sorted(samples)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2
+
+
+@functools.lru_cache(maxsize=None)
+def _u_frequencies(n: int, m: int) -> Tuple[int, ...]:
+    """Number of orderings of n baseline and m current samples without ties, by the
+    number of pairs in which the current sample is the larger one"""
+    if n == 0 or m == 0:
+        return (1,)
+    # The largest sample is either current, and larger than all the n baseline samples,
+    # or it is a baseline sample, and it is not larger than any current sample
+    frequencies = [0] * (n * m + 1)
+    for u, count in enumerate(_u_frequencies(n, m - 1)):
+        frequencies[u + n] += count
+    for u, count in enumerate(_u_frequencies(n - 1, m)):
+        frequencies[u] += count
+    return tuple(frequencies)
+
+
+def mann_whitney_u(baseline: Sequence[float], current: Sequence[float]) -> float:
+    """Return the one-sided p-value of the hypothesis that the current samples tend to
+    be larger than the baseline samples, with the Mann-Whitney U test.
+
+    The p-value is exact for small samples without ties. Otherwise, it uses the normal
+    approximation of the distribution of U, with corrections for ties and continuity.
+    """
+    n, m = len(baseline), len(current)
+    if n == 0 or m == 0:
+        return 1.0
+
+    u = sum(1.0 if c > b else 0.5 if c == b else 0.0 for c in current for b in baseline)
+    tie_sizes = [k for k in collections.Counter(list(baseline) + list(current)).values() if k > 1]
+
+    if not tie_sizes and n <= _EXACT_LIMIT and m <= _EXACT_LIMIT:
+        frequencies = _u_frequencies(n, m)
+        return sum(frequencies[int(u) :]) / sum(frequencies)
+
+    total = n + m
+    ties = sum(k**3 - k for k in tie_sizes)
+    variance = n * m / 12 * ((total + 1) - ties / (total * (total - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n * m / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    alpha: float = 0.05,
+    threshold: float = 0.1,
+    metrics: Sequence[str] = DEFAULT_COMPARED_METRICS,
+) -> List[Comparison]:
+    """Compare the results of a benchmark with a baseline
+
+    Cases that are only in one of the results are not compared.
+
+    Arguments:
+        baseline: results of the baseline
+        current: results to be compared with the baseline
+        alpha: significance level of the test on each metric
+        threshold: relative change of the median below which a change is not reported
+        metrics: metrics to be compared
+    """
+    baseline, current = baseline["benchmark"], current["benchmark"]
+    if baseline["corpus"] != current["corpus"]:
+        raise BenchmarkError(
+            f"the baseline was obtained with version {baseline['corpus']} of the corpus, "
+            f"but the results with version {current['corpus']}"
+        )
+
+    comparisons = []
+    for name, case in current["cases"].items():
+        if name not in baseline["cases"]:
+            continue
+        for metric in metrics:
+            old = [x for x in baseline["cases"][name]["samples"].get(metric, []) if x is not None]
+            new = [x for x in case["samples"].get(metric, []) if x is not None]
+            if not old or not new:
+                continue
+
+            old_median, new_median = median(old), median(new)
+            change = (new_median - old_median) / old_median if old_median else 0.0
+            status, p_value = "", 1.0
+            if change > 0:
+                p_value = mann_whitney_u(old, new)
+                if p_value < alpha and change > threshold:
+                    status = "regression"
+            elif change < 0:
+                p_value = mann_whitney_u(new, old)
+                if p_value < alpha and -change > threshold:
+                    status = "improvement"
+            comparisons.append(
+                Comparison(name, metric, old_median, new_median, change, p_value, status)
+            )
+    return comparisons
+
+
+class BenchmarkError(spack.error.SpackError):
+    """Raised when the benchmark cannot be run, or its results cannot be compared."""
@@ -201,6 +201,22 @@ def _bootstrap_clingo() -> ModuleType:
     return clingo_mod
 
 
+def solve_with_timeout(control, timeout: Optional[float], **kwargs):
+    """Solve the problem grounded in a control object, and return the clingo result.
+
+    If ``timeout`` is a positive number of seconds, the search is stopped after that
+    time. The ``interrupted`` attribute of the result is then true, and the best model
+    found so far is not proven optimal.
+    """
+    if not timeout:
+        return control.solve(**kwargs)
+
+    with control.solve(async_=True, **kwargs) as handle:
+        if not handle.wait(timeout):
+            handle.cancel()
+        return handle.get()
+
+
 def parse_files(*args, **kwargs):
     """Wrapper around clingo parse_files, that dispatches the function according
     to clingo API version.
@@ -28,8 +28,7 @@ def __init__(self, specs: List["spack.spec.Spec"], tests: bool) -> None:
         runtime_pkgs = spack.repo.PATH.packages_with_tags("runtime")
         runtime_virtuals = set()
         for x in runtime_pkgs:
-            pkg_class = spack.repo.PATH.get_pkg_class(x)
-            runtime_virtuals.update(pkg_class.provided_virtual_names())
+            runtime_virtuals.update(spack.repo.PATH.dependency_index.provided_virtual_names(x))
 
         self.specs = specs + [spack.spec.Spec(x) for x in runtime_pkgs]
 
@@ -106,10 +105,8 @@ def _compute_cache_values(self):
         )
         self._link_run_virtuals.update(self._possible_virtuals)
         for x in self._link_run:
-            build_dependencies = spack.repo.PATH.get_pkg_class(x).dependencies_of_type(dt.BUILD)
-            virtuals, reals = lang.stable_partition(
-                build_dependencies, spack.repo.PATH.is_virtual_safe
-            )
+            build_dependencies = spack.repo.PATH.dependency_index.dependencies_of_type(x, dt.BUILD)
+            virtuals, reals = lang.stable_partition(build_dependencies, spack.repo.PATH.is_virtual)
 
             self._possible_virtuals.update(virtuals)
             for virtual_dep in virtuals:
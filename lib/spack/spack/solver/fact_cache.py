@@ -0,0 +1,229 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""Cache of the facts derived from the directives of each package.
+
+The facts emitted for the languages, variants, conflicts, provided virtuals and
+dependencies of a package depend only on the package class, and on a few settings
+of the solve. When ``concretizer:cache`` is enabled they are recorded once per
+package, and replayed as text on later solves. Solves sharing their setup also keep
+them in memory.
+
+Condition and variant ids are allocated per solve, so the facts are stored as
+templates with holes for the ids they use, numbered from zero.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, Union
+
+import llnl.util.tty as tty
+
+import spack.caches
+import spack.repo
+import spack.util.file_cache
+import spack.util.spack_json as sjson
+
+from .core import AspFunction, clingo
+from .result_cache import _sha256, _solver_hash
+
+#: Format version of the cache entries
+FORMAT_VERSION = 1
+
+#: Prefix of the placeholders used for ids in the text of a fact
+_ID_PLACEHOLDER = "__spack_fact_id_"
+
+_ID_PLACEHOLDER_RE = re.compile(rf"{_ID_PLACEHOLDER}(\d+)")
+
+#: A fact, as text or as a template of text and local ids
+FactTemplate = Union[str, List[Union[str, int]]]
+
+
+class FactId(int):
+    """Id allocated while the facts of a package are being recorded"""
+
+
+class UncacheableFact(ValueError):
+    """Raised when a fact cannot be turned into a template"""
+
+
+def _template_argument(arg: Any, first_id: int) -> Any:
+    if isinstance(arg, FactId):
+        return clingo().Function(f"{_ID_PLACEHOLDER}{arg - first_id}", [], positive=True)
+    elif isinstance(arg, AspFunction):
+        return clingo().Function(
+            arg.name, [_template_argument(x, first_id) for x in arg.args], positive=True
+        )
+    return AspFunction("")._argify(arg)
+
+
+def _count_ids(atom: AspFunction) -> int:
+    return sum(
+        1 if isinstance(x, FactId) else _count_ids(x) if isinstance(x, AspFunction) else 0
+        for x in atom.args
+    )
+
+
+def fact_template(atom: AspFunction, first_id: int) -> FactTemplate:
+    """Return the text of a fact, with holes for the ids allocated during the recording.
+
+    Arguments:
+        atom: fact to be rendered
+        first_id: first id allocated during the recording
+    """
+    symbol = clingo().Function(
+        atom.name, [_template_argument(x, first_id) for x in atom.args], positive=True
+    )
+    parts: List[Union[str, int]] = _ID_PLACEHOLDER_RE.split(f"{symbol}.\n")
+    if len(parts) == 1:
+        return parts[0]  # type: ignore[return-value]
+
+    # A string argument that looks like a placeholder would be replaced on replay
+    if (len(parts) - 1) // 2 != _count_ids(atom):
+        raise UncacheableFact(f"cannot make a template for {atom}")
+
+    for i in range(1, len(parts), 2):
+        parts[i] = int(parts[i])
+    return parts
+
+
+def render_facts(templates: Iterable[FactTemplate], ids: List[int]) -> Iterable[str]:
+    """Fill the holes in the templates with the ids of the current solve"""
+    for template in templates:
+        if isinstance(template, str):
+            yield template
+        else:
+            yield "".join(str(ids[x]) if i % 2 else x for i, x in enumerate(template))
+
+
+@functools.lru_cache(maxsize=None)
+def _file_hash(path: str, mtime: int, size: int) -> str:
+    with open(path, "rb") as f:
+        return _sha256(f.read())
+
+
+@functools.lru_cache(maxsize=None)
+def package_hash(pkg_cls: Type) -> str:
+    """Hash of the source of a package class, and of all its base classes"""
+    sha = hashlib.sha256()
+    for cls in pkg_cls.__mro__:
+        sha.update(cls.__qualname__.encode())
+        try:
+            path = inspect.getsourcefile(cls)
+            if path is None:
+                continue
+            st = os.stat(path)
+        except (TypeError, OSError):
+            continue
+        sha.update(_file_hash(path, st.st_mtime_ns, st.st_size).encode())
+    return sha.hexdigest()
+
+
+def _virtuals_hash() -> str:
+    """Hash of the names of all the virtual packages"""
+    return _sha256(" ".join(sorted(spack.repo.PATH.provider_index.providers)))
+
+
+class PackageFactCache:
+    """Facts of the directives of packages, stored in a file cache.
+
+    Arguments:
+        cache: file cache where facts are stored, by default the misc cache
+        persistent: if False, facts are kept only in memory
+    """
+
+    def __init__(
+        self, cache: Optional[spack.util.file_cache.FileCache] = None, *, persistent: bool = True
+    ) -> None:
+        self._cache = cache
+        self._virtuals: Optional[str] = None
+        self.persistent = persistent
+        self._memory: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def cache(self) -> spack.util.file_cache.FileCache:
+        return self._cache or spack.caches.MISC_CACHE  # type: ignore[return-value]
+
+    def key(self, pkg_cls: Type, *, tests: bool, virtuals: Iterable[str]) -> str:
+        """Return the key of the facts of a package.
+
+        Arguments:
+            pkg_cls: class of the package
+            tests: whether test dependencies of the package are in the solve
+            virtuals: virtuals provided by the package that are in the solve
+        """
+        if self._virtuals is None:
+            self._virtuals = _virtuals_hash()
+        inputs = {
+            "version": FORMAT_VERSION,
+            "solver": _solver_hash(),
+            "name": pkg_cls.name,
+            "package": package_hash(pkg_cls),
+            "repo_virtuals": self._virtuals,
+            "tests": tests,
+            "virtuals": sorted(virtuals),
+        }
+        return _sha256(json.dumps(inputs, sort_keys=True))
+
+    @staticmethod
+    def _entry(name: str, key: str) -> str:
+        return os.path.join("solver-facts", name, f"{key}.json")
+
+    def load(
+        self, name: str, key: str, *, pkg_class: Callable[[str], Type]
+    ) -> Optional[Dict[str, Any]]:
+        """Return the facts stored for a key, or None.
+
+        Facts are discarded when a package they refer to has changed since they were
+        stored.
+
+        Arguments:
+            name: name of the package
+            key: key of the facts
+            pkg_class: function returning the class of a package in the solve
+        """
+        entry = self._entry(name, key)
+        if entry in self._memory:
+            return self._memory[entry]
+        if not self.persistent:
+            return None
+
+        try:
+            if not self.cache.init_entry(entry):
+                return None
+            with self.cache.read_transaction(entry) as f:
+                data = sjson.load(f)
+            if data.get("version") != FORMAT_VERSION:
+                return None
+            for other, other_hash in data["dependencies"].items():
+                if package_hash(pkg_class(other)) != other_hash:
+                    return None
+        except (
+            OSError,
+            ValueError,
+            KeyError,
+            spack.repo.RepoError,
+            spack.util.file_cache.CacheError,
+        ) as e:
+            tty.debug(f"Cannot read the solver facts cache entry {entry}: {e}")
+            return None
+        self._memory[entry] = data
+        return data
+
+    def store(self, name: str, key: str, data: Dict[str, Any]) -> None:
+        """Store the facts of a package under a key."""
+        entry = self._entry(name, key)
+        self._memory[entry] = data
+        if not self.persistent:
+            return
+
+        try:
+            with self.cache.write_transaction(entry) as (_, new):
+                sjson.dump({"version": FORMAT_VERSION, **data}, new)
+        except (OSError, spack.util.file_cache.CacheError) as e:
+            tty.debug(f"Cannot write the solver facts cache entry {entry}: {e}")
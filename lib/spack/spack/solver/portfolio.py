@@ -0,0 +1,197 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""Race of several configurations of clingo on the same problem.
+
+Depending on the problem, the time clingo needs to find an optimal answer varies a lot
+with its configuration. When ``concretizer:portfolio`` lists more than one
+configuration, each of them grounds and solves the problem in a separate process. The
+first one that proves an answer optimal, or the problem unsatisfiable, wins and the
+others are terminated. If all of them are stopped by a timeout, the best answer found
+wins.
+"""
+import multiprocessing
+import multiprocessing.connection
+import traceback
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import llnl.util.tty as tty
+
+import spack.error
+
+from .core import clingo, solve_with_timeout
+
+
+class SolverConfiguration(NamedTuple):
+    """Options of clingo used to solve a problem"""
+
+    #: name of the configuration, used in reports
+    name: str
+    #: clingo preset configuration (e.g. "tweety", "trendy", "crafty")
+    configuration: str = "tweety"
+    #: decision heuristic (e.g. "Domain", "Vsids", "Berkmin")
+    heuristic: str = "Domain"
+    #: optimization strategy (e.g. "usc,one", "bb,lin")
+    opt_strategy: str = "usc,one"
+    #: number of threads and mode for parallel solving (e.g. "4,compete")
+    parallel_mode: Optional[str] = None
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "SolverConfiguration":
+        options = {k: v for k, v in data.items() if k != "name"}
+        name = data.get("name") or ",".join(f"{k}={v}" for k, v in sorted(options.items()))
+        return SolverConfiguration(name=name or "default", **options)
+
+    def control(self):
+        """Return a clingo control object with this configuration"""
+        control = clingo().Control()
+        control.configuration.configuration = self.configuration
+        control.configuration.solver.heuristic = self.heuristic
+        control.configuration.solver.opt_strategy = self.opt_strategy
+        if self.parallel_mode:
+            control.configuration.solve.parallel_mode = self.parallel_mode
+        return control
+
+
+#: Configuration used when no portfolio is configured
+DEFAULT_CONFIGURATION = SolverConfiguration(name="default")
+
+
+def configurations(portfolio: List[Dict[str, Any]]) -> List[SolverConfiguration]:
+    """Return the solver configurations of a ``concretizer:portfolio`` list"""
+    return [SolverConfiguration.from_dict(entry) for entry in portfolio]
+
+
+class RaceResult(NamedTuple):
+    """Answer of the configuration that won a race"""
+
+    #: configuration that won
+    configuration: SolverConfiguration
+    #: whether the problem is satisfiable, None if unknown when the solve timed out
+    satisfiable: Optional[bool]
+    #: whether the best model is proven optimal
+    optimal: bool
+    #: cost and shown symbols of the best model, if satisfiable
+    best_model: Optional[Tuple[List[int], List[Any]]]
+    #: number of models found
+    nmodels: int
+    #: statistics of clingo
+    statistics: Dict[str, Any]
+
+
+class PortfolioError(spack.error.SpackError):
+    """Raised when no configuration of a portfolio could solve the problem"""
+
+
+def _solve(
+    connection,
+    configuration: SolverConfiguration,
+    problem: str,
+    files: List[str],
+    assumptions: List[Tuple[str, bool]],
+    timeout: Optional[float],
+) -> None:
+    """Ground and solve a problem, and send the answer through a connection"""
+    try:
+        control = configuration.control()
+        control.add("base", [], problem)
+        for path in files:
+            control.load(path)
+        control.ground([("base", [])])
+
+        models = []
+
+        def on_model(model):
+            models.append((model.cost, [str(s) for s in model.symbols(shown=True, terms=True)]))
+
+        result = solve_with_timeout(
+            control,
+            timeout,
+            assumptions=[(clingo().parse_term(s), value) for s, value in assumptions],
+            on_model=on_model,
+        )
+        best_model = min(models) if models else None
+        optimal = not result.interrupted
+        answer = (result.satisfiable, optimal, best_model, len(models), control.statistics)
+        connection.send((True, answer))
+    except BaseException:
+        connection.send((False, traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+def race(
+    configurations: List[SolverConfiguration],
+    problem: str,
+    files: List[str],
+    assumptions: List[Tuple[Any, bool]],
+    timeout: Optional[float] = None,
+) -> RaceResult:
+    """Solve a problem with each configuration in a separate process, and return the
+    answer of the first one that completes. If all of them time out, return the answer
+    with the best model.
+
+    Arguments:
+        configurations: configurations of clingo to be raced
+        problem: facts of the problem instance
+        files: logic programs to be loaded along with the facts
+        assumptions: assumptions of the solve
+        timeout: seconds after which each configuration stops optimizing
+    """
+    str_assumptions = [(str(s), value) for s, value in assumptions]
+    processes = {}
+    started = []
+    for configuration in configurations:
+        read_connection, write_connection = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=_solve,
+            args=(write_connection, configuration, problem, files, str_assumptions, timeout),
+        )
+        process.start()
+        started.append(process)
+        write_connection.close()
+        processes[read_connection] = (configuration, process)
+
+    errors = []
+    best: Optional[RaceResult] = None
+    try:
+        while processes:
+            for connection in multiprocessing.connection.wait(list(processes)):
+                configuration, process = processes.pop(connection)
+                try:
+                    success, answer = connection.recv()
+                except EOFError:
+                    success, answer = False, f"exit code {process.exitcode}"
+                connection.close()
+                if not success:
+                    tty.debug(f"[PORTFOLIO] {configuration.name} failed: {answer}")
+                    errors.append(f"{configuration.name}: {answer}")
+                    continue
+
+                satisfiable, optimal, best_model, nmodels, statistics = answer
+                if best_model is not None:
+                    cost, symbols = best_model
+                    best_model = (cost, [clingo().parse_term(s) for s in symbols])
+                result = RaceResult(
+                    configuration, satisfiable, optimal, best_model, nmodels, statistics
+                )
+                if optimal:
+                    return result
+
+                # Stopped by the timeout, keep the best model found so far
+                if best is None or (
+                    best_model is not None
+                    and (best.best_model is None or best_model[0] < best.best_model[0])
+                ):
+                    best = result
+    finally:
+        for _, process in processes.values():
+            process.terminate()
+        for process in started:
+            process.join()
+
+    if best is not None:
+        return best
+    raise PortfolioError("no solver configuration could solve the problem", "\n".join(errors))
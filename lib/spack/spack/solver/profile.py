@@ -0,0 +1,181 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""Profile of a solve, to find the packages and the inputs that make it slow.
+
+The profile attributes the facts emitted during setup, and the time spent emitting them,
+to the sections of the problem, to packages and to categories of facts. It also counts
+the ground atoms of each package, and reports the statistics of clingo.
+"""
+import collections
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+#: Header of the sections of the problem with the rules of a package
+_PACKAGE_HEADER = re.compile(r"Package (?:rules|preferences): (.+)")
+
+#: Name of a fact, and package and name of the inner function of a ``pkg_fact``
+_FACT = re.compile(r'(\w+)\((?:"((?:[^"\\]|\\.)*)",(\w+))?')
+
+#: Categories of facts, by a substring of their name, in order of precedence
+_CATEGORIES = (
+    ("condition", "conditions"),
+    ("trigger", "conditions"),
+    ("effect", "conditions"),
+    ("imposed_constraint", "conditions"),
+    ("hash", "reuse"),
+    ("installed", "reuse"),
+    ("variant", "variants"),
+    ("version", "versions"),
+    ("target", "targets"),
+    ("compiler", "compilers"),
+    ("provide", "virtuals"),
+    ("virtual", "virtuals"),
+    ("depend", "dependencies"),
+    ("external", "externals"),
+)
+
+#: Name used for facts and atoms that don't belong to any package
+NO_PACKAGE = "(none)"
+
+
+def fact_category(name: str) -> str:
+    """Return the category of a fact, given its name"""
+    for substring, category in _CATEGORIES:
+        if substring in name:
+            return category
+    return "other"
+
+
+class SetupProfiler:
+    """Records the position of the headers in a problem, and the time they were added"""
+
+    def __init__(self) -> None:
+        #: (index of the header in the problem, level, header, time)
+        self.marks: List[Tuple[int, int, str, float]] = []
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+
+    def mark(self, index: int, level: int, header: str) -> None:
+        self.marks.append((index, level, header, time.perf_counter()))
+
+    def stop(self) -> None:
+        """Record the end of the setup"""
+        self.end = time.perf_counter()
+
+    def profile(self, problem: List[Any]) -> Dict[str, Any]:
+        """Return the profile of the setup of a problem
+
+        Arguments:
+            problem: entries of the problem, with a fact in each entry
+        """
+        end = self.end or time.perf_counter()
+        sections: Dict[str, Dict[str, Any]] = {}
+        packages: Dict[str, Dict[str, Any]] = {}
+        categories: Dict[str, int] = collections.Counter()
+        total_facts = 0
+
+        def _package(name):
+            return packages.setdefault(
+                name, {"facts": 0, "seconds": 0.0, "categories": collections.Counter()}
+            )
+
+        marks = [(0, 1, NO_PACKAGE, self.start)] + self.marks + [(len(problem), 1, "", end)]
+        section, package = NO_PACKAGE, None
+        for (index, level, header, started), (next_index, _, _, finished) in zip(marks, marks[1:]):
+            if level == 1:
+                section, package = header, None
+            elif level == 2:
+                match = _PACKAGE_HEADER.match(header)
+                if match:
+                    package = match.group(1)
+
+            section_data = sections.setdefault(section, {"facts": 0, "seconds": 0.0})
+            section_data["seconds"] += finished - started
+            if package is not None:
+                _package(package)["seconds"] += finished - started
+
+            for entry in problem[index:next_index]:
+                match = _FACT.match(entry) if isinstance(entry, str) else None
+                if match is None:
+                    continue
+                name, fact_package, inner = match.groups()
+                if name == "pkg_fact" and inner:
+                    category = fact_category(inner)
+                else:
+                    category, fact_package = fact_category(name), package
+                total_facts += 1
+                section_data["facts"] += 1
+                categories[category] += 1
+                if fact_package is not None:
+                    package_data = _package(fact_package)
+                    package_data["facts"] += 1
+                    package_data["categories"][category] += 1
+
+        return {
+            "facts": total_facts,
+            "seconds": end - self.start,
+            "sections": [{"name": name, **data} for name, data in sections.items()],
+            "categories": dict(categories.most_common()),
+            "packages": {
+                name: {**data, "categories": dict(data["categories"].most_common())}
+                for name, data in sorted(packages.items(), key=lambda x: (-x[1]["facts"], x[0]))
+            },
+        }
+
+
+def _function(symbol) -> Tuple[Optional[str], List[Any]]:
+    """Return the name and the arguments of a symbol, or (None, []) if it is not a function"""
+    try:
+        return symbol.name, symbol.arguments
+    except RuntimeError:
+        # Clingo w/ CFFI throws on failure to access ".name" for symbols that are not functions
+        return None, []
+
+
+def _symbol_package(symbol) -> Optional[str]:
+    """Return the package of a ground atom, i.e. the package of its first node, if any"""
+    name, args = _function(symbol)
+    if name == "pkg_fact" and args:
+        return args[0].string
+    for arg in args:
+        arg_name, arg_args = _function(arg)
+        candidates = [(arg_name, arg_args)] + [_function(x) for x in arg_args]
+        for inner_name, inner_args in candidates:
+            if inner_name == "node" and len(inner_args) == 2:
+                return inner_args[1].string
+    return None
+
+
+def ground_profile(control) -> Dict[str, Any]:
+    """Count the ground atoms of a control object by package and by predicate"""
+    packages: Dict[str, int] = collections.Counter()
+    predicates: Dict[str, int] = collections.Counter()
+    total = 0
+    for atom in control.symbolic_atoms:
+        symbol = atom.symbol
+        total += 1
+        predicates[f"{symbol.name}/{len(symbol.arguments)}"] += 1
+        packages[_symbol_package(symbol) or NO_PACKAGE] += 1
+    return {
+        "atoms": total,
+        "packages": dict(packages.most_common()),
+        "predicates": dict(predicates.most_common()),
+    }
+
+
+def statistics_profile(statistics: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the size of the ground program and the times reported by clingo"""
+    result: Dict[str, Any] = {}
+    try:
+        lp = statistics["problem"]["lp"]
+        result["program"] = {k: lp[k] for k in ("atoms", "rules", "bodies", "eqs") if k in lp}
+        summary = statistics["summary"]
+        result["times"] = dict(summary["times"])
+        result["models"] = dict(summary["models"])
+    except (KeyError, TypeError):
+        pass
+    return result
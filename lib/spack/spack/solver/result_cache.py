@@ -0,0 +1,197 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""Cache of concretization results, keyed on the inputs of the solver.
+
+When ``concretizer:cache`` is enabled, the concrete specs produced by a solve are
+stored in the misc cache. The key of an entry is a hash of everything the result
+depends on: the abstract input specs, the configuration sections read by the solver,
+the host architecture, the sources of the package classes of all the possible
+dependencies and their patches, the specs that can be reused, and the version of the
+solver and of the core modules it depends on.
+A later solve with the same inputs returns the stored specs without running the
+solver.
+"""
+import functools
+import glob
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Type, Union
+
+import archspec.cpu
+
+import llnl.util.tty as tty
+
+import spack
+import spack.caches
+import spack.concretize
+import spack.config
+import spack.hash_types as ht
+import spack.package_base
+import spack.paths
+import spack.repo
+import spack.spec
+import spack.util.file_cache
+import spack.util.spack_json as sjson
+
+#: Format version of the cache entries
+FORMAT_VERSION = 1
+
+#: Configuration sections that can affect the result of a solve
+CONFIG_SECTIONS = (
+    "compilers",
+    "concretizer",
+    "develop",
+    "mirrors",
+    "packages",
+    "repos",
+    "upstreams",
+)
+
+
+def _sha256(data: Union[str, bytes]) -> str:
+    return hashlib.sha256(data.encode() if isinstance(data, str) else data).hexdigest()
+
+
+#: Sources of Spack, besides the solver, that can affect the result of a solve
+CORE_SOURCES = ("spec.py", "directives.py", "version", "build_systems")
+
+
+@functools.lru_cache(maxsize=1)
+def _solver_hash() -> str:
+    """Hash of the Spack version, of the source of the solver, and of the core modules
+    it depends on"""
+    solver_dir = os.path.dirname(__file__)
+    paths = sorted(glob.glob(os.path.join(solver_dir, "*.lp")))
+    paths.append(os.path.join(solver_dir, "asp.py"))
+    for source in CORE_SOURCES:
+        path = os.path.join(spack.paths.module_path, source)
+        if os.path.isdir(path):
+            paths.extend(sorted(glob.glob(os.path.join(path, "*.py"))))
+        else:
+            paths.append(path)
+
+    sha = hashlib.sha256(spack.spack_version.encode())
+    for path in paths:
+        sha.update(os.path.relpath(path, spack.paths.module_path).encode())
+        with open(path, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def _patch_checksums(pkg_cls: Type["spack.package_base.PackageBase"]) -> List[str]:
+    """Checksums of the patches of a package, and of those it applies to its dependencies"""
+    patches = [p for patches in pkg_cls.patches.values() for p in patches]
+    for dependencies in pkg_cls.dependencies.values():
+        for dependency in dependencies.values():
+            patches.extend(p for patches in dependency.patches.values() for p in patches)
+    return sorted(p.sha256 for p in patches)
+
+
+def _package_hashes(names: Iterable[str]) -> Dict[str, str]:
+    """Hashes of the package classes of the given packages, including their base classes
+    and their patches, keyed on their name"""
+    # The cache of package facts uses the hashes of this module
+    from .fact_cache import package_hash
+
+    hashes = {}
+    for name in sorted(names):
+        try:
+            pkg_cls = spack.repo.PATH.get_pkg_class(name)
+        except (spack.repo.UnknownPackageError, spack.repo.UnknownNamespaceError):
+            hashes[name] = ""
+            continue
+        hashes[name] = _sha256(" ".join([package_hash(pkg_cls), *_patch_checksums(pkg_cls)]))
+    return hashes
+
+
+def _spec_key(spec: "spack.spec.Spec") -> List[Any]:
+    """Representation of an input spec, including what its string doesn't show"""
+    nodes = list(spec.traverse())
+    namespaces = sorted((s.name, s.namespace) for s in nodes if s.namespace)
+    hashes = sorted(s.dag_hash() for s in nodes if s.concrete)
+    return [str(spec), namespaces, hashes]
+
+
+def solve_key(
+    specs: List["spack.spec.Spec"],
+    reusable_specs: List["spack.spec.Spec"],
+    possible_dependencies: Iterable[str],
+    tests: Union[bool, Iterable[str]],
+    allow_deprecated: bool,
+    libcs: Iterable["spack.spec.Spec"],
+) -> str:
+    """Return the key of the result of a solve.
+
+    Arguments:
+        specs: abstract specs to be solved for
+        reusable_specs: concrete specs that can be reused in the solve
+        possible_dependencies: names of the packages that can be in the solution
+        tests: whether, or for which packages, test dependencies are added
+        allow_deprecated: whether deprecated versions are allowed
+        libcs: libcs of the host, targeted by the compilers
+    """
+    inputs = {
+        "version": FORMAT_VERSION,
+        "solver": _solver_hash(),
+        "specs": [_spec_key(s) for s in specs],
+        "tests": tests if isinstance(tests, bool) else sorted(tests),
+        "allow_deprecated": allow_deprecated,
+        "arch": str(spack.spec.ArchSpec.default_arch()),
+        "host": archspec.cpu.host().name,
+        "libcs": sorted(str(s) for s in libcs),
+        "compiler_check": spack.concretize.CHECK_COMPILER_EXISTENCE,
+        "require_checksum": "SPACK_CONCRETIZER_REQUIRE_CHECKSUM" in os.environ,
+        "config": {section: spack.config.get(section) for section in CONFIG_SECTIONS},
+        "packages": _package_hashes(possible_dependencies),
+        "reusable": sorted(s.dag_hash() for s in reusable_specs),
+    }
+    return _sha256(json.dumps(inputs, sort_keys=True, default=str))
+
+
+class ConcretizationCache:
+    """Concrete specs of past solves, stored in a file cache."""
+
+    def __init__(self, cache: Optional[spack.util.file_cache.FileCache] = None) -> None:
+        self._cache = cache
+
+    @property
+    def cache(self) -> spack.util.file_cache.FileCache:
+        return self._cache or spack.caches.MISC_CACHE  # type: ignore[return-value]
+
+    @staticmethod
+    def _entry(key: str) -> str:
+        return os.path.join("concretization", key[:2], f"{key}.json")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the result stored for a key, with its concrete ``specs``, or None."""
+        entry = self._entry(key)
+        try:
+            if not self.cache.init_entry(entry):
+                return None
+            with self.cache.read_transaction(entry) as f:
+                data = sjson.load(f)
+            if data.get("version") != FORMAT_VERSION:
+                return None
+            data["specs"] = [spack.spec.Spec.from_dict(s) for s in data["specs"]]
+        except (OSError, ValueError, KeyError, spack.util.file_cache.CacheError) as e:
+            tty.debug(f"Cannot read the concretization cache entry {entry}: {e}")
+            return None
+        return data
+
+    def store(self, key: str, specs: List["spack.spec.Spec"], **metadata) -> None:
+        """Store the concrete specs solved for a key, and metadata about the solve."""
+        entry = self._entry(key)
+        data = {
+            "version": FORMAT_VERSION,
+            "specs": [s.to_dict(hash=ht.process_hash) for s in specs],
+            **metadata,
+        }
+        try:
+            with self.cache.write_transaction(entry) as (_, new):
+                sjson.dump(data, new)
+        except (OSError, spack.util.file_cache.CacheError) as e:
+            tty.debug(f"Cannot write the concretization cache entry {entry}: {e}")
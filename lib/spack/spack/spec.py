@@ -2694,11 +2694,14 @@ def _patches_assigned(self):
         return True
 
     @staticmethod
-    def inject_patches_variant(root):
+    def inject_patches_variant(*roots):
+        """Add the patches variant to the specs in the DAGs of the roots. Specs shared
+        by several roots are visited only once.
+        """
         # This dictionary will store object IDs rather than Specs as keys
         # since the Spec __hash__ will change as patches are added to them
         spec_to_patches = {}
-        for s in root.traverse():
+        for s in traverse.traverse_nodes(roots):
             # After concretizing, assign namespaces to anything left.
             # Note that this doesn't count as a "change".  The repository
             # configuration is constant throughout a spack run, and
@@ -2724,7 +2727,7 @@ def inject_patches_variant(root):
 
         # Also record all patches required on dependencies by
         # depends_on(..., patch=...)
-        for dspec in root.traverse_edges(deptype=all, cover="edges", root=False):
+        for dspec in traverse.traverse_edges(roots, cover="edges", root=False):
             if dspec.spec.concrete:
                 continue
 
@@ -2732,11 +2735,12 @@ def inject_patches_variant(root):
 
             patches = []
             for cond, deps_by_name in pkg_deps.items():
-                if not dspec.parent.satisfies(cond):
+                # Check the condition last, since most dependencies have no patches
+                dependency = deps_by_name.get(dspec.spec.name)
+                if not dependency or not dependency.patches:
                     continue
 
-                dependency = deps_by_name.get(dspec.spec.name)
-                if not dependency:
+                if not dspec.parent.satisfies(cond):
                     continue
 
                 for pcond, patch_list in dependency.patches.items():
@@ -2748,7 +2752,7 @@ def inject_patches_variant(root):
                 for patch in patches:
                     all_patches.add(patch)
 
-        for spec in root.traverse():
+        for spec in traverse.traverse_nodes(roots):
             if id(spec) not in spec_to_patches:
                 continue
 
@@ -2782,18 +2786,18 @@ def ensure_external_path_if_external(external_spec):
             )
 
     @staticmethod
-    def ensure_no_deprecated(root):
-        """Raise if a deprecated spec is in the dag.
+    def ensure_no_deprecated(*roots):
+        """Raise if a deprecated spec is in the dags of the roots.
 
         Args:
-            root (Spec): root spec to be analyzed
+            roots (Spec): root specs to be analyzed
 
         Raises:
             SpecDeprecatedError: if any deprecated spec is found
         """
         deprecated = []
         with spack.store.STORE.db.read_transaction():
-            for x in root.traverse():
+            for x in traverse.traverse_nodes(roots):
                 _, rec = spack.store.STORE.db.query_by_spec_hash(x.dag_hash())
                 if rec and rec.deprecated_for:
                     deprecated.append(rec)
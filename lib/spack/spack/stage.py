@@ -41,6 +41,7 @@
 import spack.util.parallel
 import spack.util.path as sup
 import spack.util.pattern as pattern
+import spack.util.trace
 import spack.util.url as url_util
 from spack import fetch_strategy as fs  # breaks a cycle
 from spack.util.crypto import bit_length, prefix_bits
@@ -524,7 +525,8 @@ def fetch(self, mirror_only: bool = False, err_msg: Optional[str] = None) -> Non
             try:
                 fetcher.stage = self
                 self.fetcher = fetcher
-                self.fetcher.fetch()
+                with spack.util.trace.span(f"fetch {self.name}", "fetch", url=str(fetcher)):
+                    self.fetcher.fetch()
                 break
             except fs.NoCacheError:
                 # Don't bother reporting when something is not cached.
@@ -26,6 +26,7 @@
 import spack.platforms
 import spack.repo
 import spack.store
+import spack.util.trace
 
 _SERIALIZE = sys.platform == "win32" or (sys.version_info >= (3, 8) and sys.platform == "darwin")
 
@@ -73,11 +74,13 @@ def __init__(self, pkg):
             self.pkg = pkg
             self.env = spack.environment.active_environment()
         self.spack_working_dir = spack.paths.spack_working_dir
+        self.trace_state = spack.util.trace.state()
         self.test_state = TestState()
 
     def restore(self):
         self.test_state.restore()
         spack.paths.spack_working_dir = self.spack_working_dir
+        spack.util.trace.restore(self.trace_state)
         env = pickle.load(self.serialized_env) if _SERIALIZE else self.env
         if env:
             spack.environment.activate(env)
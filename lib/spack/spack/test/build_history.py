@@ -0,0 +1,135 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import pytest
+
+import spack.build_history
+import spack.config
+import spack.spec
+import spack.util.file_cache
+
+
+@pytest.fixture()
+def history(tmp_path):
+    return spack.build_history.BuildHistory(spack.util.file_cache.FileCache(str(tmp_path)))
+
+
+def test_empty_history(history, mock_packages, config):
+    assert history.duration(spack.spec.Spec("pkg-a").concretized()) is None
+
+
+def test_record_and_read_durations(history, tmp_path, mock_packages, config):
+    spec = spack.spec.Spec("pkg-a").concretized()
+    history.record(spec, 10.0)
+    history.record(spec, 20.0)
+    assert history.duration(spec) == pytest.approx(15.0)
+
+    # A new history object reads the same data from disk
+    other = spack.build_history.BuildHistory(spack.util.file_cache.FileCache(str(tmp_path)))
+    assert other.duration(spec) == pytest.approx(15.0)
+
+
+def test_durations_follow_recent_builds(history, mock_packages, config):
+    """Tests old durations are progressively forgotten"""
+    spec = spack.spec.Spec("pkg-a").concretized()
+    history.record(spec, 1000.0)
+    for _ in range(40):
+        history.record(spec, 10.0)
+    assert history.duration(spec) == pytest.approx(10.0, abs=1.0)
+
+
+def test_duration_of_other_configuration(history, mock_packages, config):
+    """Tests the duration of a configuration never built is the average for the package"""
+    history.record(spack.spec.Spec("pkg-a foobar=bar").concretized(), 10.0)
+    history.record(spack.spec.Spec("pkg-a foobar=baz").concretized(), 20.0)
+    assert history.duration(spack.spec.Spec("pkg-a foobar=fee").concretized()) == 15.0
+    assert history.duration(spack.spec.Spec("pkg-b").concretized()) is None
+
+
+def test_corrupted_history(history, tmp_path, mock_packages, config):
+    history.cache.init_entry(spack.build_history.CACHE_KEY)
+    with open(history.cache.cache_path(spack.build_history.CACHE_KEY), "w") as f:
+        f.write("not json")
+
+    spec = spack.spec.Spec("pkg-a").concretized()
+    assert history.duration(spec) is None
+
+    # Recording overwrites the corrupted file
+    history.record(spec, 5.0)
+    assert history.duration(spec) == 5.0
+
+
+def test_builds_and_binary_installs_are_separate(history, mock_packages, config):
+    spec = spack.spec.Spec("pkg-a").concretized()
+    history.record(spec, 100.0, phases={"stage": 10.0, "install": 90.0}, jobs=4)
+    history.record(spec, 5.0, phases={"fetch": 2.0, "relocate": 3.0}, cache=True)
+
+    assert history.duration(spec) == 100.0
+    assert history.duration(spec, cache=True) == 5.0
+
+    # Build times are scaled with the number of jobs, binary installs are not
+    assert history.duration(spec, jobs=8) == 50.0
+    assert history.duration(spec, cache=True, jobs=8) == 5.0
+
+    source, binary = history.records(spec), history.records(spec, cache=True)
+    assert source[0]["phases"] == {"stage": 10.0, "install": 90.0}
+    assert binary[0]["phases"] == {"fetch": 2.0, "relocate": 3.0}
+
+
+@pytest.mark.parametrize(
+    "makeflags,jobs",
+    [
+        # Attached to the jobserver of the installer, which has 3 slots
+        ("-j3 --jobserver-auth=5,6", 3),
+        # Otherwise, the number of jobs comes from the configuration
+        ("-j3", None),
+        (None, None),
+    ],
+)
+def test_build_jobs(makeflags, jobs, monkeypatch, mock_packages, config):
+    """Tests the number of jobs of a build is read from the jobserver it is attached to"""
+    spack.config.set("config:build_jobs", 4)
+    monkeypatch.delenv("MAKEFLAGS", raising=False)
+    if makeflags is not None:
+        monkeypatch.setenv("MAKEFLAGS", makeflags)
+    pkg = spack.spec.Spec("pkg-b").concretized().package
+    expected = jobs or spack.config.determine_number_of_jobs(parallel=True)
+    assert spack.build_history.build_jobs(pkg) == expected
+
+    monkeypatch.setattr(pkg, "parallel", False)
+    assert spack.build_history.build_jobs(pkg) == 1
+
+
+def test_longest_chains():
+    durations = {"a": 1.0, "b": 2.0, "c": 5.0, "d": 1.0}
+    edges = {"a": {"b", "c"}, "b": {"d"}, "c": set(), "d": set()}
+    lengths, following = spack.build_history.longest_chains(durations, edges)
+    assert lengths == {"a": 6.0, "b": 3.0, "c": 5.0, "d": 1.0}
+    assert following == {"a": "c", "b": "d", "c": None, "d": None}
+
+
+@pytest.mark.parametrize("concurrent_packages,wall_time", [(1, 35.0), (2, 30.0), (4, 30.0)])
+def test_estimate(concurrent_packages, wall_time, history, install_mockery):
+    spack.config.set("config:build_jobs", 4)
+    spec = spack.spec.Spec("dt-diamond").concretized()
+    durations = {"dt-diamond-bottom": 10.0, "dt-diamond-left": 20.0, "dt-diamond-right": 5.0}
+    for node in spec.traverse():
+        if node.name in durations:
+            history.record(node, durations[node.name], jobs=4)
+
+    estimate = spack.build_history.estimate(
+        [spec], 4, concurrent_packages=concurrent_packages, use_cache=False, history=history
+    )
+    # The root of the DAG was never installed, and takes the average duration
+    assert estimate.wall_time == pytest.approx(wall_time + 35.0 / 3)
+    assert [s.name for s in estimate.critical_path] == [
+        "dt-diamond-bottom",
+        "dt-diamond-left",
+        "dt-diamond",
+    ]
+
+    assert [s.name for s in estimate.unknown] == ["dt-diamond"]
+    assert estimate.durations[spec.dag_hash()][1] == pytest.approx(35.0 / 3)
+    assert estimate.critical_path_time == pytest.approx(30.0 + 35.0 / 3)
@@ -140,6 +140,19 @@ def test_concretizer_arguments(mutable_config, mock_packages, arg, conf):
     assert spack.config.get("concretizer:reuse", None, scope="command_line") == conf
 
 
+def test_solve_timeout_argument(mutable_config, mock_packages):
+    spec = spack.main.SpackCommand("spec")
+    spec("--solve-timeout", "30", "zlib")
+    assert spack.config.get("concretizer:timeout", None, scope="command_line") == 30.0
+
+
+@pytest.mark.parametrize("cli_args,expected", [(["--explain"], True), (["--no-explain"], False)])
+def test_explain_arguments(cli_args, expected, mutable_config, mock_packages):
+    spec = spack.main.SpackCommand("spec")
+    spec(*cli_args, "zlib")
+    assert spack.config.get("concretizer:explain", None, scope="command_line") is expected
+
+
 def test_use_buildcache_type():
     assert arguments.use_buildcache("only") == ("only", "only")
     assert arguments.use_buildcache("never") == ("never", "never")
@@ -7,6 +7,7 @@
 import filecmp
 import gzip
 import itertools
+import json
 import os
 import pathlib
 import re
@@ -18,12 +19,14 @@
 import llnl.util.tty as tty
 
 import spack.build_environment
+import spack.build_history
 import spack.cmd.common.arguments
 import spack.cmd.install
 import spack.config
 import spack.environment as ev
 import spack.error
 import spack.hash_types as ht
+import spack.hooks
 import spack.installer
 import spack.package_base
 import spack.store
@@ -1095,3 +1098,152 @@ def test_report_filename_for_cdash(install_mockery, mock_fetch):
     specs = spack.cmd.install.concrete_specs_from_cli(args, {})
     filename = spack.cmd.install.report_filename(args, specs)
     assert filename != "https://blahblah/submit.php?project=debugging"
+
+
+def test_install_estimate(install_mockery, mock_fetch):
+    """Test --estimate prints the critical path from the build history without installing"""
+    spack.config.set("config:build_jobs", 2)
+    spec = Spec("dependent-install").concretized()
+    spack.build_history.BuildHistory().record(spec["dependency-install"], 60.0, jobs=2)
+
+    output = install("--estimate", "--cores=2", "--no-cache", "dependent-install")
+    assert "Estimated time to install 2 packages with 2 cores and 1 concurrent package" in output
+    assert "Critical path: 2m" in output
+    assert "dependency-install@" in output
+    assert "1 package never installed before" in output
+    assert not spec.installed
+
+    output = install("--estimate", "--cores=0", "dependent-install", fail_on_error=False)
+    assert "must be a positive integer" in output
+
+    output = install("--cores=2", "dependent-install", fail_on_error=False)
+    assert "can only be used with '--estimate'" in output
+
+
+@pytest.mark.not_on_windows("Buildcache not supported on windows")
+def test_install_prefetches_binaries(
+    mock_packages,
+    mock_fetch,
+    mock_archive,
+    mock_binary_index,
+    tmp_path,
+    install_mockery,
+    monkeypatch,
+):
+    """Tests binary packages known from the mirror index are downloaded ahead of their install"""
+    mirror_dir = tmp_path / "mirror_dir"
+    install("dependent-install")
+    buildcache("push", "-u", "-f", "--update-index", str(mirror_dir), "dependent-install")
+    uninstall("-y", "-a")
+    mirror("add", "test-mirror", mirror_dir.as_uri())
+    spack.binary_distribution.BINARY_INDEX.update()
+
+    prefetched = []
+    prefetched_download = spack.installer._prefetched_download
+
+    def _prefetched_download(pkg, prefetch):
+        result = prefetched_download(pkg, prefetch)
+        prefetched.append((pkg.name, result is not None))
+        return result
+
+    monkeypatch.setattr(spack.installer, "_prefetched_download", _prefetched_download)
+    install("--cache-only", "--no-check-signature", "dependent-install")
+    assert sorted(prefetched) == [("dependency-install", True), ("dependent-install", True)]
+    assert Spec("dependent-install").concretized().installed
+
+
+@pytest.mark.not_on_windows("Buildcache not supported on windows")
+def test_install_concurrent_packages_from_binaries(
+    mock_packages,
+    mock_fetch,
+    mock_archive,
+    mock_binary_index,
+    tmp_path,
+    install_mockery,
+    monkeypatch,
+):
+    """Tests binary packages are extracted in child processes when installing packages
+    concurrently, and that packages without a binary are then built from sources"""
+    mirror_dir = tmp_path / "mirror_dir"
+    install("dependent-install")
+    buildcache("push", "-u", "-f", "--update-index", str(mirror_dir), "dependency-install")
+    uninstall("-y", "-a")
+    mirror("add", "test-mirror", mirror_dir.as_uri())
+
+    children = []
+    spawn_build_process = spack.build_environment.spawn_build_process
+
+    def _spawn_build_process(pkg, function, kwargs, forward_stdin=True):
+        children.append((pkg.name, function.__name__))
+        return spawn_build_process(pkg, function, kwargs, forward_stdin=forward_stdin)
+
+    # Hooks of binary packages extracted in a child run in the parent, after the package
+    # is added to the database
+    hooks = []
+
+    def _post_install(spec, explicit):
+        in_db = spack.store.STORE.db.query_local_by_spec_hash(spec.dag_hash()) is not None
+        hooks.append((spec.name, in_db))
+
+    monkeypatch.setattr(spack.build_environment, "spawn_build_process", _spawn_build_process)
+    monkeypatch.setattr(spack.hooks, "post_install", _post_install)
+    install("-p", "2", "--no-check-signature", "dependent-install")
+
+    assert ("dependency-install", True) in hooks
+    assert children == [
+        ("dependency-install", "_install_from_cache_in_child"),
+        ("dependent-install", "_install_from_cache_in_child"),
+        ("dependent-install", "build_process"),
+    ]
+    spec = Spec("dependent-install").concretized()
+    assert spec.installed and spec["dependency-install"].installed
+    assert spack.store.STORE.db.query_one("dependency-install").installed
+
+
+def test_install_resume_after_last_completed_phase(install_mockery, mock_fetch):
+    """Tests that a resumed build skips the phases completed by the previous build"""
+    spec = spack.spec.Spec("dev-build-test-install-phases").concretized()
+    install("--until", "two", "dev-build-test-install-phases")
+    assert not spec.installed
+
+    checkpoint = os.path.join(spec.package.stage.path, spack.installer._CHECKPOINT_FILE)
+    with open(checkpoint) as f:
+        assert json.load(f)["phases"] == ["one", "two"]
+
+    out = install("--resume", "dev-build-test-install-phases")
+    assert "Skipping phase: 'one'" in out and "Skipping phase: 'two'" in out
+    assert "Executing phase: 'one'" not in out and "Executing phase: 'three'" in out
+    assert spec.installed
+
+
+def test_install_resume_needs_same_build(install_mockery, mock_fetch, monkeypatch, tmp_path):
+    """Tests that phases are not skipped when the build environment changed"""
+    install("--until", "two", "dev-build-test-install-phases")
+
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    out = install("--resume", "dev-build-test-install-phases")
+    assert "Skipping phase" not in out and "Executing phase: 'one'" in out
+
+
+def test_install_trace(install_mockery, mock_fetch, tmp_path):
+    """Tests that --trace writes a timeline of the install, with one track per build slot"""
+    trace_file = tmp_path / "trace.json"
+    install("--trace", str(trace_file), "--concurrent-packages", "2", "dttop")
+
+    with open(trace_file) as f:
+        events = json.load(f)["traceEvents"]
+
+    spans = [e for e in events if e["ph"] == "X"]
+    assert {"command", "concretize", "lock", "install", "stage", "phase", "hook"}.issubset(
+        e["cat"] for e in spans
+    )
+
+    # Each package is installed on a build slot, and its phases are on the same track
+    installs = {e["name"].split("@")[0]: e for e in spans if e["cat"] == "install"}
+    assert set(installs) == {s.name for s in Spec("dttop").concretized().traverse()}
+    assert all(e["tid"] in (1, 2) for e in installs.values())
+    install_phase = next(e for e in spans if e["name"] == "install dttop")
+    assert install_phase["tid"] == installs["dttop"]["tid"]
+
+    tracks = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert tracks[0] == "spack" and tracks[1] == "build slot 1"
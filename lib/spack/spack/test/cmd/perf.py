@@ -0,0 +1,58 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import json
+
+import pytest
+
+import spack.solver.benchmark as benchmark
+from spack.main import SpackCommand
+
+perf = SpackCommand("perf")
+
+pytestmark = pytest.mark.usefixtures("mutable_config", "mock_packages")
+
+
+@pytest.fixture()
+def fixed_metrics(monkeypatch):
+    """Replaces the solve of each case with metrics that can be set by the test"""
+    metrics = {metric: 1.0 for metric in benchmark.METRICS}
+    metrics["nodes"] = 3
+    monkeypatch.setattr(benchmark, "run_case", lambda case: dict(metrics))
+    return metrics
+
+
+def test_perf_concretize(tmp_path):
+    path = tmp_path / "results.json"
+    output = perf("concretize", "-n", "1", "--case", "mpileaks", "-o", str(path))
+
+    assert "mpileaks" in output
+    data = json.loads(path.read_text())["benchmark"]
+    assert data["repetitions"] == 1
+    assert list(data["cases"]) == ["mpileaks"]
+    assert all(len(samples) == 1 for samples in data["cases"]["mpileaks"]["samples"].values())
+
+
+def test_perf_concretize_unknown_case():
+    perf("concretize", "--case", "not-a-case", fail_on_error=False)
+    assert perf.returncode != 0
+    assert isinstance(perf.error, benchmark.BenchmarkError)
+    assert "unknown cases: not-a-case" in str(perf.error)
+
+
+def test_perf_concretize_with_baseline(tmp_path, fixed_metrics):
+    path = tmp_path / "baseline.json"
+    perf("concretize", "-n", "5", "--case", "mpileaks", "-o", str(path))
+
+    # Same results as the baseline
+    output = perf("concretize", "-n", "5", "--case", "mpileaks", "--baseline", str(path))
+    assert "regression" not in output
+
+    # Slower than the baseline
+    fixed_metrics["total"] = 2.0
+    output = perf(
+        "concretize", "-n", "5", "--case", "mpileaks", "--baseline", str(path), fail_on_error=False
+    )
+    assert perf.returncode == 1
+    assert "regression" in output
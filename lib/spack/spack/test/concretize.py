@@ -3,6 +3,7 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 import copy
+import io
 import os
 import sys
 
@@ -3028,6 +3029,149 @@ def test_selecting_reused_sources(reuse_yaml, expected_length, mutable_config, m
     assert len(specs) == expected_length
 
 
+@pytest.mark.usefixtures("mock_packages")
+def test_reused_specs_of_other_packages_provide_compilers(mutable_config, monkeypatch):
+    """Tests that only reusable specs of packages that can be in the solution are turned
+    into facts, but that the compilers of all the reusable specs are considered"""
+    other = Spec("zmpi").concretized()
+    other.compiler = spack.spec.CompilerSpec("gcc@=1.0")
+
+    setups = []
+    solve = spack.solver.asp.PyclingoDriver.solve
+
+    def _solve(self, setup, specs, **kwargs):
+        setups.append(setup)
+        return solve(self, setup, specs, **kwargs)
+
+    monkeypatch.setattr(spack.solver.asp.PyclingoDriver, "solve", _solve)
+    monkeypatch.setattr(spack.solver.asp, "_has_runtime_dependencies", lambda x: True)
+    monkeypatch.setattr(spack.solver.asp, "_specs_from_store", lambda configuration: [other])
+    monkeypatch.setattr(spack.solver.asp, "_specs_from_mirror", lambda: [])
+    mutable_config.set("concretizer:reuse", True)
+    spack.solver.asp.Solver().solve([Spec("libelf")])
+
+    (setup,) = setups
+    assert "zmpi" not in {s.name for _, s in setup.reusable_and_possible.explicit_items()}
+    assert any(c.spec == other.compiler for c in setup.possible_compilers)
+
+
+@pytest.mark.usefixtures("mutable_database", "mock_store")
+def test_reused_specs_are_pruned_to_possible_packages(mutable_config, monkeypatch):
+    """Tests that only specs of packages that can be in the solution are filtered, and
+    reused, together with a spec for each compiler of the other packages"""
+    # Assume all specs have a runtime dependency
+    monkeypatch.setattr(spack.solver.asp, "_has_runtime_dependencies", lambda x: True)
+    mutable_config.set("concretizer:reuse", True)
+    all_specs = spack.solver.asp.ReusableSpecsSelector(mutable_config).reusable_specs(["mpileaks"])
+
+    filtered = []
+    is_reusable = spack.solver.asp._is_reusable
+
+    def _is_reusable(spec, packages, local):
+        filtered.append(spec)
+        return is_reusable(spec, packages, local)
+
+    monkeypatch.setattr(spack.solver.asp, "_is_reusable", _is_reusable)
+    possible = {"callpath", "mpich"}
+    selector = spack.solver.asp.ReusableSpecsSelector(mutable_config)
+    specs = selector.reusable_specs(["mpileaks"], possible=possible)
+
+    expected = [x for x in all_specs if x.name in possible]
+    assert [x for x in specs if x.name in possible] == expected
+
+    def _compiler(x):
+        return (x.compiler, x.architecture.os, x.architecture.target.family)
+
+    others = [x for x in specs if x.name not in possible]
+    assert len({_compiler(x) for x in others}) == len(others)
+    assert {_compiler(x) for x in others} == {
+        _compiler(x) for x in all_specs if x.name not in possible
+    }
+    assert len(filtered) == len(expected) + len(others)
+
+
+def test_spec_filters_max_per_package():
+    """Tests that at most a number of specs, with the newest versions, is selected for each
+    package and configuration"""
+    specs = [
+        Spec(x)
+        for x in (
+            "cmake@=3.4.3 %gcc",
+            "cmake@=3.27.9 %gcc",
+            "cmake@=3.23.1 %gcc",
+            "cmake@=3.4.3 %clang",
+        )
+    ]
+    f = spack.solver.asp.SpecFilter(
+        factory=lambda: specs, is_usable=lambda x: True, include=[], exclude=[], max_per_package=2
+    )
+    assert [str(x) for x in f.selected_specs()] == [
+        "cmake@=3.27.9%gcc",
+        "cmake@=3.23.1%gcc",
+        "cmake@=3.4.3%clang",
+    ]
+
+
+@pytest.mark.usefixtures("mutable_database", "mock_store")
+def test_solves_with_a_shared_setup(mutable_config, monkeypatch):
+    """Tests that solves in a shared setup read the reusable specs once, and give the
+    same results as other solves"""
+    monkeypatch.setattr(spack.solver.asp, "_has_runtime_dependencies", lambda x: True)
+    mutable_config.set("concretizer:reuse", True)
+    expected = [Spec(x).concretized() for x in ("mpileaks", "libelf", "callpath")]
+
+    reads = []
+    specs_from_store = spack.solver.asp._specs_from_store
+
+    def _specs_from_store(configuration):
+        reads.append(configuration)
+        return specs_from_store(configuration)
+
+    monkeypatch.setattr(spack.solver.asp, "_specs_from_store", _specs_from_store)
+    with spack.solver.asp.shared_setup(warm_up=[Spec("mpileaks")]) as setup:
+        recorded = len(setup.fact_cache._memory)
+        assert recorded > 0
+        result = [Spec(x).concretized() for x in ("mpileaks", "libelf", "callpath")]
+
+    assert len(reads) == 1
+    assert [x.dag_hash() for x in result] == [x.dag_hash() for x in expected]
+    assert spack.solver.asp._SHARED_SETUP is None
+
+
+@pytest.mark.usefixtures("mutable_config", "mock_packages")
+def test_streaming_facts_to_the_backend():
+    """Tests that facts streamed to the backend of clingo are the same as the facts of the
+    problem in text form, and that only rules and comments are kept in memory"""
+    specs = [Spec("mpileaks")]
+    expected = spack.solver.asp.SpackSolverSetup().setup(specs, reuse=[])
+
+    out = io.StringIO()
+    control = spack.solver.asp.default_clingo_control()
+    with control.backend() as backend:
+        gen = spack.solver.asp.StreamingProblemBuilder(backend, out=out)
+        problem = spack.solver.asp.SpackSolverSetup().setup(specs, reuse=[], gen=gen)
+
+    assert sorted(out.getvalue().splitlines()) == sorted(expected.splitlines())
+    assert 'max_dupes("mpileaks",1).' not in problem
+    assert any(str(x.symbol) == 'max_dupes("mpileaks",1)' for x in control.symbolic_atoms)
+
+
+@pytest.mark.usefixtures("mutable_config", "mock_packages")
+def test_patches_of_a_dependency_shared_by_several_roots():
+    """Tests that a dependency shared by several roots of a solve has the patches required
+    by each of them"""
+    roots = ["patch-a-dependency", "patch-several-dependencies"]
+    expected = set()
+    for root in roots:
+        expected.update(Spec(root).concretized()["libelf"].variants["patches"].value)
+
+    result = spack.solver.asp.Solver().solve([Spec(x) for x in roots])
+
+    libelf = {s["libelf"] for s in result.specs}
+    assert len(libelf) == 1
+    assert set(libelf.pop().variants["patches"].value) == expected
+
+
 @pytest.mark.parametrize(
     "specs,include,exclude,expected",
     [
@@ -3,9 +3,12 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import pickle
+
 import pytest
 
 import spack.config
+import spack.error
 import spack.solver.asp
 import spack.spec
 
@@ -62,3 +65,68 @@ def test_error_messages(error_messages, config_set, spec, mock_packages, mutable
 
     for em in error_messages:
         assert em in str(e.value)
+
+
+def test_error_messages_are_computed_lazily(mock_packages, mutable_config, monkeypatch):
+    calls = []
+    explanation = spack.solver.asp.ErrorHandler.explanation
+
+    def _explanation(self, *args, **kwargs):
+        calls.append(args)
+        return explanation(self, *args, **kwargs)
+
+    monkeypatch.setattr(spack.solver.asp.ErrorHandler, "explanation", _explanation)
+    with pytest.raises(spack.solver.asp.UnsatisfiableSpecError) as e:
+        _ = spack.spec.Spec("quantum-espresso^fftw@1.1:").concretized()
+
+    assert not calls
+    assert version_error_messages[0] in str(e.value)
+    assert version_error_messages[0] in str(e.value)
+    assert len(calls) == 1
+
+
+def test_error_messages_without_explanation(mock_packages, mutable_config):
+    spack.config.set("concretizer:explain", False)
+    with pytest.raises(spack.solver.asp.UnsatisfiableSpecError) as e:
+        _ = spack.spec.Spec("quantum-espresso^fftw@1.1:").concretized()
+
+    assert "Cannot satisfy 'fftw@1.1:'" in str(e.value)
+    assert "required because" not in str(e.value)
+    assert "--explain" in str(e.value)
+
+
+def test_explanation_that_times_out(mock_packages, mutable_config, monkeypatch):
+    monkeypatch.setattr(spack.solver.asp.ErrorHandler, "_solve_for_causes", lambda *args: False)
+    spack.config.set("concretizer:timeout", 10)
+    with pytest.raises(spack.solver.asp.UnsatisfiableSpecError) as e:
+        _ = spack.spec.Spec("quantum-espresso^fftw@1.1:").concretized()
+
+    assert "Cannot satisfy 'fftw@1.1:'" in str(e.value)
+    assert "not computed within 10 seconds" in str(e.value)
+
+
+def test_unsatisfiable_errors_can_be_pickled(mock_packages, mutable_config):
+    with pytest.raises(spack.solver.asp.UnsatisfiableSpecError) as e:
+        _ = spack.spec.Spec("quantum-espresso^fftw@1.1:").concretized()
+
+    error = pickle.loads(pickle.dumps(e.value))
+    assert isinstance(error, spack.solver.asp.UnsatisfiableSpecError)
+    assert str(error) == str(e.value)
+
+
+@pytest.mark.parametrize("explain", [True, False])
+def test_unexpected_errors_are_not_unsatisfiable(
+    explain, mock_packages, mutable_config, monkeypatch
+):
+    """Tests a bug in formatting the errors is raised right away, and is not taken for an
+    unsatisfiable spec, e.g. by the fallbacks of environments"""
+
+    def _message(self, errors):
+        raise RuntimeError("formatting bug")
+
+    monkeypatch.setattr(spack.solver.asp.ErrorHandler, "message", _message)
+    spack.config.set("concretizer:explain", explain)
+    with pytest.raises(spack.error.SpackError, match="formatting bug") as e:
+        _ = spack.spec.Spec("quantum-espresso^fftw@1.1:").concretized()
+
+    assert not isinstance(e.value, spack.error.UnsatisfiableSpecError)
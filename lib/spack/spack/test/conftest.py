@@ -34,6 +34,7 @@
 
 import spack.binary_distribution
 import spack.bootstrap.core
+import spack.build_history
 import spack.caches
 import spack.compiler
 import spack.compilers
@@ -372,6 +373,23 @@ def reset_compiler_cache():
     spack.compilers._compiler_cache = {}
 
 
+@pytest.fixture(scope="function", autouse=True)
+def isolated_build_history(tmp_path_factory, monkeypatch):
+    """Ensure that installs in tests are not recorded in the build history of the user,
+    and that tests do not depend on it."""
+    caches = []
+
+    def _cache(history):
+        if history._cache is not None:
+            return history._cache
+        if not caches:
+            root = tmp_path_factory.mktemp("build_history")
+            caches.append(spack.util.file_cache.FileCache(str(root)))
+        return caches[0]
+
+    monkeypatch.setattr(spack.build_history.BuildHistory, "cache", property(_cache))
+
+
 def onerror(func, path, error_info):
     # Python on Windows is unable to remvove paths without
     # write (IWUSR) permissions (such as those generated by Git on Windows)
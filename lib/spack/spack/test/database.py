@@ -1198,3 +1198,103 @@ def test_query_with_predicate_fn(database):
 
     specs = database.query(predicate_fn=lambda x: not spack.repo.PATH.exists(x.spec.name))
     assert not specs
+
+
+def test_group_commit_appends_to_journal(tmp_path, default_mock_concretization):
+    """Tests that writes in a group commit go to the journal, which is visible to other
+    readers and merged into the index when leaving the context."""
+    root = str(tmp_path)
+    db = spack.database.Database(root, layout=None)
+    a, b = default_mock_concretization("pkg-a"), default_mock_concretization("pkg-b")
+    db.add(b)
+
+    with db.group_commit():
+        with open(db._index_path) as f:
+            index = f.read()
+
+        db.add(a, explicit=True)
+        db.mark(b, "explicit", True)
+
+        # The index was not written, but the records are in the journal
+        with open(db._index_path) as f:
+            assert f.read() == index
+        with open(db._journal_path) as f:
+            assert len(f.readlines()) == 2
+
+        # Other processes see the journaled records
+        other = spack.database.Database(root, layout=None)
+        assert a in other.query_local()
+        assert other.get_record(b).explicit
+
+    assert not os.path.exists(db._journal_path)
+    with open(db._index_path) as f:
+        installs = json.load(f)["database"]["installs"]
+    assert installs[a.dag_hash()]["explicit"] and installs[b.dag_hash()]["explicit"]
+
+
+def test_group_commit_updates_verifier_once(tmp_path, default_mock_concretization, monkeypatch):
+    """Tests the verifier is written only when the index is, and that readers still see the
+    records appended to the journal since their last read."""
+    monkeypatch.setattr(spack.database, "_use_uuid", True)
+    root = str(tmp_path)
+    db = spack.database.Database(root, layout=None)
+    a, b = default_mock_concretization("pkg-a"), default_mock_concretization("pkg-b")
+    db.add(b)
+
+    reader = spack.database.Database(root, layout=None)
+    assert reader.query_local() == [b]
+
+    with db.group_commit():
+        verifier = db.last_seen_verifier
+        db.add(a)
+        db.mark(b, "explicit", True)
+        assert db.last_seen_verifier == verifier
+
+        assert a in reader.query_local()
+        assert reader.get_record(b).explicit
+
+    assert db.last_seen_verifier != verifier
+
+
+def test_group_commit_writes_index_after_max_writes(tmp_path, default_mock_concretization):
+    db = spack.database.Database(str(tmp_path), layout=None)
+    specs = [default_mock_concretization(x) for x in ("pkg-c", "pkg-b", "pkg-a")]
+    db.add(specs[0])
+
+    with db.group_commit(max_writes=2):
+        db.add(specs[1])
+        assert os.path.exists(db._journal_path)
+
+        # The second write is merged into the index, together with the journal
+        db.add(specs[2])
+        assert not os.path.exists(db._journal_path)
+        with open(db._index_path) as f:
+            installs = json.load(f)["database"]["installs"]
+        assert all(s.dag_hash() in installs for s in specs)
+
+
+def test_group_commit_journal_survives_interruptions(tmp_path, default_mock_concretization):
+    """Tests that journaled records are not lost if the group commit is interrupted, and
+    that a partially written record is ignored."""
+    root = str(tmp_path)
+    db = spack.database.Database(root, layout=None)
+    a, b = default_mock_concretization("pkg-a"), default_mock_concretization("pkg-b")
+    db.add(b)
+
+    with db.group_commit():
+        db.add(a)
+        with open(db._journal_path) as f:
+            journal = f.read()
+
+    # Simulate an interruption before the journal is merged, in the middle of a write
+    with open(db._journal_path, "w") as f:
+        f.write(journal + journal[: len(journal) // 2])
+
+    db = spack.database.Database(root, layout=None)
+    assert a in db.query_local()
+
+    # Any other write merges the journal into the index
+    db.remove(b)
+    assert not os.path.exists(db._journal_path)
+    specs = spack.database.Database(root, layout=None).query_local()
+    assert a in specs and b not in specs
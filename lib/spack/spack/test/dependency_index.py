@@ -0,0 +1,92 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Tests for the index of the direct dependencies of packages"""
+import io
+import sys
+
+import pytest
+
+import spack.deptypes as dt
+import spack.package_base
+import spack.repo
+from spack.dependency_index import DependencyIndex
+
+
+def _index(repository):
+    index = DependencyIndex(repository=repository)
+    for name in repository.all_package_names():
+        index.update_package(name)
+    return index
+
+
+def test_dependency_index_round_trip(mock_packages):
+    index = _index(spack.repo.PATH)
+
+    ostream = io.StringIO()
+    index.to_json(ostream)
+    other = DependencyIndex.from_json(io.StringIO(ostream.getvalue()), spack.repo.PATH)
+
+    assert other.dependencies == index.dependencies
+    assert other.provides == index.provides
+
+
+@pytest.mark.parametrize("pkg_name", ["dtbuild1", "dttop", "mpileaks"])
+@pytest.mark.parametrize("depflag", [dt.BUILD, dt.LINK, dt.RUN, dt.TEST, dt.LINK | dt.RUN])
+def test_dependency_index_entries(mock_packages, pkg_name, depflag):
+    pkg_cls = spack.repo.PATH.get_pkg_class(pkg_name)
+    index = spack.repo.PATH.dependency_index
+    assert index.dependencies_of_type(pkg_name, depflag) == pkg_cls.dependencies_of_type(depflag)
+    assert index.provided_virtual_names(pkg_name) == pkg_cls.provided_virtual_names()
+
+
+def test_dependency_index_providers(mock_packages):
+    assert spack.repo.PATH.dependency_index.provided_virtual_names("mpich") == ["mpi"]
+
+
+@pytest.mark.parametrize(
+    "pkg_name,kwargs",
+    [
+        ("mpileaks", {}),
+        ("mpileaks", {"expand_virtuals": False}),
+        ("mpileaks", {"transitive": False}),
+        ("dtbuild1", {"depflag": dt.LINK | dt.RUN}),
+        ("dtbuild1", {"depflag": dt.BUILD}),
+        ("dt-diamond", {}),
+        ("missing-dependency", {}),
+    ],
+)
+def test_possible_dependencies_from_the_index(mock_packages, pkg_name, kwargs):
+    """Tests that the possible dependencies computed from the index are the same as
+    those computed from the package classes"""
+    missing, virtuals = {}, set()
+    expected = spack.repo.PATH.get_pkg_class(pkg_name).possible_dependencies(
+        missing=missing, virtuals=virtuals, **kwargs
+    )
+
+    index_missing, index_virtuals = {}, set()
+    result = spack.repo.PATH.dependency_index.possible_dependencies(
+        pkg_name, missing=index_missing, virtuals=index_virtuals, **kwargs
+    )
+
+    assert result == expected
+    assert index_missing == missing
+    assert index_virtuals == virtuals
+
+
+def test_possible_dependencies_do_not_load_packages(mock_packages, monkeypatch):
+    # Make sure the index is built before checking which modules are loaded
+    spack.repo.PATH.dependency_index
+    monkeypatch.setattr(
+        sys, "modules", {k: v for k, v in sys.modules.items() if not k.startswith("spack.pkg.")}
+    )
+
+    spack.package_base.possible_dependencies("mpileaks", "dt-diamond")
+
+    assert not any(k.startswith("spack.pkg.") for k in sys.modules)
+
+
+def test_unknown_package_has_no_possible_dependencies(mock_packages):
+    with pytest.raises(spack.repo.UnknownPackageError):
+        spack.package_base.possible_dependencies("not-a-real-package")
@@ -4,21 +4,28 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 """Test environment internals without CLI"""
 import filecmp
+import multiprocessing
 import os
 import pickle
+import sys
 
 import pytest
 
 import llnl.util.filesystem as fs
 
+import spack.concretize
 import spack.config
 import spack.environment as ev
+import spack.environment.environment
 import spack.solver.asp
 import spack.spec
+import spack.util.parallel
 from spack.environment.environment import (
     EnvironmentManifestFile,
     SpackEnvironmentViewError,
     _error_on_nonempty_view_dir,
+    _independent_clusters,
+    _is_unified_with,
 )
 from spack.spec_list import UndefinedReferenceError
 
@@ -906,3 +913,280 @@ def test_only_roots_are_explicitly_installed(tmp_path, mock_packages, config, te
     assert callpath in temporary_store.db.query(explicit=False)
     env.install_specs([mpileaks], fake=True)
     assert temporary_store.db.query(explicit=True) == [mpileaks]
+
+
+def test_new_roots_are_not_concretized_incrementally_by_default(
+    tmp_path, mock_packages, config, monkeypatch
+):
+    """Tests that all the roots of a unified environment are solved again by default"""
+    with ev.create_in_dir(tmp_path) as env:
+        env.unify = True
+        env.add("mpileaks")
+        env.concretize()
+        full_solves = []
+        full_solve = spack.concretize.concretize_specs_together
+
+        def _full_solve(*args, **kwargs):
+            full_solves.append(args)
+            return full_solve(*args, **kwargs)
+
+        monkeypatch.setattr(spack.concretize, "concretize_specs_together", _full_solve)
+        env.add("callpath")
+        env.concretize()
+
+    assert len(full_solves) == 1
+
+
+def test_new_roots_are_concretized_incrementally(
+    tmp_path, mock_packages, mutable_config, monkeypatch
+):
+    """Tests that roots added to a unified environment are solved on their own, and
+    share the nodes of the roots already concretized."""
+    mutable_config.set("concretizer:incremental", True)
+    with ev.create_in_dir(tmp_path) as env:
+        env.unify = True
+        env.add("mpileaks")
+        env.concretize()
+        mpileaks = env.matching_spec("mpileaks")
+
+        def _full_solve(*args, **kwargs):
+            raise AssertionError("all the roots should not be solved again")
+
+        monkeypatch.setattr(spack.concretize, "concretize_specs_together", _full_solve)
+        env.add("callpath")
+        [(_, callpath)] = env.concretize()
+
+    assert callpath.dag_hash() == mpileaks["callpath"].dag_hash()
+    assert env.matching_spec("mpileaks").dag_hash() == mpileaks.dag_hash()
+    assert len(env.concretized_order) == 2
+
+    # The new root is the same object as the node of the kept root
+    nodes = env.matching_spec("mpileaks").traverse()
+    assert any(node is callpath for node in nodes)
+
+
+def test_incremental_concretization_falls_back_to_full_solve(
+    tmp_path, mock_packages, mutable_config, monkeypatch
+):
+    """Tests that all the roots are solved together, if the new roots solved on their own
+    are not unified with the existing ones."""
+    mutable_config.set("concretizer:incremental", True)
+    with ev.create_in_dir(tmp_path) as env:
+        env.unify = True
+        env.add("mpileaks")
+        env.concretize()
+        full_solves = []
+        full_solve = spack.concretize.concretize_specs_together
+
+        def _full_solve(*args, **kwargs):
+            full_solves.append(args)
+            return full_solve(*args, **kwargs)
+
+        monkeypatch.setattr(spack.environment.environment, "_is_unified_with", lambda x, y: False)
+        monkeypatch.setattr(spack.concretize, "concretize_specs_together", _full_solve)
+        env.add("libelf")
+        env.concretize()
+
+    assert len(full_solves) == 1
+    assert len(env.concretized_order) == 2
+    assert (
+        env.matching_spec("libelf").dag_hash()
+        == env.matching_spec("mpileaks")["libelf"].dag_hash()
+    )
+
+
+def test_incremental_concretization_does_not_hide_internal_errors(
+    tmp_path, mock_packages, mutable_config, monkeypatch
+):
+    """Tests that a bug in the solve of the new roots is not taken for an unsatisfiable
+    spec, which would make all the roots be solved again."""
+    mutable_config.set("concretizer:incremental", True)
+    with ev.create_in_dir(tmp_path) as env:
+        env.unify = True
+        env.add("mpileaks")
+        env.concretize()
+
+        def _solve(*args, **kwargs):
+            raise spack.solver.asp.InternalConcretizerError("internal bug")
+
+        def _full_solve(*args, **kwargs):
+            raise AssertionError("all the roots should not be solved again")
+
+        monkeypatch.setattr(spack.solver.asp.Solver, "solve", _solve)
+        monkeypatch.setattr(spack.concretize, "concretize_specs_together", _full_solve)
+        env.add("libelf")
+        with pytest.raises(spack.solver.asp.InternalConcretizerError, match="internal bug"):
+            env.concretize()
+
+
+@pytest.mark.parametrize(
+    "specs,other_specs,expected",
+    [
+        (["callpath"], ["mpileaks"], True),
+        (["callpath ^zmpi"], ["mpileaks ^mpich"], False),
+        (["libelf@0.8.12"], ["mpileaks ^libelf@0.8.13"], False),
+        (["zlib"], ["mpileaks"], True),
+        (["mpich2"], ["mpileaks ^mpich"], False),
+    ],
+)
+def test_is_unified_with(specs, other_specs, expected, mock_packages, config):
+    specs = [spack.spec.Spec(s).concretized() for s in specs]
+    other_specs = [spack.spec.Spec(s).concretized() for s in other_specs]
+    assert _is_unified_with(specs, other_specs) is expected
+
+
+@pytest.mark.parametrize(
+    "specs,expected",
+    [
+        (["mpileaks", "callpath", "zlib"], [["zlib"], ["mpileaks", "callpath"]]),
+        (["libelf", "zlib", "libdwarf"], [["zlib"], ["libelf", "libdwarf"]]),
+        (["mpileaks", "/abcdef"], [["mpileaks", "/abcdef"]]),
+    ],
+)
+def test_independent_clusters(specs, expected, mock_packages, config):
+    clusters = _independent_clusters([spack.spec.Spec(s) for s in specs])
+    assert sorted([str(s) for s in cluster] for cluster in clusters) == sorted(expected)
+
+
+def test_when_possible_solves_independent_clusters(tmp_path, mock_packages, config, monkeypatch):
+    """Tests that roots with no dependency in common are solved separately, with the
+    same result as when they are solved together."""
+    manifest = tmp_path / "spack.yaml"
+    manifest.write_text(
+        """
+    spack:
+      specs:
+      - mpileaks
+      - callpath
+      - zlib
+      - libelf@0.8.12
+      concretizer:
+        unify: when_possible
+    """
+    )
+    with ev.Environment(tmp_path) as env:
+        assert len(_independent_clusters(env.user_specs.specs)) == 2
+        env.concretize()
+        sharded = {str(s): c.dag_hash() for s, c in env.concretized_specs()}
+
+    monkeypatch.setattr(
+        spack.environment.environment, "_independent_clusters", lambda specs, tests: [specs]
+    )
+    with ev.Environment(tmp_path) as env:
+        env.concretize(force=True)
+        together = {str(s): c.dag_hash() for s, c in env.concretized_specs()}
+
+    assert len(sharded) == 4
+    assert sharded == together
+
+
+def test_identical_roots_are_concretized_once(tmp_path, mock_packages, config, monkeypatch):
+    """Tests that identical roots of an environment with unify:false are solved once"""
+    manifest = tmp_path / "spack.yaml"
+    manifest.write_text(
+        """
+    spack:
+      specs:
+      - matrix:
+        - [libelf, zlib]
+      - libelf
+      concretizer:
+        unify: false
+    """
+    )
+    tasks = []
+
+    def _imap_unordered(f, list_of_args, **kwargs):
+        tasks.extend(list_of_args)
+        return map(f, list_of_args)
+
+    monkeypatch.setattr(spack.util.parallel, "imap_unordered", _imap_unordered)
+    with ev.Environment(tmp_path) as env:
+        env.concretize()
+
+    assert sorted(spec_str for _, spec_str, _ in tasks) == ["libelf", "zlib"]
+    assert len(env.concretized_order) == 3
+    libelf_hashes = [
+        h for s, h in zip(env.concretized_user_specs, env.concretized_order) if s.name == "libelf"
+    ]
+    assert len(libelf_hashes) == 2 and len(set(libelf_hashes)) == 1
+
+
+def test_when_possible_clusters_agree_on_build_tools(tmp_path, mock_packages, config, monkeypatch):
+    """Tests that roots that only share build tools, and are solved separately with different
+    versions of them, have the same result as when they are solved together."""
+    packages_with_tags = spack.repo.PATH.packages_with_tags
+
+    def _packages_with_tags(*tags, full=False):
+        if tags == ("build-tools",):
+            return {"cmake", "gmake", "ninja"}
+        return packages_with_tags(*tags, full=full)
+
+    monkeypatch.setattr(spack.repo.PATH, "packages_with_tags", _packages_with_tags)
+    manifest = tmp_path / "spack.yaml"
+    manifest.write_text(
+        """
+    spack:
+      specs:
+      - cmake-client ^cmake@3.4.3
+      - cmake-conditional-variants-test
+      concretizer:
+        unify: when_possible
+        duplicates:
+          strategy: minimal
+    """
+    )
+    with ev.Environment(tmp_path) as env:
+        assert len(_independent_clusters(env.user_specs.specs)) == 2
+        env.concretize()
+        sharded = {str(s): c.dag_hash() for s, c in env.concretized_specs()}
+
+    monkeypatch.setattr(
+        spack.environment.environment, "_independent_clusters", lambda specs, tests: [specs]
+    )
+    with ev.Environment(tmp_path) as env:
+        env.concretize(force=True)
+        together = {str(s): c.dag_hash() for s, c in env.concretized_specs()}
+        cmakes = {c["cmake"].dag_hash() for _, c in env.concretized_specs()}
+
+    assert sharded == together
+    assert len(cmakes) == 1
+
+
+@pytest.mark.skipif(sys.platform in ("darwin", "win32"), reason="solves run in this process")
+@pytest.mark.parametrize("start_method,expected", [("fork", 1), ("spawn", 0)])
+def test_unify_false_shares_the_setup_only_with_forked_workers(
+    start_method, expected, tmp_path, mock_packages, config, monkeypatch
+):
+    """Tests that the setup shared by the solves of an environment with unify:false is not
+    prepared, if worker processes are not forked and cannot inherit it"""
+    manifest = tmp_path / "spack.yaml"
+    manifest.write_text(
+        """
+    spack:
+      specs:
+      - libelf
+      - zlib
+      concretizer:
+        unify: false
+    """
+    )
+    shared_setups = []
+    shared_setup = spack.solver.asp.shared_setup
+
+    def _shared_setup(*args, **kwargs):
+        shared_setups.append(kwargs)
+        return shared_setup(*args, **kwargs)
+
+    monkeypatch.setattr(multiprocessing, "get_start_method", lambda *args, **kwargs: start_method)
+    monkeypatch.setattr(spack.solver.asp, "shared_setup", _shared_setup)
+    monkeypatch.setattr(
+        spack.util.parallel,
+        "imap_unordered",
+        lambda f, list_of_args, **kwargs: map(f, list_of_args),
+    )
+    with ev.Environment(tmp_path) as env:
+        env.concretize()
+
+    assert len(shared_setups) == expected
+    assert len(env.concretized_order) == 2
@@ -0,0 +1,79 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+import spack.install_ledger
+
+pytestmark = pytest.mark.not_on_windows("Locks are not supported on Windows")
+
+
+def _ledgers(root, owner, **kwargs):
+    """Return a ledger of this process, and a ledger of another participant"""
+    ours = spack.install_ledger.TaskLedger(str(root), **kwargs)
+    theirs = spack.install_ledger.TaskLedger(str(root))
+    theirs.owner = owner
+    ours.join()
+    theirs.join()
+    return ours, theirs
+
+
+def test_claims_are_exclusive(tmp_path):
+    ours, theirs = _ledgers(tmp_path, "other-host:1")
+    assert theirs.claim("pkg-a")
+    assert not ours.claim("pkg-a")
+    assert ours.claim("pkg-b")
+
+    # Releasing a claim wakes up the other participants
+    version = ours.version
+    assert not ours.wait(version, timeout=0)
+    theirs.release(["pkg-a"])
+    assert ours.wait(version, timeout=0)
+    assert ours.claim("pkg-a")
+    assert ours.claimed == {"pkg-a", "pkg-b"}
+
+
+def _dead_process():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return f"{socket.gethostname()}:{process.pid}"
+
+
+@pytest.mark.parametrize(
+    "owner,kwargs",
+    [
+        # A process without heartbeat for too long
+        (lambda: "other-host:1", {"stale_after": 0.0}),
+        # A process of this host that died
+        (_dead_process, {}),
+    ],
+)
+def test_claims_of_gone_participants_are_taken_over(tmp_path, owner, kwargs):
+    ours, theirs = _ledgers(tmp_path, owner(), **kwargs)
+    assert theirs.claim("pkg-a")
+
+    version = ours.version
+    assert ours.claim("pkg-a")
+    assert ours.version == version + 1
+
+
+def test_last_participant_removes_the_ledger(tmp_path):
+    ours, theirs = _ledgers(tmp_path, "other-host:1")
+    assert ours.claim("pkg-a")
+
+    # Claims are released when leaving
+    ours.leave()
+    assert not ours.claimed
+    assert theirs.claim("pkg-a")
+    assert os.path.exists(ours.path)
+
+    theirs.release(["pkg-a"])
+    theirs.leave()
+    assert not os.path.exists(ours.path)
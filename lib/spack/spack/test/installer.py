@@ -3,10 +3,14 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import concurrent.futures
 import glob
+import multiprocessing
 import os
 import shutil
 import sys
+import time
+import types
 from typing import List, Optional, Union
 
 import py
@@ -17,10 +21,13 @@
 import llnl.util.tty as tty
 
 import spack.binary_distribution
+import spack.build_history
+import spack.config
 import spack.database
 import spack.deptypes as dt
 import spack.error
 import spack.hooks
+import spack.install_ledger
 import spack.installer as inst
 import spack.package_base
 import spack.package_prefs as prefs
@@ -28,6 +35,7 @@
 import spack.spec
 import spack.store
 import spack.util.lock as lk
+import spack.util.parallel
 from spack.installer import PackageInstaller
 from spack.main import SpackCommand
 
@@ -87,14 +95,6 @@ def create_installer(
     return inst.PackageInstaller([spec.package for spec in _specs], **_install_args)
 
 
-@pytest.mark.parametrize(
-    "sec,result",
-    [(86400, "24h"), (3600, "1h"), (60, "1m"), (1.802, "1.80s"), (3723.456, "1h 2m 3.46s")],
-)
-def test_hms(sec, result):
-    assert inst._hms(sec) == result
-
-
 def test_get_dependent_ids(install_mockery, mock_packages):
     # Concretize the parent package, which handle dependency too
     spec = spack.spec.Spec("pkg-a")
@@ -200,6 +200,114 @@ def _spec(spec, unsigned=False, mirrors_for_spec=None):
     assert "from binary cache" in out
 
 
+def test_process_binary_cache_tarball_prefetched(install_mockery, monkeypatch):
+    """Tests a binary package downloaded ahead of the install is not downloaded again"""
+    download_result = {"tarball_stage": None, "specfile_stage": None}
+    extracted, added = [], []
+
+    def _extract(spec, download_result, force=False, timer=None):
+        extracted.append(download_result)
+
+    monkeypatch.setattr(spack.binary_distribution, "download_tarball", _none)
+    monkeypatch.setattr(spack.binary_distribution, "extract_tarball", _extract)
+    monkeypatch.setattr(
+        spack.database.Database, "add", lambda db, spec, **kwargs: added.append(spec)
+    )
+
+    spec = spack.spec.Spec("pkg-a").concretized()
+    assert inst._process_binary_cache_tarball(
+        spec.package, explicit=False, unsigned=False, download_result=download_result
+    )
+    assert extracted == [download_result]
+    assert added == [spec]
+
+    # Packages extracted in a child process are added to the database by the parent
+    assert inst._process_binary_cache_tarball(
+        spec.package,
+        explicit=False,
+        unsigned=False,
+        download_result=download_result,
+        register=False,
+    )
+    assert added == [spec]
+
+
+def test_prefetched_download(install_mockery):
+    spec = spack.spec.Spec("pkg-a").concretized()
+    assert inst._prefetched_download(spec.package, None) is None
+
+    prefetch = concurrent.futures.Future()
+    prefetch.set_result(({"tarball_stage": None}, 1024))
+    assert inst._prefetched_download(spec.package, prefetch) == {"tarball_stage": None}
+
+    # A failed download ahead of the install is ignored
+    prefetch = concurrent.futures.Future()
+    prefetch.set_exception(spack.error.FetchError("network down"))
+    assert inst._prefetched_download(spec.package, prefetch) is None
+
+
+def test_prefetch_binaries(install_mockery, monkeypatch, tmp_path):
+    """Tests binary packages are downloaded ahead of their install in queue order, up to
+    a total size of packages waiting to be installed"""
+    tarball = tmp_path / "tarball.spack"
+    tarball.write_bytes(b"0" * 10)
+    download_result = {"tarball_stage": types.SimpleNamespace(save_filename=str(tarball))}
+
+    def _download(spec, unsigned, mirrors_for_spec):
+        return download_result
+
+    def _mirrors(spec, index_only=False):
+        return [{"mirror_url": "file:///mirror", "spec": spec}]
+
+    monkeypatch.setattr(spack.binary_distribution, "download_tarball", _download)
+    monkeypatch.setattr(spack.binary_distribution, "get_mirrors_for_spec", _mirrors)
+    monkeypatch.setattr(inst, "_PREFETCH_MAX_BYTES", 15)
+
+    installer = create_installer(["dependent-install", "trivial-install-test-package"])
+    installer._init_queue()
+    installer.prefetch_executor = spack.util.parallel.SequentialExecutor()
+    installer._prefetch_binaries()
+
+    # Only two packages fit in the limit
+    queued = [task for _, task in sorted(installer.build_pq, key=lambda item: item[0])]
+    prefetched = [task for task in queued if task.prefetch is not None]
+    assert prefetched == queued[:2]
+    assert prefetched[0].prefetch.result() == (download_result, 10)
+
+    # Once a package is installed, the next one is downloaded
+    installer._pop_task()
+    installer._prefetch_binaries()
+    assert all(task.prefetch is not None for task in queued)
+
+    # Tasks already considered are not scanned again
+    assert not installer.prefetch_pq
+
+
+def test_prefetch_binaries_of_requeued_tasks(install_mockery, monkeypatch):
+    """Tests a task requeued with a new priority is considered once for a download"""
+    considered = []
+
+    def _mirrors(spec, index_only=False):
+        considered.append(spec.name)
+        return []
+
+    monkeypatch.setattr(spack.binary_distribution, "get_mirrors_for_spec", _mirrors)
+
+    installer = create_installer(["dependent-install"])
+    installer._init_queue()
+    installer.prefetch_executor = spack.util.parallel.SequentialExecutor()
+
+    # Requeue the dependent, as if its dependency was installed
+    dependent = installer.build_tasks[inst.package_id(installer.build_requests[0].pkg.spec)]
+    dependency_id = inst.package_id(dependent.pkg.spec["dependency-install"])
+    installer._push_task(dependent.next_attempt({dependency_id}))
+    assert installer.build_tasks[dependent.pkg_id].priority == 0
+
+    installer._prefetch_binaries()
+    assert sorted(considered) == ["dependency-install", "dependent-install"]
+    assert not installer.prefetch_pq
+
+
 def test_try_install_from_binary_cache(install_mockery, mock_packages, monkeypatch):
     """Test return false when no match exists in the mirror"""
     spec = spack.spec.Spec("mpich")
@@ -628,6 +736,46 @@ def test_check_deps_status_upstream(install_mockery, monkeypatch):
         assert inst.package_id(dep) in installer.installed
 
 
+def test_init_queue_reads_database_once(install_mockery, mock_fetch, monkeypatch):
+    """Test the install status of all the requested specs is looked up in one transaction."""
+    dependency = spack.spec.Spec("dependency-install").concretized()
+    PackageInstaller([dependency.package], explicit=True).install()
+
+    installer = create_installer(["dependent-install", "pkg-a", "pkg-b"])
+    reads = []
+    read = spack.database.Database._read
+
+    def _read(self):
+        reads.append(self)
+        return read(self)
+
+    monkeypatch.setattr(spack.database.Database, "_read", _read)
+    snapshots = []
+    add_tasks = installer._add_tasks
+
+    def _add_tasks(request, *args):
+        snapshots.append((dict(installer.spec_status), request.installed_hashes))
+        return add_tasks(request, *args)
+
+    monkeypatch.setattr(installer, "_add_tasks", _add_tasks)
+    installer._init_queue()
+
+    assert len(reads) == 1
+    assert len(snapshots) == 3
+    for spec_status, installed_hashes in snapshots:
+        assert spec_status[dependency.dag_hash()].installed
+        assert dependency.dag_hash() in installed_hashes
+
+    # Tasks created later look up the install status again, since it changes
+    assert not installer.spec_status
+    assert all(request.installed_hashes is None for request in installer.build_requests)
+
+    # Shared dependencies have a single task
+    assert sorted(task.pkg.name for task in installer.build_tasks.values()) == sorted(
+        {s.name for r in installer.build_requests for s in r.spec.traverse()}
+    )
+
+
 def test_prepare_for_install_on_installed(install_mockery, monkeypatch):
     """Test of _prepare_for_install's early return for installed task path."""
     installer = create_installer(["dependent-install"], {})
@@ -1180,6 +1328,200 @@ def test_install_implicit(install_mockery, mock_fetch):
     assert not create_build_task(pkg).explicit
 
 
+def test_concurrent_packages_from_config(install_mockery, mutable_config):
+    """Test the maximum number of concurrent builds is taken from config by default."""
+    spack.config.set("config:concurrent_packages", 3)
+    assert create_installer(["pkg-a"]).max_active_tasks == 3
+    assert create_installer(["pkg-a"], {"concurrent_packages": 2}).max_active_tasks == 2
+
+
+def test_can_launch_task(install_mockery):
+    """Test tasks are launched only when a slot is free and they have no uninstalled deps."""
+    installer = create_installer(["dependent-install", "trivial-install-test-package"])
+    installer.max_active_tasks = 2
+    installer._init_queue()
+    assert installer._can_launch_task()
+
+    # Another priority 0 task can be launched while dependency-install is building
+    task = installer._pop_task()
+    installer.active_tasks[task.pkg_id] = task
+    assert installer._can_launch_task()
+
+    # Not when all the build slots are in use
+    installer.max_active_tasks = 1
+    assert not installer._can_launch_task()
+
+    # Nor when the next task depends on the active one
+    installer.max_active_tasks = 2
+    task = installer._pop_task()
+    assert task.pkg.name == "trivial-install-test-package"
+    assert not installer._can_launch_task()
+
+
+def test_tasks_ordered_by_critical_path(install_mockery, monkeypatch):
+    """Test ready tasks on the longest chain of builds are processed first."""
+    durations = {"dependency-install": 100.0, "dependent-install": 10.0}
+
+    def _duration(self, spec):
+        return durations.get(spec.name)
+
+    monkeypatch.setattr(spack.build_history.BuildHistory, "duration", _duration)
+    installer = create_installer(["trivial-install-test-package", "dependent-install"])
+    installer._init_queue()
+
+    tasks = {task.pkg.name: task for task in installer.build_tasks.values()}
+    assert tasks["dependent-install"].critical_path == 10.0
+    assert tasks["dependency-install"].critical_path == 110.0
+    # Never built packages take the average duration
+    assert tasks["trivial-install-test-package"].critical_path == 55.0
+
+    assert installer._pop_task().pkg.name == "dependency-install"
+    assert installer._pop_task().pkg.name == "trivial-install-test-package"
+
+
+def test_install_records_build_history(install_mockery, mock_fetch, monkeypatch):
+    """Test the duration of builds from sources is added to the history."""
+    recorded = []
+    monkeypatch.setattr(spack.build_history, "record_install", recorded.append)
+    installer = create_installer(["trivial-install-test-package"])
+    installer.install()
+    assert [pkg.name for pkg in recorded] == ["trivial-install-test-package"]
+
+
+def test_install_concurrent_packages(install_mockery, mock_fetch):
+    """Test installing independent packages with several builds in flight."""
+    installer = create_installer(
+        ["dependent-install", "trivial-install-test-package"], {"concurrent_packages": 2}
+    )
+    installer.install()
+
+    assert not installer.active_tasks
+    for request in installer.build_requests:
+        assert request.pkg_id in installer.installed
+        assert request.spec.installed
+
+
+@pytest.mark.not_on_windows("The make jobserver is not supported on Windows")
+def test_install_concurrent_packages_jobserver(install_mockery, mock_fetch, monkeypatch):
+    """Test concurrent builds share a jobserver that is removed after the install."""
+    monkeypatch.delenv("MAKEFLAGS", raising=False)
+    installer = create_installer(["pkg-a"], {"concurrent_packages": 2})
+
+    connections = []
+    create_jobserver = inst.PackageInstaller._create_jobserver
+
+    def _create_jobserver(self):
+        jobserver = create_jobserver(self)
+        connections.append(jobserver.connection)
+        return jobserver
+
+    monkeypatch.setattr(inst.PackageInstaller, "_create_jobserver", _create_jobserver)
+    installer.install()
+
+    fifo, _ = connections[0]
+    assert installer.build_requests[0].install_args["jobserver"] == connections[0]
+    assert not os.path.exists(fifo)
+
+
+def test_no_jobserver_without_concurrent_packages(install_mockery):
+    assert create_installer(["pkg-a"])._create_jobserver() is None
+
+
+def test_install_concurrent_packages_failure(install_mockery, mock_fetch, monkeypatch):
+    """Test the failure of a concurrent build is reported and skips its dependents."""
+    installer = create_installer(
+        ["dependent-install", "trivial-install-test-package"], {"concurrent_packages": 2}
+    )
+
+    complete = inst.BuildTask.complete
+
+    def _fail_dependency(self):
+        result = complete(self)
+        if self.pkg.name == "dependency-install":
+            raise MyBuildException("mock build failure for dependency-install")
+        return result
+
+    monkeypatch.setattr(inst.BuildTask, "complete", _fail_dependency)
+
+    with pytest.raises(spack.error.InstallError, match="Installation request failed"):
+        installer.install()
+
+    assert not installer.active_tasks
+    assert not any(pkg_id.startswith("dependent-install-") for pkg_id in installer.installed)
+
+
+@pytest.mark.not_on_windows("Cooperative installs fork processes")
+def test_cooperative_installers_share_the_work(install_mockery, mock_fetch, monkeypatch, tmpdir):
+    """Test several cooperative processes installing the same specs build each package once."""
+    specs = [
+        spack.spec.Spec(name).concretized()
+        for name in ["dependent-install", "trivial-install-test-package", "pkg-b", "pkg-c"]
+    ]
+    builds = str(tmpdir.join("builds"))
+    run = inst.BuildProcessInstaller.run
+
+    def _run(self):
+        # Builds are done in children of the installer processes
+        with open(builds, "a") as f:
+            f.write(f"{os.getppid()} {self.pkg.name}\n")
+        time.sleep(0.2)
+        return run(self)
+
+    monkeypatch.setattr(inst.BuildProcessInstaller, "run", _run)
+
+    def _install():
+        PackageInstaller([spec.package for spec in specs], cooperative=True).install()
+
+    ctx = multiprocessing.get_context("fork")
+    installers = [ctx.Process(target=_install) for _ in range(3)]
+    for installer in installers:
+        installer.start()
+    for installer in installers:
+        installer.join()
+
+    assert all(installer.exitcode == 0 for installer in installers)
+    assert all(spec.installed for spec in specs)
+
+    with open(builds) as f:
+        built = [line.split()[1] for line in f]
+    expected = {s.name for spec in specs for s in spec.traverse()}
+    assert sorted(built) == sorted(expected)
+
+    # The ledger is removed by the last installer
+    assert not os.path.exists(
+        os.path.join(spack.store.STORE.db.database_directory, "install_ledger.json")
+    )
+
+
+def test_cooperative_installer_defers_claimed_packages(install_mockery, mock_fetch, monkeypatch):
+    """Test a cooperative installer works on other packages while one is claimed elsewhere."""
+    installer = create_installer(["trivial-install-test-package", "pkg-c"], {"cooperative": True})
+    db = spack.store.STORE.db
+    other = spack.install_ledger.TaskLedger(db.database_directory)
+    other.owner = "other-host:1"
+    other.join()
+    claimed = installer.build_requests[0].spec
+    assert other.claim(claimed.dag_hash())
+
+    # Release the claim once the installer has nothing else to do
+    wait = inst.PackageInstaller._wait_for_ledger
+
+    deferred = []
+
+    def _wait_for_ledger(self, sentinels):
+        if self.deferred_tasks and other.claimed:
+            deferred.extend(self.deferred_tasks)
+            other.release([claimed.dag_hash()])
+            other.leave()
+        wait(self, sentinels)
+
+    monkeypatch.setattr(inst.PackageInstaller, "_wait_for_ledger", _wait_for_ledger)
+    installer.install()
+
+    assert deferred == [installer.build_requests[0].pkg_id]
+    assert all(request.spec.installed for request in installer.build_requests)
+
+
 def test_overwrite_install_backup_success(temporary_store, config, mock_packages, tmpdir):
     """
     When doing an overwrite install that fails, Spack should restore the backup
@@ -127,6 +127,14 @@ def test_pretty_seconds():
     assert llnl.util.lang.pretty_seconds(2.1 / 1000 / 1000 / 1000 / 10) == "0.210ns"
 
 
+@pytest.mark.parametrize(
+    "sec,result",
+    [(86400, "24h"), (3600, "1h"), (60, "1m"), (1.802, "1.80s"), (3723.456, "1h 2m 3.46s")],
+)
+def test_pretty_hms(sec, result):
+    assert llnl.util.lang.pretty_hms(sec) == result
+
+
 def test_match_predicate():
     matcher = match_predicate(lambda x: True)
     assert matcher("foo")
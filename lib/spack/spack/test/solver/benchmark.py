@@ -0,0 +1,122 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Tests for the benchmark of the concretizer"""
+import pytest
+
+import spack.solver.benchmark as benchmark
+import spack.spec
+
+
+def _results(samples, corpus=1):
+    return {
+        "benchmark": {
+            "corpus": corpus,
+            "cases": {
+                name: {"nodes": 1, "samples": {"total": values}}
+                for name, values in samples.items()
+            },
+        }
+    }
+
+
+@pytest.mark.parametrize(
+    "baseline,current,expected",
+    [
+        # Exact distribution, without ties
+        ([1, 2, 3], [4, 5, 6], 1 / 20),
+        ([1, 2, 3, 4, 5], [6, 7, 8, 9, 10], 1 / 252),
+        ([4, 5, 6], [1, 2, 3], 1.0),
+        ([1, 3, 5], [2, 4, 6], 7 / 20),
+        # Normal approximation, with ties
+        ([1, 1, 1], [1, 1, 1], 1.0),
+    ],
+)
+def test_mann_whitney_u(baseline, current, expected):
+    assert benchmark.mann_whitney_u(baseline, current) == pytest.approx(expected)
+
+
+def test_mann_whitney_u_with_ties_is_close_to_exact():
+    # The samples differ only by a tie, so the approximation should be close to 1 / 252
+    p_value = benchmark.mann_whitney_u([1, 2, 3, 4, 5], [5, 7, 8, 9, 10])
+    assert 0.001 < p_value < 0.02
+
+
+@pytest.mark.parametrize(
+    "current,status",
+    [
+        ([1.3, 1.31, 1.32, 1.33, 1.34], "regression"),
+        ([0.7, 0.71, 0.72, 0.73, 0.74], "improvement"),
+        # Significant, but below the threshold
+        ([1.05, 1.051, 1.052, 1.053, 1.054], ""),
+        # Above the threshold, but not significant
+        ([0.5, 1.01, 1.5, 1.6, 1.7], ""),
+    ],
+)
+def test_compare(current, status):
+    baseline = _results({"a": [1.0, 1.001, 1.002, 1.003, 1.004]})
+    (comparison,) = benchmark.compare(baseline, _results({"a": current}), threshold=0.1)
+    assert comparison.case == "a"
+    assert comparison.metric == "total"
+    assert comparison.status == status
+
+
+def test_compare_skips_cases_missing_from_the_baseline():
+    baseline = _results({"a": [1.0, 1.1]})
+    current = _results({"a": [1.0, 1.1], "b": [1.0, 1.1]})
+    assert [c.case for c in benchmark.compare(baseline, current)] == ["a"]
+
+
+def test_compare_different_corpus_versions():
+    with pytest.raises(benchmark.BenchmarkError, match="version 1 of the corpus"):
+        benchmark.compare(_results({}, corpus=1), _results({}, corpus=2))
+
+
+def test_default_corpus():
+    corpus = benchmark.load_corpus()
+    assert corpus.cases
+    assert {case.unify for case in corpus.cases} == {True, False, "when_possible"}
+    for case in corpus.cases:
+        for spec_str in case.specs:
+            spack.spec.Spec(spec_str)
+
+
+@pytest.mark.parametrize(
+    "content,error",
+    [
+        ("corpus:\n  cases: []\n", "invalid corpus"),
+        ("corpus:\n  version: 1\n  cases:\n  - name: a\n    unify: yes_please\n", "invalid"),
+        (
+            "corpus:\n  version: 1\n  cases:\n  - {name: a, specs: [zlib]}\n"
+            "  - {name: a, specs: [zlib]}\n",
+            "duplicate cases",
+        ),
+    ],
+)
+def test_invalid_corpus(tmp_path, content, error):
+    path = tmp_path / "corpus.yaml"
+    path.write_text(content)
+    with pytest.raises(benchmark.BenchmarkError, match=error):
+        benchmark.load_corpus(str(path))
+
+
+@pytest.mark.usefixtures("mutable_config", "mock_packages")
+@pytest.mark.parametrize("unify", [True, False, "when_possible"])
+def test_run_case(unify):
+    case = benchmark.Case(name="a", specs=["mpileaks ^mpich", "mpileaks ^zmpi"], unify=unify)
+    if unify is True:
+        case = case._replace(specs=["mpileaks"])
+
+    metrics = benchmark.run_case(case)
+
+    assert metrics["nodes"] > 0
+    assert all(metrics[phase] > 0 for phase in ("setup", "ground", "solve", "build"))
+    assert metrics["total"] >= sum(metrics[phase] for phase in benchmark.PHASES)
+
+
+@pytest.mark.usefixtures("mutable_config", "mock_packages")
+def test_run_case_that_cannot_be_concretized():
+    case = benchmark.Case(name="a", specs=["mpileaks ^not-a-real-package"])
+    with pytest.raises(benchmark.BenchmarkError, match="cannot concretize the case 'a'"):
+        benchmark.run_case(case)
@@ -0,0 +1,59 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Tests for the cache of the facts derived from package directives"""
+import pytest
+
+import spack.caches
+import spack.config
+import spack.spec
+import spack.util.file_cache
+from spack.solver import asp
+from spack.solver.core import fn
+from spack.solver.fact_cache import FactId, UncacheableFact, fact_template, render_facts
+
+
+def _setup(spec_str, *, cache):
+    """Return the facts of a solve, in a canonical order"""
+    with spack.config.override("concretizer:cache", cache):
+        problem = asp.SpackSolverSetup().setup([spack.spec.Spec(spec_str)], reuse=[])
+    return sorted(problem.splitlines())
+
+
+@pytest.mark.parametrize(
+    "spec_str",
+    [
+        "mpileaks",
+        "conditional-values-in-variant",
+        "variant-on-dependency-condition-root",
+        "singlevalue-variant-dependent-type",
+        "sticky-variant",
+    ],
+)
+def test_replayed_facts_are_the_same(
+    spec_str, mutable_config, mock_packages, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(spack.caches, "MISC_CACHE", spack.util.file_cache.FileCache(str(tmp_path)))
+    expected = _setup(spec_str, cache=False)
+
+    # The first setup records the facts, the second one replays them
+    assert _setup(spec_str, cache=True) == expected
+    assert any(tmp_path.glob("solver-facts/*/*.json"))
+    assert _setup(spec_str, cache=True) == expected
+
+
+def test_fact_templates():
+    template = fact_template(fn.pkg_fact("pkg-a", fn.condition_trigger(FactId(7), FactId(9))), 7)
+    assert list(render_facts([template], [10, 11, 12])) == [
+        'pkg_fact("pkg-a",condition_trigger(10,12)).\n'
+    ]
+
+    # Facts without ids are stored as text
+    assert fact_template(fn.pkg_fact("pkg-a", fn.namespace("builtin")), 0) == (
+        'pkg_fact("pkg-a",namespace("builtin")).\n'
+    )
+
+    # Strings looking like the placeholder of an id cannot be cached
+    with pytest.raises(UncacheableFact):
+        fact_template(fn.condition_reason(FactId(0), "__spack_fact_id_0"), 0)
@@ -0,0 +1,62 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Tests for the race of solver configurations"""
+import pytest
+
+import spack.config
+import spack.solver.asp
+import spack.spec
+from spack.solver.portfolio import DEFAULT_CONFIGURATION, SolverConfiguration, configurations
+
+pytestmark = pytest.mark.usefixtures("mutable_config", "mock_packages")
+
+
+@pytest.mark.parametrize(
+    "data,expected",
+    [
+        ({"name": "fast"}, SolverConfiguration(name="fast")),
+        (
+            {"configuration": "trendy", "opt_strategy": "bb,dec"},
+            SolverConfiguration(
+                name="configuration=trendy,opt_strategy=bb,dec",
+                configuration="trendy",
+                opt_strategy="bb,dec",
+            ),
+        ),
+        ({}, DEFAULT_CONFIGURATION),
+    ],
+)
+def test_solver_configuration_from_dict(data, expected):
+    assert configurations([data]) == [expected]
+
+
+@pytest.mark.parametrize(
+    "portfolio",
+    [
+        [{"name": "trendy", "configuration": "trendy"}],
+        [{"name": "default"}, {"name": "trendy", "configuration": "trendy", "heuristic": "Vsids"}],
+    ],
+)
+def test_portfolio_gives_the_same_answer(portfolio, capfd):
+    expected = spack.spec.Spec("mpileaks").concretized()
+    with spack.config.override("concretizer:portfolio", portfolio):
+        solver = spack.solver.asp.Solver()
+        result = solver.solve([spack.spec.Spec("mpileaks")])
+
+    assert result.specs[0].dag_hash() == expected.dag_hash()
+    # The winner of each race is reported only in verbose mode
+    assert "won the race" not in capfd.readouterr()[0]
+    names = [entry["name"] for entry in portfolio]
+    if len(names) > 1:
+        assert result.solver_configuration in names
+    else:
+        assert result.solver_configuration is None
+
+
+def test_portfolio_explains_unsatisfiable_problems():
+    portfolio = [{"name": "default"}, {"name": "crafty", "configuration": "crafty"}]
+    with spack.config.override("concretizer:portfolio", portfolio):
+        with pytest.raises(spack.solver.asp.UnsatisfiableSpecError):
+            spack.solver.asp.Solver().solve([spack.spec.Spec("mpileaks ^mpich@10.0")])
@@ -0,0 +1,115 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Tests for the profile of a solve"""
+import json
+
+import pytest
+
+import spack.solver.asp
+import spack.spec
+from spack.main import SpackCommand
+from spack.solver.profile import NO_PACKAGE, SetupProfiler, fact_category
+
+pytestmark = pytest.mark.usefixtures("mutable_config", "mock_packages")
+
+solve = SpackCommand("solve")
+
+
+@pytest.mark.parametrize(
+    "name,expected",
+    [
+        ("version_declared", "versions"),
+        ("variant_possible_value", "variants"),
+        ("condition_requirement", "conditions"),
+        ("variant_condition", "conditions"),
+        ("installed_hash", "reuse"),
+        ("target_weight", "targets"),
+        ("possible_provider", "virtuals"),
+        ("dependency_holds", "dependencies"),
+        ("literal", "other"),
+    ],
+)
+def test_fact_category(name, expected):
+    assert fact_category(name) == expected
+
+
+def test_setup_profiler_attributes_facts_to_packages_and_sections():
+    builder = spack.solver.asp._ProfilingBuilder()
+    builder.fact('literal(0,"root","zlib")')
+    builder.h1("Package Constraints")
+    builder.h2("Package rules: zlib")
+    builder.fact('pkg_fact("zlib",version_declared("1.2.13",0))')
+    builder.fact('pkg_fact("zlib",condition(1))')
+    builder.fact('condition_requirement(1,"node","zlib")')
+    builder.h2("Package rules: cmake")
+    builder.fact('pkg_fact("cmake",variant_default_value_from_package_py("doc","False"))')
+    builder.h1("Target Constraints")
+    builder.fact('target("x86_64")')
+    builder.value()
+
+    result = builder.profiler.profile(builder.asp_problem)
+
+    assert result["facts"] == 6
+    assert [(s["name"], s["facts"]) for s in result["sections"]] == [
+        (NO_PACKAGE, 1),
+        ("Package Constraints", 4),
+        ("Target Constraints", 1),
+    ]
+    assert result["packages"]["zlib"]["facts"] == 3
+    assert result["packages"]["zlib"]["categories"] == {"versions": 1, "conditions": 2}
+    assert result["packages"]["cmake"]["categories"] == {"variants": 1}
+    assert result["categories"]["targets"] == 1
+    assert result["categories"]["other"] == 1
+
+
+def test_setup_profiler_ignores_comments_and_rules():
+    profiler = SetupProfiler()
+    profiler.stop()
+    result = profiler.profile(["% comment\n", "\n", '{ attr("node",node(0,"a")) }.\n'])
+    assert result["facts"] == 0
+
+
+def test_solve_with_profile():
+    result = spack.solver.asp.Solver().solve([spack.spec.Spec("mpileaks")], profile=True)
+
+    profile = result.profile
+    assert profile["specs"] == ["mpileaks"]
+    assert {p["name"] for p in profile["phases"]} >= {"setup", "ground", "solve"}
+    assert "mpileaks" in profile["setup"]["packages"]
+    assert profile["ground"]["atoms"] > 0
+    assert profile["ground"]["packages"]["mpileaks"] > 0
+    assert profile["program"]["rules"] > 0
+
+
+def test_solve_without_profile():
+    result = spack.solver.asp.Solver().solve([spack.spec.Spec("mpileaks")])
+    assert result.profile is None
+
+
+def test_solve_command_writes_profile(tmp_path):
+    path = tmp_path / "profile.json"
+    solve("--profile", str(path), "mpileaks")
+    data = json.loads(path.read_text())
+    assert len(data["solves"]) == 1
+    assert data["solves"][0]["specs"] == ["mpileaks"]
+
+
+def test_solve_command_writes_profile_of_unsatisfiable_solve(tmp_path):
+    path = tmp_path / "profile.json"
+    solve("--profile", str(path), "quantum-espresso^fftw@1.1:", fail_on_error=False)
+    assert solve.returncode != 0
+    data = json.loads(path.read_text())
+    assert len(data["solves"]) == 1
+    assert data["solves"][0]["specs"] == ["quantum-espresso ^fftw@1.1:"]
+    assert data["solves"][0]["ground"]["atoms"] > 0
+
+
+def test_solve_command_writes_profile_of_setup(tmp_path):
+    path = tmp_path / "profile.json"
+    solve("--profile", str(path), "--show", "asp", "mpileaks")
+    data = json.loads(path.read_text())
+    assert len(data["solves"]) == 1
+    assert {p["name"] for p in data["solves"][0]["phases"]} == {"setup"}
+    assert "mpileaks" in data["solves"][0]["setup"]["packages"]
@@ -0,0 +1,113 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Tests for the cache of concretization results"""
+import pytest
+
+import spack.caches
+import spack.config
+import spack.repo
+import spack.solver.fact_cache
+import spack.solver.result_cache
+import spack.spec
+import spack.util.file_cache
+from spack.solver import asp
+
+
+@pytest.fixture()
+def cached_solves(mutable_config, mock_packages, tmp_path, monkeypatch):
+    """Enable the cache of concretization results, and make solving fail afterwards"""
+    monkeypatch.setattr(spack.caches, "MISC_CACHE", spack.util.file_cache.FileCache(str(tmp_path)))
+    spack.config.set("concretizer:cache", True)
+    spack.config.set("concretizer:reuse", False)
+
+    def _no_solve(*args, **kwargs):
+        raise AssertionError("the solver was not expected to run")
+
+    def _disable_solver():
+        monkeypatch.setattr(asp.PyclingoDriver, "solve", _no_solve)
+
+    return _disable_solver
+
+
+@pytest.mark.parametrize("spec_str", ["mpileaks", "mpi", "pkg-a ^pkg-b@1.0"])
+def test_solve_results_are_cached(cached_solves, spec_str):
+    expected = spack.spec.Spec(spec_str).concretized()
+
+    cached_solves()
+    assert spack.spec.Spec(spec_str).concretized().dag_hash() == expected.dag_hash()
+
+    result = asp.Solver().solve([spack.spec.Spec(spec_str)])
+    assert [s.dag_hash() for s in result.specs] == [expected.dag_hash()]
+    assert result.criteria and result.nmodels
+
+
+def test_cached_results_keep_test_dependencies(cached_solves):
+    spack.spec.Spec("pkg-a").concretized(tests=True)
+
+    cached_solves()
+    s = spack.spec.Spec("pkg-a").concretized(tests=True)
+    assert s.dependencies(deptype="test")
+
+
+def test_inspected_solves_are_not_cached(cached_solves):
+    spack.spec.Spec("pkg-a").concretized()
+
+    cached_solves()
+    with pytest.raises(AssertionError, match="not expected to run"):
+        asp.Solver().solve([spack.spec.Spec("pkg-a")], timers=True)
+
+
+def test_cached_results_depend_on_configuration(cached_solves):
+    spack.spec.Spec("pkg-a").concretized()
+    spack.config.set("packages:pkg-a", {"variants": "~bvv"})
+
+    cached_solves()
+    with pytest.raises(AssertionError, match="not expected to run"):
+        spack.spec.Spec("pkg-a").concretized()
+
+
+def test_solve_key(mutable_config, mock_packages):
+    specs = [spack.spec.Spec("pkg-a")]
+    possible = ["pkg-a", "pkg-b"]
+
+    def _key(specs=specs, reusable=[], possible=possible, tests=False):
+        return spack.solver.result_cache.solve_key(
+            specs, reusable, possible, tests, False, libcs=[]
+        )
+
+    key = _key()
+    assert _key() == key
+    assert _key(specs=[spack.spec.Spec("pkg-a~bvv")]) != key
+    assert _key(specs=[spack.spec.Spec("pkg-a os=debian6")]) != key
+    assert _key(possible=["pkg-a", "pkg-c"]) != key
+    assert _key(reusable=[spack.spec.Spec("pkg-b").concretized()]) != key
+    assert _key(tests=True) != key
+
+
+@pytest.mark.parametrize(
+    "module,function,value",
+    [
+        # Base classes are hashed together with the package class
+        ("fact_cache", "package_hash", "modified"),
+        # Patches applied to dependencies are hashed with the package that applies them
+        ("result_cache", "_patch_checksums", ["0" * 64]),
+    ],
+)
+def test_solve_key_depends_on_package_sources(
+    module, function, value, mutable_config, mock_packages, monkeypatch
+):
+    def _key():
+        possible = ["patch-several-dependencies"]
+        return spack.solver.result_cache.solve_key([], [], possible, False, False, libcs=[])
+
+    key = _key()
+    monkeypatch.setattr(getattr(spack.solver, module), function, lambda pkg_cls: value)
+    assert _key() != key
+
+
+def test_patch_checksums(mock_packages):
+    pkg_cls = spack.repo.PATH.get_pkg_class("patch-several-dependencies")
+    checksums = spack.solver.result_cache._patch_checksums(pkg_cls)
+    assert checksums and checksums == sorted(checksums)
@@ -0,0 +1,73 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Tests for solves stopped by the concretizer timeout"""
+import pytest
+
+import llnl.util.tty as tty
+
+import spack.config
+import spack.solver.asp
+import spack.spec
+from spack.solver.core import clingo, solve_with_timeout
+
+pytestmark = pytest.mark.usefixtures("mutable_config", "mock_packages")
+
+
+class _InterruptedResult:
+    """Result of a solve that was stopped by the timeout"""
+
+    def __init__(self, satisfiable):
+        self.satisfiable = satisfiable
+        self.interrupted = True
+
+
+def _interrupted_solve(satisfiable):
+    """Solve normally, but report that the search was stopped by the timeout"""
+
+    def _solve(control, timeout, **kwargs):
+        result = solve_with_timeout(control, None, **kwargs)
+        return _InterruptedResult(result.satisfiable if satisfiable else None)
+
+    return _solve
+
+
+def test_solve_with_timeout_is_optimal_when_done_in_time():
+    control = clingo().Control()
+    control.add("base", [], "{ a(1..5) }. :- not a(3). #minimize { X : a(X) }.")
+    control.ground([("base", [])])
+    models = []
+    result = solve_with_timeout(
+        control, 60, on_model=lambda m: models.append(m.symbols(shown=True))
+    )
+    assert result.satisfiable and not result.interrupted
+    assert [str(s) for s in models[-1]] == ["a(3)"]
+
+
+def test_interrupted_solve_is_flagged_as_not_optimal(monkeypatch):
+    monkeypatch.setattr(spack.solver.asp, "solve_with_timeout", _interrupted_solve(True))
+    warnings = []
+    monkeypatch.setattr(tty, "warn", lambda msg, *args, **kwargs: warnings.append(msg))
+    spack.config.set("concretizer:timeout", 5)
+
+    result = spack.solver.asp.Solver().solve([spack.spec.Spec("mpileaks")])
+
+    assert result.optimal is False
+    assert result.specs[0].satisfies("mpileaks")
+    assert len(warnings) == 1
+    assert "might not be optimal" in warnings[0]
+    assert all(name in warnings[0] for _, _, name in result.criteria)
+
+
+def test_optimal_solve():
+    spack.config.set("concretizer:timeout", 60)
+    result = spack.solver.asp.Solver().solve([spack.spec.Spec("mpileaks")])
+    assert result.optimal is True
+
+
+def test_timeout_before_any_solution(monkeypatch):
+    monkeypatch.setattr(spack.solver.asp, "solve_with_timeout", _interrupted_solve(False))
+    spack.config.set("concretizer:timeout", 5)
+    with pytest.raises(spack.solver.asp.SolverTimeoutError):
+        spack.solver.asp.Solver().solve([spack.spec.Spec("mpileaks")])
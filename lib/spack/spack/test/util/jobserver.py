@@ -0,0 +1,61 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import os
+import stat
+
+import pytest
+
+import spack.build_environment
+import spack.util.jobserver as jobserver
+
+pytestmark = pytest.mark.not_on_windows("The make jobserver is not supported on Windows")
+
+
+def _read_tokens(fd):
+    os.set_blocking(fd, False)
+    try:
+        return os.read(fd, 1024)
+    except BlockingIOError:
+        return b""
+    finally:
+        os.set_blocking(fd, True)
+
+
+@pytest.mark.parametrize("num_jobs", [1, 4])
+def test_jobserver_tokens(num_jobs):
+    """Tests the jobserver holds one token less than the number of jobs"""
+    with jobserver.JobServer(num_jobs) as js:
+        assert stat.S_ISFIFO(os.stat(js.fifo).st_mode)
+        assert js.connection == (js.fifo, num_jobs)
+        assert _read_tokens(js.fd) == jobserver.TOKEN * (num_jobs - 1)
+
+
+def test_jobserver_close():
+    """Tests closing the jobserver removes the named pipe"""
+    js = jobserver.JobServer(2)
+    js.close()
+    assert not os.path.exists(js.fifo)
+
+    # Closing twice is fine
+    js.close()
+
+
+def test_jobserver_needs_a_job_slot():
+    with pytest.raises(ValueError, match="at least one job slot"):
+        jobserver.JobServer(0)
+
+
+def test_jobserver_attach(working_env):
+    """Tests attaching to a jobserver sets MAKEFLAGS and shares the tokens"""
+    with jobserver.JobServer(3) as js:
+        fd = jobserver.attach(*js.connection)
+        try:
+            assert os.get_inheritable(fd)
+            assert os.environ["MAKEFLAGS"] == f"-j3 --jobserver-auth={fd},{fd}"
+            assert spack.build_environment.jobserver_enabled()
+            assert _read_tokens(fd) == jobserver.TOKEN * 2
+        finally:
+            os.close(fd)
@@ -0,0 +1,60 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import json
+import multiprocessing
+
+import pytest
+
+import spack.util.trace as trace
+
+
+@pytest.fixture()
+def trace_file(tmp_path):
+    path = tmp_path / "trace.json"
+    trace.enable(str(path))
+    yield path
+    trace.finish()
+
+
+def _child_span():
+    with trace.span("child", "test"):
+        pass
+
+
+def test_spans_are_written_to_the_trace(trace_file):
+    with trace.span("outer", "test", answer=42):
+        with trace.track(3):
+            with trace.span("inner", "test"):
+                pass
+
+    inner, outer = (json.loads(line.rstrip(",\n")) for line in trace_file.open().readlines()[1:])
+    assert outer["name"] == "outer" and outer["tid"] == 0 and outer["args"] == {"answer": 42}
+    assert inner["name"] == "inner" and inner["tid"] == 3
+    assert outer["ts"] <= inner["ts"] and inner["dur"] <= outer["dur"]
+
+
+@pytest.mark.not_on_windows("Uses the fork start method")
+def test_child_processes_write_to_the_same_trace(trace_file):
+    with trace.track(1):
+        process = multiprocessing.get_context("fork").Process(target=_child_span)
+        process.start()
+        process.join()
+    trace.name_track(1, "child track")
+    trace.finish()
+
+    with open(trace_file) as f:
+        events = json.load(f)["traceEvents"]
+    child = next(e for e in events if e["name"] == "child")
+    assert child["tid"] == 1 and child["ph"] == "X"
+    names = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert names == {0: "spack", 1: "child track"}
+
+
+def test_disabled_trace_is_a_no_op(tmp_path):
+    assert not trace.enabled()
+    with trace.span("nothing", "test"):
+        trace.complete("nothing", "test", 0.0, 1.0)
+    assert not list(tmp_path.iterdir())
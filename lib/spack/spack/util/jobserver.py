@@ -0,0 +1,88 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""GNU make jobserver shared by the package builds of a Spack process.
+
+A jobserver is a pipe holding job tokens: a make process reads a token before starting
+an additional job, and writes it back once the job is done. When the same jobserver is
+handed to every build, the total number of jobs across concurrent builds is bounded by
+the number of tokens, instead of each build running its own ``make -j<n>``.
+
+The jobserver is implemented with a named pipe, so that build processes can attach to
+it by path regardless of how they were started.
+"""
+import os
+import shutil
+import tempfile
+from typing import Optional, Tuple
+
+#: Character used for job tokens (any character works for GNU make)
+TOKEN = b"+"
+
+
+class JobServer:
+    """A jobserver with a given number of job slots, backed by a named pipe.
+
+    Every make process has an implicit job slot, so the pipe holds one token less than
+    the number of jobs.
+    """
+
+    def __init__(self, num_jobs: int) -> None:
+        if num_jobs < 1:
+            raise ValueError(f"a jobserver needs at least one job slot, got {num_jobs}")
+
+        self.num_jobs = num_jobs
+        self.tmpdir: Optional[str] = tempfile.mkdtemp(prefix="spack-jobserver-")
+        self.fifo = os.path.join(self.tmpdir, "jobserver")
+        os.mkfifo(self.fifo, 0o600)
+
+        # Keep the pipe open for reading and writing, so that opening it does not block and
+        # tokens are retained while no build is attached to the jobserver.
+        self.fd: Optional[int] = os.open(self.fifo, os.O_RDWR)
+        os.write(self.fd, TOKEN * (num_jobs - 1))
+
+    @property
+    def connection(self) -> Tuple[str, int]:
+        """Arguments to ``attach()`` that are needed to use this jobserver in a build"""
+        return self.fifo, self.num_jobs
+
+    def close(self) -> None:
+        """Close the pipe and remove it from the file system."""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        if self.tmpdir is not None:
+            shutil.rmtree(self.tmpdir, ignore_errors=True)
+            self.tmpdir = None
+
+    def __enter__(self) -> "JobServer":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def makeflags(fd: int, num_jobs: int) -> str:
+    """Value of MAKEFLAGS for make processes that use the jobserver open at ``fd``."""
+    return f"-j{num_jobs} --jobserver-auth={fd},{fd}"
+
+
+def attach(fifo: str, num_jobs: int) -> int:
+    """Attach the current process to a jobserver created by another process.
+
+    The named pipe is opened as an inheritable file descriptor, and ``MAKEFLAGS`` is set
+    so that make processes started from here use the jobserver.
+
+    Args:
+        fifo: path to the named pipe of the jobserver
+        num_jobs: number of job slots of the jobserver
+
+    Returns:
+        The file descriptor of the jobserver in the current process
+    """
+    fd = os.open(fifo, os.O_RDWR)
+    os.set_inheritable(fd, True)
+    os.environ["MAKEFLAGS"] = makeflags(fd, num_jobs)
+    return fd
@@ -334,7 +334,10 @@ def package_ast(spec, filter_multimethods=True, source=None):
             AST if they are known statically to be unused. Supply False to disable.
         source (str): Optionally provide a string to read python code from.
     """
-    spec = spack.spec.Spec(spec)
+    # The spec is only read, so a Spec is not copied: copying the whole DAG for each
+    # node would make hashing a DAG quadratic in its size
+    if not isinstance(spec, spack.spec.Spec):
+        spec = spack.spec.Spec(spec)
 
     if source is None:
         filename = spack.repo.PATH.filename_for_package_name(spec.name)
@@ -0,0 +1,162 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""Timeline of the operations done by Spack, in the Chrome trace event format.
+
+Spans are appended to a single trace file by the process that enabled tracing and by
+its child processes (e.g. package builds), so that the whole timeline of an install can
+be inspected with ``chrome://tracing`` or https://ui.perfetto.dev.
+
+While Spack runs, the file is a JSON array that is never closed, which both viewers
+accept, so that the trace of an interrupted run can still be read. ``finish()`` rewrites
+it as a JSON object with a ``traceEvents`` list.
+
+Every span belongs to a track, shown as a thread in the viewers. Track 0 is the main
+Spack process; the installer uses one track per concurrent build slot.
+"""
+import contextlib
+import json
+import os
+import time
+from typing import Any, Dict, Generator, List, Optional
+
+#: Process id used for all the events, so that all tracks are shown together
+TRACE_PID = 1
+
+
+class Trace:
+    """A trace file that events are appended to."""
+
+    def __init__(self, path: str) -> None:
+        self.path = os.path.abspath(path)
+        #: Process that owns the trace, and finishes it
+        self.owner = os.getpid()
+        #: Names of the tracks
+        self.tracks: Dict[int, str] = {0: "spack"}
+
+    def create(self) -> None:
+        with open(self.path, "w") as f:
+            f.write("[\n")
+
+    def write(self, event: Dict[str, Any]) -> None:
+        # Each event is written with a single call to a file opened for appending, so
+        # that events of concurrent processes are not interleaved.
+        with open(self.path, "a") as f:
+            f.write(json.dumps(event, separators=(",", ":")) + ",\n")
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Return the events written so far."""
+        events = []
+        with open(self.path, "r") as f:
+            for line in f:
+                line = line.strip().rstrip(",")
+                if line.startswith("{"):
+                    events.append(json.loads(line))
+        return events
+
+    def finish(self) -> None:
+        """Write the trace as a JSON object, with the names of the tracks."""
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": TRACE_PID, "tid": tid, "args": {"name": n}}
+            for tid, n in sorted(self.tracks.items())
+        ]
+        events = metadata + self.events()
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        os.replace(tmp, self.path)
+
+
+#: Trace being written, or None if tracing is disabled
+_TRACE: Optional[Trace] = None
+
+#: Track of the spans emitted by this process
+_TRACK = 0
+
+
+def enable(path: str) -> None:
+    """Start writing a new trace to ``path``."""
+    global _TRACE
+    _TRACE = Trace(path)
+    _TRACE.create()
+
+
+def enabled() -> bool:
+    return _TRACE is not None
+
+
+def finish() -> None:
+    """Stop tracing. The owner of the trace writes it in its final form."""
+    global _TRACE
+    trace, _TRACE = _TRACE, None
+    if trace is not None and trace.owner == os.getpid():
+        trace.finish()
+
+
+def state() -> Any:
+    """State of the tracing, to be restored in processes that don't inherit it"""
+    return _TRACE, _TRACK
+
+
+def restore(trace_state: Any) -> None:
+    global _TRACE, _TRACK
+    _TRACE, _TRACK = trace_state
+
+
+def now() -> float:
+    """Current time, in microseconds, as used by the events"""
+    return time.time() * 1e6
+
+
+def name_track(track: int, name: str) -> None:
+    """Give a name to a track."""
+    if _TRACE is not None:
+        _TRACE.tracks[track] = name
+
+
+@contextlib.contextmanager
+def track(tid: int) -> Generator[None, None, None]:
+    """Context manager emitting spans, in this process and in child processes started
+    within it, on the given track."""
+    global _TRACK
+    previous, _TRACK = _TRACK, tid
+    try:
+        yield
+    finally:
+        _TRACK = previous
+
+
+def complete(
+    name: str, category: str, start: float, end: float, *, tid: Optional[int] = None, **args
+) -> None:
+    """Emit a span with given start and end times, in microseconds."""
+    if _TRACE is None:
+        return
+    _TRACE.write(
+        {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start,
+            "dur": end - start,
+            "pid": TRACE_PID,
+            "tid": _TRACK if tid is None else tid,
+            "args": args,
+        }
+    )
+
+
+@contextlib.contextmanager
+def span(name: str, category: str, **args) -> Generator[None, None, None]:
+    """Context manager emitting a span for the code it wraps, on the current track."""
+    if _TRACE is None:
+        yield
+        return
+
+    start = now()
+    try:
+        yield
+    finally:
+        complete(name, category, start, now(), **args)
@@ -403,6 +403,7 @@ complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a mark -d 'mark pac
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a mirror -d 'manage mirrors (source and binary)'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a module -d 'generate/manage module files'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a patch -d 'patch expanded archive sources in preparation for install'
+complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a perf -d 'measure the performance of Spack'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a pkg -d 'query packages associated with particular git revisions'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a providers -d 'list packages that provide a particular virtual package'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a pydoc -d 'run pydoc from within spack'
@@ -664,7 +665,7 @@ complete -c spack -n '__fish_spack_using_command bootstrap mirror' -l dev -f -a
 complete -c spack -n '__fish_spack_using_command bootstrap mirror' -l dev -d 'download dev dependencies too'
 
 # spack build-env
-set -g __fish_spack_optspecs_spack_build_env h/help clean dirty U/fresh reuse fresh-roots deprecated dump= pickle=
+set -g __fish_spack_optspecs_spack_build_env h/help clean dirty U/fresh reuse fresh-roots deprecated solve-timeout= explain no-explain dump= pickle=
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 build-env' -f -a '(__fish_spack_build_env_spec)'
 complete -c spack -n '__fish_spack_using_command build-env' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command build-env' -s h -l help -d 'show this help message and exit'
@@ -680,6 +681,12 @@ complete -c spack -n '__fish_spack_using_command build-env' -l fresh-roots -l re
 complete -c spack -n '__fish_spack_using_command build-env' -l fresh-roots -l reuse-deps -d 'concretize with fresh roots and reused dependencies'
 complete -c spack -n '__fish_spack_using_command build-env' -l deprecated -f -a config_deprecated
 complete -c spack -n '__fish_spack_using_command build-env' -l deprecated -d 'allow concretizer to select deprecated versions'
+complete -c spack -n '__fish_spack_using_command build-env' -l solve-timeout -r -f -a concretizer_timeout
+complete -c spack -n '__fish_spack_using_command build-env' -l solve-timeout -r -d 'stop optimizing after SECONDS and use the best solution found so far'
+complete -c spack -n '__fish_spack_using_command build-env' -l explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command build-env' -l explain -d 'explain why specs cannot be concretized, with the causes of each error'
+complete -c spack -n '__fish_spack_using_command build-env' -l no-explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command build-env' -l no-explain -d 'report only the errors when specs cannot be concretized, which is faster'
 complete -c spack -n '__fish_spack_using_command build-env' -l dump -r -f -a dump
 complete -c spack -n '__fish_spack_using_command build-env' -l dump -r -d 'dump a source-able environment to FILE'
 complete -c spack -n '__fish_spack_using_command build-env' -l pickle -r -f -a pickle
@@ -1129,7 +1136,7 @@ complete -c spack -n '__fish_spack_using_command compilers' -l scope -r -f -a '_
 complete -c spack -n '__fish_spack_using_command compilers' -l scope -r -d 'configuration scope to read/modify'
 
 # spack concretize
-set -g __fish_spack_optspecs_spack_concretize h/help f/force test= q/quiet U/fresh reuse fresh-roots deprecated j/jobs=
+set -g __fish_spack_optspecs_spack_concretize h/help f/force test= q/quiet U/fresh reuse fresh-roots deprecated solve-timeout= explain no-explain j/jobs=
 complete -c spack -n '__fish_spack_using_command concretize' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command concretize' -s h -l help -d 'show this help message and exit'
 complete -c spack -n '__fish_spack_using_command concretize' -s f -l force -f -a force
@@ -1146,11 +1153,17 @@ complete -c spack -n '__fish_spack_using_command concretize' -l fresh-roots -l r
 complete -c spack -n '__fish_spack_using_command concretize' -l fresh-roots -l reuse-deps -d 'concretize with fresh roots and reused dependencies'
 complete -c spack -n '__fish_spack_using_command concretize' -l deprecated -f -a config_deprecated
 complete -c spack -n '__fish_spack_using_command concretize' -l deprecated -d 'allow concretizer to select deprecated versions'
+complete -c spack -n '__fish_spack_using_command concretize' -l solve-timeout -r -f -a concretizer_timeout
+complete -c spack -n '__fish_spack_using_command concretize' -l solve-timeout -r -d 'stop optimizing after SECONDS and use the best solution found so far'
+complete -c spack -n '__fish_spack_using_command concretize' -l explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command concretize' -l explain -d 'explain why specs cannot be concretized, with the causes of each error'
+complete -c spack -n '__fish_spack_using_command concretize' -l no-explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command concretize' -l no-explain -d 'report only the errors when specs cannot be concretized, which is faster'
 complete -c spack -n '__fish_spack_using_command concretize' -s j -l jobs -r -f -a jobs
 complete -c spack -n '__fish_spack_using_command concretize' -s j -l jobs -r -d 'explicitly set number of parallel jobs'
 
 # spack concretise
-set -g __fish_spack_optspecs_spack_concretise h/help f/force test= q/quiet U/fresh reuse fresh-roots deprecated j/jobs=
+set -g __fish_spack_optspecs_spack_concretise h/help f/force test= q/quiet U/fresh reuse fresh-roots deprecated solve-timeout= explain no-explain j/jobs=
 complete -c spack -n '__fish_spack_using_command concretise' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command concretise' -s h -l help -d 'show this help message and exit'
 complete -c spack -n '__fish_spack_using_command concretise' -s f -l force -f -a force
@@ -1167,6 +1180,12 @@ complete -c spack -n '__fish_spack_using_command concretise' -l fresh-roots -l r
 complete -c spack -n '__fish_spack_using_command concretise' -l fresh-roots -l reuse-deps -d 'concretize with fresh roots and reused dependencies'
 complete -c spack -n '__fish_spack_using_command concretise' -l deprecated -f -a config_deprecated
 complete -c spack -n '__fish_spack_using_command concretise' -l deprecated -d 'allow concretizer to select deprecated versions'
+complete -c spack -n '__fish_spack_using_command concretise' -l solve-timeout -r -f -a concretizer_timeout
+complete -c spack -n '__fish_spack_using_command concretise' -l solve-timeout -r -d 'stop optimizing after SECONDS and use the best solution found so far'
+complete -c spack -n '__fish_spack_using_command concretise' -l explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command concretise' -l explain -d 'explain why specs cannot be concretized, with the causes of each error'
+complete -c spack -n '__fish_spack_using_command concretise' -l no-explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command concretise' -l no-explain -d 'report only the errors when specs cannot be concretized, which is faster'
 complete -c spack -n '__fish_spack_using_command concretise' -s j -l jobs -r -f -a jobs
 complete -c spack -n '__fish_spack_using_command concretise' -s j -l jobs -r -d 'explicitly set number of parallel jobs'
 
@@ -1376,7 +1395,7 @@ complete -c spack -n '__fish_spack_using_command deprecate' -s l -l link-type -r
 complete -c spack -n '__fish_spack_using_command deprecate' -s l -l link-type -r -d '(deprecated)'
 
 # spack dev-build
-set -g __fish_spack_optspecs_spack_dev_build h/help j/jobs= n/no-checksum d/source-path= i/ignore-dependencies keep-prefix skip-patch q/quiet drop-in= test= b/before= u/until= clean dirty U/fresh reuse fresh-roots deprecated
+set -g __fish_spack_optspecs_spack_dev_build h/help j/jobs= n/no-checksum d/source-path= i/ignore-dependencies keep-prefix skip-patch q/quiet drop-in= test= b/before= u/until= clean dirty U/fresh reuse fresh-roots deprecated solve-timeout= explain no-explain
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 dev-build' -f -k -a '(__fish_spack_specs)'
 complete -c spack -n '__fish_spack_using_command dev-build' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command dev-build' -s h -l help -d 'show this help message and exit'
@@ -1414,6 +1433,12 @@ complete -c spack -n '__fish_spack_using_command dev-build' -l fresh-roots -l re
 complete -c spack -n '__fish_spack_using_command dev-build' -l fresh-roots -l reuse-deps -d 'concretize with fresh roots and reused dependencies'
 complete -c spack -n '__fish_spack_using_command dev-build' -l deprecated -f -a config_deprecated
 complete -c spack -n '__fish_spack_using_command dev-build' -l deprecated -d 'allow concretizer to select deprecated versions'
+complete -c spack -n '__fish_spack_using_command dev-build' -l solve-timeout -r -f -a concretizer_timeout
+complete -c spack -n '__fish_spack_using_command dev-build' -l solve-timeout -r -d 'stop optimizing after SECONDS and use the best solution found so far'
+complete -c spack -n '__fish_spack_using_command dev-build' -l explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command dev-build' -l explain -d 'explain why specs cannot be concretized, with the causes of each error'
+complete -c spack -n '__fish_spack_using_command dev-build' -l no-explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command dev-build' -l no-explain -d 'report only the errors when specs cannot be concretized, which is faster'
 
 # spack develop
 set -g __fish_spack_optspecs_spack_develop h/help p/path= b/build-directory= no-clone clone f/force=
@@ -1734,7 +1759,7 @@ complete -c spack -n '__fish_spack_using_command external read-cray-manifest' -l
 complete -c spack -n '__fish_spack_using_command external read-cray-manifest' -l fail-on-error -d 'if a manifest file cannot be parsed, fail and report the full stack trace'
 
 # spack fetch
-set -g __fish_spack_optspecs_spack_fetch h/help n/no-checksum m/missing D/dependencies U/fresh reuse fresh-roots deprecated
+set -g __fish_spack_optspecs_spack_fetch h/help n/no-checksum m/missing D/dependencies U/fresh reuse fresh-roots deprecated solve-timeout= explain no-explain
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 fetch' -f -k -a '(__fish_spack_specs)'
 complete -c spack -n '__fish_spack_using_command fetch' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command fetch' -s h -l help -d 'show this help message and exit'
@@ -1752,6 +1777,12 @@ complete -c spack -n '__fish_spack_using_command fetch' -l fresh-roots -l reuse-
 complete -c spack -n '__fish_spack_using_command fetch' -l fresh-roots -l reuse-deps -d 'concretize with fresh roots and reused dependencies'
 complete -c spack -n '__fish_spack_using_command fetch' -l deprecated -f -a config_deprecated
 complete -c spack -n '__fish_spack_using_command fetch' -l deprecated -d 'allow concretizer to select deprecated versions'
+complete -c spack -n '__fish_spack_using_command fetch' -l solve-timeout -r -f -a concretizer_timeout
+complete -c spack -n '__fish_spack_using_command fetch' -l solve-timeout -r -d 'stop optimizing after SECONDS and use the best solution found so far'
+complete -c spack -n '__fish_spack_using_command fetch' -l explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command fetch' -l explain -d 'explain why specs cannot be concretized, with the causes of each error'
+complete -c spack -n '__fish_spack_using_command fetch' -l no-explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command fetch' -l no-explain -d 'report only the errors when specs cannot be concretized, which is faster'
 
 # spack find
 set -g __fish_spack_optspecs_spack_find h/help format= H/hashes json I/install-status d/deps p/paths groups no-groups l/long L/very-long t/tag= N/namespaces r/only-roots c/show-concretized f/show-flags show-full-compiler x/explicit X/implicit u/unknown m/missing v/variants loaded M/only-missing deprecated only-deprecated install-tree= start-date= end-date=
@@ -1985,7 +2016,7 @@ complete -c spack -n '__fish_spack_using_command info' -l variants-by-name -f -a
 complete -c spack -n '__fish_spack_using_command info' -l variants-by-name -d 'list variants in strict name order; don'"'"'t group by condition'
 
 # spack install
-set -g __fish_spack_optspecs_spack_install h/help only= u/until= j/jobs= overwrite fail-fast keep-prefix keep-stage dont-restage use-cache no-cache cache-only use-buildcache= include-build-deps no-check-signature show-log-on-error source n/no-checksum v/verbose fake only-concrete add no-add f/file= clean dirty test= log-format= log-file= help-cdash cdash-upload-url= cdash-build= cdash-site= cdash-track= cdash-buildstamp= y/yes-to-all U/fresh reuse fresh-roots deprecated
+set -g __fish_spack_optspecs_spack_install h/help only= u/until= j/jobs= p/concurrent-packages= cooperative estimate cores= overwrite fail-fast keep-prefix keep-stage dont-restage trace= resume use-cache no-cache cache-only use-buildcache= include-build-deps no-check-signature show-log-on-error source n/no-checksum v/verbose fake only-concrete add no-add f/file= clean dirty test= log-format= log-file= help-cdash cdash-upload-url= cdash-build= cdash-site= cdash-track= cdash-buildstamp= y/yes-to-all U/fresh reuse fresh-roots deprecated solve-timeout= explain no-explain
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 install' -f -k -a '(__fish_spack_specs)'
 complete -c spack -n '__fish_spack_using_command install' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command install' -s h -l help -d 'show this help message and exit'
@@ -1995,6 +2026,14 @@ complete -c spack -n '__fish_spack_using_command install' -s u -l until -r -f -a
 complete -c spack -n '__fish_spack_using_command install' -s u -l until -r -d 'phase to stop after when installing (default None)'
 complete -c spack -n '__fish_spack_using_command install' -s j -l jobs -r -f -a jobs
 complete -c spack -n '__fish_spack_using_command install' -s j -l jobs -r -d 'explicitly set number of parallel jobs'
+complete -c spack -n '__fish_spack_using_command install' -s p -l concurrent-packages -r -f -a concurrent_packages
+complete -c spack -n '__fish_spack_using_command install' -s p -l concurrent-packages -r -d 'maximum number of packages to build concurrently'
+complete -c spack -n '__fish_spack_using_command install' -l cooperative -f -a cooperative
+complete -c spack -n '__fish_spack_using_command install' -l cooperative -d 'share the install with other cooperative spack install processes'
+complete -c spack -n '__fish_spack_using_command install' -l estimate -f -a estimate
+complete -c spack -n '__fish_spack_using_command install' -l estimate -d 'print the predicted wall time and critical path of the install, based on the history of past installs, instead of installing'
+complete -c spack -n '__fish_spack_using_command install' -l cores -r -f -a cores
+complete -c spack -n '__fish_spack_using_command install' -l cores -r -d 'number of cores assumed by --estimate (default: number of available cores)'
 complete -c spack -n '__fish_spack_using_command install' -l overwrite -f -a overwrite
 complete -c spack -n '__fish_spack_using_command install' -l overwrite -d 'reinstall an existing spec, even if it has dependents'
 complete -c spack -n '__fish_spack_using_command install' -l fail-fast -f -a fail_fast
@@ -2005,6 +2044,10 @@ complete -c spack -n '__fish_spack_using_command install' -l keep-stage -f -a ke
 complete -c spack -n '__fish_spack_using_command install' -l keep-stage -d 'don'"'"'t remove the build stage if installation succeeds'
 complete -c spack -n '__fish_spack_using_command install' -l dont-restage -f -a dont_restage
 complete -c spack -n '__fish_spack_using_command install' -l dont-restage -d 'if a partial install is detected, don'"'"'t delete prior state'
+complete -c spack -n '__fish_spack_using_command install' -l trace -r -f -a trace
+complete -c spack -n '__fish_spack_using_command install' -l trace -r -d 'write a timeline of the install to FILE'
+complete -c spack -n '__fish_spack_using_command install' -l resume -f -a resume
+complete -c spack -n '__fish_spack_using_command install' -l resume -d 'resume failed builds after the last phase they completed'
 complete -c spack -n '__fish_spack_using_command install' -l use-cache -f -a use_cache
 complete -c spack -n '__fish_spack_using_command install' -l use-cache -d 'check for pre-built Spack packages in mirrors (default)'
 complete -c spack -n '__fish_spack_using_command install' -l no-cache -f -a use_cache
@@ -2062,6 +2105,12 @@ complete -c spack -n '__fish_spack_using_command install' -l fresh-roots -l reus
 complete -c spack -n '__fish_spack_using_command install' -l fresh-roots -l reuse-deps -d 'concretize with fresh roots and reused dependencies'
 complete -c spack -n '__fish_spack_using_command install' -l deprecated -f -a config_deprecated
 complete -c spack -n '__fish_spack_using_command install' -l deprecated -d 'allow concretizer to select deprecated versions'
+complete -c spack -n '__fish_spack_using_command install' -l solve-timeout -r -f -a concretizer_timeout
+complete -c spack -n '__fish_spack_using_command install' -l solve-timeout -r -d 'stop optimizing after SECONDS and use the best solution found so far'
+complete -c spack -n '__fish_spack_using_command install' -l explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command install' -l explain -d 'explain why specs cannot be concretized, with the causes of each error'
+complete -c spack -n '__fish_spack_using_command install' -l no-explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command install' -l no-explain -d 'report only the errors when specs cannot be concretized, which is faster'
 
 # spack license
 set -g __fish_spack_optspecs_spack_license h/help root=
@@ -2232,7 +2281,7 @@ complete -c spack -n '__fish_spack_using_command mirror' -s n -l no-checksum -f
 complete -c spack -n '__fish_spack_using_command mirror' -s n -l no-checksum -d 'do not use checksums to verify downloaded files (unsafe)'
 
 # spack mirror create
-set -g __fish_spack_optspecs_spack_mirror_create h/help d/directory= a/all f/file= exclude-file= exclude-specs= skip-unstable-versions D/dependencies n/versions-per-spec= private U/fresh reuse fresh-roots deprecated
+set -g __fish_spack_optspecs_spack_mirror_create h/help d/directory= a/all f/file= exclude-file= exclude-specs= skip-unstable-versions D/dependencies n/versions-per-spec= private U/fresh reuse fresh-roots deprecated solve-timeout= explain no-explain
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 mirror create' -f -k -a '(__fish_spack_specs)'
 complete -c spack -n '__fish_spack_using_command mirror create' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command mirror create' -s h -l help -d 'show this help message and exit'
@@ -2262,6 +2311,12 @@ complete -c spack -n '__fish_spack_using_command mirror create' -l fresh-roots -
 complete -c spack -n '__fish_spack_using_command mirror create' -l fresh-roots -l reuse-deps -d 'concretize with fresh roots and reused dependencies'
 complete -c spack -n '__fish_spack_using_command mirror create' -l deprecated -f -a config_deprecated
 complete -c spack -n '__fish_spack_using_command mirror create' -l deprecated -d 'allow concretizer to select deprecated versions'
+complete -c spack -n '__fish_spack_using_command mirror create' -l solve-timeout -r -f -a concretizer_timeout
+complete -c spack -n '__fish_spack_using_command mirror create' -l solve-timeout -r -d 'stop optimizing after SECONDS and use the best solution found so far'
+complete -c spack -n '__fish_spack_using_command mirror create' -l explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command mirror create' -l explain -d 'explain why specs cannot be concretized, with the causes of each error'
+complete -c spack -n '__fish_spack_using_command mirror create' -l no-explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command mirror create' -l no-explain -d 'report only the errors when specs cannot be concretized, which is faster'
 
 # spack mirror destroy
 set -g __fish_spack_optspecs_spack_mirror_destroy h/help m/mirror-name= mirror-url=
@@ -2521,7 +2576,7 @@ complete -c spack -n '__fish_spack_using_command module tcl setdefault' -s h -l
 complete -c spack -n '__fish_spack_using_command module tcl setdefault' -s h -l help -d 'show this help message and exit'
 
 # spack patch
-set -g __fish_spack_optspecs_spack_patch h/help n/no-checksum U/fresh reuse fresh-roots deprecated
+set -g __fish_spack_optspecs_spack_patch h/help n/no-checksum U/fresh reuse fresh-roots deprecated solve-timeout= explain no-explain
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 patch' -f -k -a '(__fish_spack_specs)'
 complete -c spack -n '__fish_spack_using_command patch' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command patch' -s h -l help -d 'show this help message and exit'
@@ -2535,6 +2590,39 @@ complete -c spack -n '__fish_spack_using_command patch' -l fresh-roots -l reuse-
 complete -c spack -n '__fish_spack_using_command patch' -l fresh-roots -l reuse-deps -d 'concretize with fresh roots and reused dependencies'
 complete -c spack -n '__fish_spack_using_command patch' -l deprecated -f -a config_deprecated
 complete -c spack -n '__fish_spack_using_command patch' -l deprecated -d 'allow concretizer to select deprecated versions'
+complete -c spack -n '__fish_spack_using_command patch' -l solve-timeout -r -f -a concretizer_timeout
+complete -c spack -n '__fish_spack_using_command patch' -l solve-timeout -r -d 'stop optimizing after SECONDS and use the best solution found so far'
+complete -c spack -n '__fish_spack_using_command patch' -l explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command patch' -l explain -d 'explain why specs cannot be concretized, with the causes of each error'
+complete -c spack -n '__fish_spack_using_command patch' -l no-explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command patch' -l no-explain -d 'report only the errors when specs cannot be concretized, which is faster'
+
+# spack perf
+set -g __fish_spack_optspecs_spack_perf h/help
+complete -c spack -n '__fish_spack_using_command_pos 0 perf' -f -a concretize -d 'benchmark the concretizer on a corpus of specs and environments'
+complete -c spack -n '__fish_spack_using_command perf' -s h -l help -f -a help
+complete -c spack -n '__fish_spack_using_command perf' -s h -l help -d 'show this help message and exit'
+
+# spack perf concretize
+set -g __fish_spack_optspecs_spack_perf_concretize h/help corpus= n/repeat= case= o/output= baseline= metric= alpha= threshold=
+complete -c spack -n '__fish_spack_using_command perf concretize' -s h -l help -f -a help
+complete -c spack -n '__fish_spack_using_command perf concretize' -s h -l help -d 'show this help message and exit'
+complete -c spack -n '__fish_spack_using_command perf concretize' -l corpus -r -f -a corpus
+complete -c spack -n '__fish_spack_using_command perf concretize' -l corpus -r -d 'YAML file with the cases to be concretized (default: the corpus of Spack)'
+complete -c spack -n '__fish_spack_using_command perf concretize' -s n -l repeat -r -f -a repeat
+complete -c spack -n '__fish_spack_using_command perf concretize' -s n -l repeat -r -d 'number of times each case is concretized (default: 5)'
+complete -c spack -n '__fish_spack_using_command perf concretize' -l case -r -f -a cases
+complete -c spack -n '__fish_spack_using_command perf concretize' -l case -r -d 'run only this case (can be repeated)'
+complete -c spack -n '__fish_spack_using_command perf concretize' -s o -l output -r -f -a output
+complete -c spack -n '__fish_spack_using_command perf concretize' -s o -l output -r -d 'write the results to FILE, as JSON'
+complete -c spack -n '__fish_spack_using_command perf concretize' -l baseline -r -f -a baseline
+complete -c spack -n '__fish_spack_using_command perf concretize' -l baseline -r -d 'compare the results with a baseline written by --output, and exit with a non-zero status if any case regressed'
+complete -c spack -n '__fish_spack_using_command perf concretize' -l metric -r -f -a 'setup load ground solve build total peak_memory'
+complete -c spack -n '__fish_spack_using_command perf concretize' -l metric -r -d 'metric compared with the baseline (can be repeated, default: total and peak_memory)'
+complete -c spack -n '__fish_spack_using_command perf concretize' -l alpha -r -f -a alpha
+complete -c spack -n '__fish_spack_using_command perf concretize' -l alpha -r -d 'significance level of the test for regressions (default: 0.05)'
+complete -c spack -n '__fish_spack_using_command perf concretize' -l threshold -r -f -a threshold
+complete -c spack -n '__fish_spack_using_command perf concretize' -l threshold -r -d 'smallest change of the median that is reported (default: 10)'
 
 # spack pkg
 set -g __fish_spack_optspecs_spack_pkg h/help
@@ -2747,7 +2835,7 @@ complete -c spack -n '__fish_spack_using_command restage' -s h -l help -f -a hel
 complete -c spack -n '__fish_spack_using_command restage' -s h -l help -d 'show this help message and exit'
 
 # spack solve
-set -g __fish_spack_optspecs_spack_solve h/help show= l/long L/very-long N/namespaces I/install-status no-install-status y/yaml j/json c/cover= t/types timers stats U/fresh reuse fresh-roots deprecated
+set -g __fish_spack_optspecs_spack_solve h/help show= l/long L/very-long N/namespaces I/install-status no-install-status y/yaml j/json c/cover= t/types timers stats profile= U/fresh reuse fresh-roots deprecated solve-timeout= explain no-explain
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 solve' -f -k -a '(__fish_spack_specs_or_id)'
 complete -c spack -n '__fish_spack_using_command solve' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command solve' -s h -l help -d 'show this help message and exit'
@@ -2775,6 +2863,8 @@ complete -c spack -n '__fish_spack_using_command solve' -l timers -f -a timers
 complete -c spack -n '__fish_spack_using_command solve' -l timers -d 'print out timers for different solve phases'
 complete -c spack -n '__fish_spack_using_command solve' -l stats -f -a stats
 complete -c spack -n '__fish_spack_using_command solve' -l stats -d 'print out statistics from clingo'
+complete -c spack -n '__fish_spack_using_command solve' -l profile -r -f -a profile
+complete -c spack -n '__fish_spack_using_command solve' -l profile -r -d 'write a JSON profile of the solve to FILE'
 complete -c spack -n '__fish_spack_using_command solve' -s U -l fresh -f -a concretizer_reuse
 complete -c spack -n '__fish_spack_using_command solve' -s U -l fresh -d 'do not reuse installed deps; build newest configuration'
 complete -c spack -n '__fish_spack_using_command solve' -l reuse -f -a concretizer_reuse
@@ -2783,9 +2873,15 @@ complete -c spack -n '__fish_spack_using_command solve' -l fresh-roots -l reuse-
 complete -c spack -n '__fish_spack_using_command solve' -l fresh-roots -l reuse-deps -d 'concretize with fresh roots and reused dependencies'
 complete -c spack -n '__fish_spack_using_command solve' -l deprecated -f -a config_deprecated
 complete -c spack -n '__fish_spack_using_command solve' -l deprecated -d 'allow concretizer to select deprecated versions'
+complete -c spack -n '__fish_spack_using_command solve' -l solve-timeout -r -f -a concretizer_timeout
+complete -c spack -n '__fish_spack_using_command solve' -l solve-timeout -r -d 'stop optimizing after SECONDS and use the best solution found so far'
+complete -c spack -n '__fish_spack_using_command solve' -l explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command solve' -l explain -d 'explain why specs cannot be concretized, with the causes of each error'
+complete -c spack -n '__fish_spack_using_command solve' -l no-explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command solve' -l no-explain -d 'report only the errors when specs cannot be concretized, which is faster'
 
 # spack spec
-set -g __fish_spack_optspecs_spack_spec h/help l/long L/very-long N/namespaces I/install-status no-install-status y/yaml j/json format= c/cover= t/types U/fresh reuse fresh-roots deprecated
+set -g __fish_spack_optspecs_spack_spec h/help l/long L/very-long N/namespaces I/install-status no-install-status y/yaml j/json format= c/cover= t/types U/fresh reuse fresh-roots deprecated solve-timeout= explain no-explain
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 spec' -f -k -a '(__fish_spack_specs_or_id)'
 complete -c spack -n '__fish_spack_using_command spec' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command spec' -s h -l help -d 'show this help message and exit'
@@ -2817,9 +2913,15 @@ complete -c spack -n '__fish_spack_using_command spec' -l fresh-roots -l reuse-d
 complete -c spack -n '__fish_spack_using_command spec' -l fresh-roots -l reuse-deps -d 'concretize with fresh roots and reused dependencies'
 complete -c spack -n '__fish_spack_using_command spec' -l deprecated -f -a config_deprecated
 complete -c spack -n '__fish_spack_using_command spec' -l deprecated -d 'allow concretizer to select deprecated versions'
+complete -c spack -n '__fish_spack_using_command spec' -l solve-timeout -r -f -a concretizer_timeout
+complete -c spack -n '__fish_spack_using_command spec' -l solve-timeout -r -d 'stop optimizing after SECONDS and use the best solution found so far'
+complete -c spack -n '__fish_spack_using_command spec' -l explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command spec' -l explain -d 'explain why specs cannot be concretized, with the causes of each error'
+complete -c spack -n '__fish_spack_using_command spec' -l no-explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command spec' -l no-explain -d 'report only the errors when specs cannot be concretized, which is faster'
 
 # spack stage
-set -g __fish_spack_optspecs_spack_stage h/help n/no-checksum p/path= U/fresh reuse fresh-roots deprecated
+set -g __fish_spack_optspecs_spack_stage h/help n/no-checksum p/path= U/fresh reuse fresh-roots deprecated solve-timeout= explain no-explain
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 stage' -f -k -a '(__fish_spack_specs_or_id)'
 complete -c spack -n '__fish_spack_using_command stage' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command stage' -s h -l help -d 'show this help message and exit'
@@ -2835,6 +2937,12 @@ complete -c spack -n '__fish_spack_using_command stage' -l fresh-roots -l reuse-
 complete -c spack -n '__fish_spack_using_command stage' -l fresh-roots -l reuse-deps -d 'concretize with fresh roots and reused dependencies'
 complete -c spack -n '__fish_spack_using_command stage' -l deprecated -f -a config_deprecated
 complete -c spack -n '__fish_spack_using_command stage' -l deprecated -d 'allow concretizer to select deprecated versions'
+complete -c spack -n '__fish_spack_using_command stage' -l solve-timeout -r -f -a concretizer_timeout
+complete -c spack -n '__fish_spack_using_command stage' -l solve-timeout -r -d 'stop optimizing after SECONDS and use the best solution found so far'
+complete -c spack -n '__fish_spack_using_command stage' -l explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command stage' -l explain -d 'explain why specs cannot be concretized, with the causes of each error'
+complete -c spack -n '__fish_spack_using_command stage' -l no-explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command stage' -l no-explain -d 'report only the errors when specs cannot be concretized, which is faster'
 
 # spack style
 set -g __fish_spack_optspecs_spack_style h/help b/base= a/all r/root-relative U/no-untracked f/fix root= t/tool= s/skip=
@@ -2951,7 +3059,7 @@ complete -c spack -n '__fish_spack_using_command test remove' -s y -l yes-to-all
 complete -c spack -n '__fish_spack_using_command test remove' -s y -l yes-to-all -d 'assume "yes" is the answer to every confirmation request'
 
 # spack test-env
-set -g __fish_spack_optspecs_spack_test_env h/help clean dirty U/fresh reuse fresh-roots deprecated dump= pickle=
+set -g __fish_spack_optspecs_spack_test_env h/help clean dirty U/fresh reuse fresh-roots deprecated solve-timeout= explain no-explain dump= pickle=
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 test-env' -f -a '(__fish_spack_build_env_spec)'
 complete -c spack -n '__fish_spack_using_command test-env' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command test-env' -s h -l help -d 'show this help message and exit'
@@ -2967,6 +3075,12 @@ complete -c spack -n '__fish_spack_using_command test-env' -l fresh-roots -l reu
 complete -c spack -n '__fish_spack_using_command test-env' -l fresh-roots -l reuse-deps -d 'concretize with fresh roots and reused dependencies'
 complete -c spack -n '__fish_spack_using_command test-env' -l deprecated -f -a config_deprecated
 complete -c spack -n '__fish_spack_using_command test-env' -l deprecated -d 'allow concretizer to select deprecated versions'
+complete -c spack -n '__fish_spack_using_command test-env' -l solve-timeout -r -f -a concretizer_timeout
+complete -c spack -n '__fish_spack_using_command test-env' -l solve-timeout -r -d 'stop optimizing after SECONDS and use the best solution found so far'
+complete -c spack -n '__fish_spack_using_command test-env' -l explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command test-env' -l explain -d 'explain why specs cannot be concretized, with the causes of each error'
+complete -c spack -n '__fish_spack_using_command test-env' -l no-explain -f -a concretizer_explain
+complete -c spack -n '__fish_spack_using_command test-env' -l no-explain -d 'report only the errors when specs cannot be concretized, which is faster'
 complete -c spack -n '__fish_spack_using_command test-env' -l dump -r -f -a dump
 complete -c spack -n '__fish_spack_using_command test-env' -l dump -r -d 'dump a source-able environment to FILE'
 complete -c spack -n '__fish_spack_using_command test-env' -l pickle -r -f -a pickle